@@ -0,0 +1,142 @@
+"""Admission control for upstream Venice calls: concurrency cap, bounded fair queue"""
+
+import asyncio
+import math
+import time
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Deque, Dict
+
+
+class AdmissionRejected(Exception):
+    """Raised when a call cannot be admitted; ``retry_after`` is in seconds"""
+
+    def __init__(self, reason: str, retry_after: int):
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class AdmissionPermit:
+    """A held upstream slot; ``release`` is idempotent"""
+
+    __slots__ = ("_controller", "_released")
+
+    def __init__(self, controller: "AdmissionController"):
+        self._controller = controller
+        self._released = False
+
+    def release(self) -> None:
+        if not self._released:
+            self._released = True
+            self._controller._release()
+
+
+class AdmissionController:
+    """Bulkhead limiting concurrent upstream calls.
+
+    Up to ``max_concurrent`` calls run at once. Further callers wait in a
+    queue of at most ``max_queue`` entries for no longer than ``max_wait``
+    seconds; anything beyond that fails fast with ``AdmissionRejected``.
+    Waiters are grouped per client key and freed slots are handed out
+    round-robin across clients, so one busy client cannot starve the rest.
+    """
+
+    def __init__(self, max_concurrent: int = 16, max_queue: int = 64, max_wait: float = 10.0):
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.max_wait = max_wait
+        self.active = 0
+        self.queued = 0
+        self._waiters: "OrderedDict[str, Deque[asyncio.Future]]" = OrderedDict()
+        self.admitted = 0
+        self.rejected_queue_full = 0
+        self.rejected_timeout = 0
+        self.total_wait = 0.0
+        self.max_observed_wait = 0.0
+
+    def _retry_after(self) -> int:
+        return max(1, math.ceil(self.max_wait))
+
+    def _dequeue(self, client_key: str, waiter: asyncio.Future) -> None:
+        waiters = self._waiters.get(client_key)
+        if waiters is None or waiter not in waiters:
+            return
+        waiters.remove(waiter)
+        self.queued -= 1
+        if not waiters:
+            del self._waiters[client_key]
+
+    def _release(self) -> None:
+        # Hand the slot straight to the next waiter, taking clients in turn
+        while self._waiters:
+            client_key, waiters = next(iter(self._waiters.items()))
+            waiter = waiters.popleft()
+            self.queued -= 1
+            if waiters:
+                self._waiters.move_to_end(client_key)
+            else:
+                del self._waiters[client_key]
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.active -= 1
+
+    def _admit(self, waited: float) -> AdmissionPermit:
+        self.admitted += 1
+        self.total_wait += waited
+        self.max_observed_wait = max(self.max_observed_wait, waited)
+        return AdmissionPermit(self)
+
+    async def acquire(self, client_key: str) -> AdmissionPermit:
+        if self.active < self.max_concurrent and not self.queued:
+            self.active += 1
+            return self._admit(0.0)
+        if self.queued >= self.max_queue:
+            self.rejected_queue_full += 1
+            raise AdmissionRejected("Upstream queue is full", self._retry_after())
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.setdefault(client_key, deque()).append(waiter)
+        self.queued += 1
+        started = time.monotonic()
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter), self.max_wait)
+        except asyncio.TimeoutError:
+            self._dequeue(client_key, waiter)
+            if waiter.done() and not waiter.cancelled():
+                # The slot was handed over just as the wait expired
+                return self._admit(time.monotonic() - started)
+            waiter.cancel()
+            self.rejected_timeout += 1
+            raise AdmissionRejected("Timed out waiting for an upstream slot", self._retry_after())
+        except asyncio.CancelledError:
+            self._dequeue(client_key, waiter)
+            if waiter.done() and not waiter.cancelled():
+                self._release()
+            else:
+                waiter.cancel()
+            raise
+        return self._admit(time.monotonic() - started)
+
+    @asynccontextmanager
+    async def slot(self, client_key: str) -> AsyncIterator[None]:
+        permit = await self.acquire(client_key)
+        try:
+            yield
+        finally:
+            permit.release()
+
+    def stats(self) -> Dict:
+        return {
+            "active": self.active,
+            "queueDepth": self.queued,
+            "queuedClients": len(self._waiters),
+            "maxConcurrent": self.max_concurrent,
+            "maxQueue": self.max_queue,
+            "admitted": self.admitted,
+            "rejectedQueueFull": self.rejected_queue_full,
+            "rejectedTimeout": self.rejected_timeout,
+            "avgWaitSeconds": round(self.total_wait / self.admitted, 4) if self.admitted else 0.0,
+            "maxWaitSeconds": round(self.max_observed_wait, 4),
+        }
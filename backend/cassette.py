@@ -0,0 +1,209 @@
+"""Record/replay of upstream HTTP exchanges for deterministic offline runs"""
+
+import asyncio
+import base64
+import hashlib
+import json
+import logging
+import threading
+import time
+from pathlib import Path
+from typing import AsyncIterator, Dict, List, Optional
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+LIVE = "live"
+RECORD = "record"
+REPLAY = "replay"
+
+# Hop-by-hop headers describe the original connection, not the response
+SKIP_HEADERS = {"transfer-encoding", "connection", "keep-alive", "date"}
+
+
+def request_key(request: httpx.Request) -> str:
+    """Hash of what determines the answer: method, path and body (JSON canonicalized).
+
+    Host and headers are left out, so a cassette recorded against one host and
+    API key replays under another.
+    """
+    body = request.content
+    try:
+        body = json.dumps(json.loads(body), sort_keys=True, separators=(",", ":")).encode()
+    except ValueError:
+        pass
+    digest = hashlib.sha256()
+    digest.update(request.method.encode())
+    digest.update(b" ")
+    digest.update(request.url.raw_path)
+    digest.update(b"\n")
+    digest.update(body)
+    return digest.hexdigest()
+
+
+def encode_chunk(offset: float, data: bytes) -> Dict:
+    try:
+        return {"t": round(offset, 4), "d": data.decode("utf-8")}
+    except UnicodeDecodeError:
+        return {"t": round(offset, 4), "b": base64.b64encode(data).decode("ascii")}
+
+
+def decode_chunk(chunk: Dict) -> bytes:
+    return chunk["d"].encode("utf-8") if "d" in chunk else base64.b64decode(chunk["b"])
+
+
+class Cassette:
+    """Append-only JSON Lines file of recorded exchanges, indexed in memory by request key"""
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self.entries: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+        if self.path.is_file():
+            with self.path.open() as f:
+                for line in f:
+                    if line.strip():
+                        entry = json.loads(line)
+                        # Later recordings of the same request win
+                        self.entries[entry["key"]] = entry
+
+    def get(self, key: str) -> Optional[Dict]:
+        return self.entries.get(key)
+
+    def append(self, entry: Dict) -> None:
+        line = json.dumps(entry, separators=(",", ":")) + "\n"
+        with self._lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with self.path.open("a") as f:
+                f.write(line)
+            self.entries[entry["key"]] = entry
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+
+class RecordingStream(httpx.AsyncByteStream):
+    """Passes the upstream body through while noting each chunk and when it arrived"""
+
+    def __init__(self, inner: httpx.AsyncByteStream, entry: Dict, started: float, cassette: Cassette, drain_timeout: float = 1.0):
+        self.inner = inner
+        self.entry = entry
+        self.started = started
+        self.cassette = cassette
+        self.drain_timeout = drain_timeout
+        self._iterator: Optional[AsyncIterator[bytes]] = None
+        self.complete = False
+
+    async def _read(self) -> AsyncIterator[bytes]:
+        async for data in self.inner:
+            self.entry["chunks"].append(encode_chunk(time.perf_counter() - self.started, data))
+            yield data
+        self.complete = True
+
+    def __aiter__(self) -> AsyncIterator[bytes]:
+        self._iterator = self._read()
+        return self._iterator
+
+    async def _drain(self) -> None:
+        async for _ in self._iterator:
+            pass
+
+    async def aclose(self) -> None:
+        # The caller may stop reading early (e.g. at an SSE [DONE]); read the rest
+        # so the recording is whole, but don't hold up the caller for long
+        if not self.complete and self._iterator is not None:
+            try:
+                await asyncio.wait_for(self._drain(), self.drain_timeout)
+            except (asyncio.TimeoutError, httpx.HTTPError):
+                pass
+        await self.inner.aclose()
+        # A body cut short (read error, upstream still generating) isn't worth replaying
+        if self.complete:
+            self.cassette.append(self.entry)
+
+
+class ReplayStream(httpx.AsyncByteStream):
+    def __init__(self, chunks: List[Dict], timed: bool):
+        self.chunks = chunks
+        self.timed = timed
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        started = time.perf_counter()
+        for chunk in self.chunks:
+            if self.timed:
+                delay = chunk["t"] - (time.perf_counter() - started)
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            yield decode_chunk(chunk)
+
+
+class CassetteTransport(httpx.AsyncBaseTransport):
+    """httpx transport that records exchanges to, or replays them from, a cassette.
+
+    In ``record`` mode requests go to ``inner`` and every completed response
+    is appended to the cassette. In ``replay`` mode nothing leaves the
+    process: responses come from the cassette, with their original
+    time-to-headers and inter-chunk timing when ``replay_timing`` is set, and
+    a request that was never recorded gets a 404.
+    """
+
+    def __init__(self, mode: str, cassette: Cassette, inner: Optional[httpx.AsyncBaseTransport] = None, replay_timing: bool = False):
+        if mode not in (RECORD, REPLAY):
+            raise ValueError(f"Unknown cassette mode {mode!r}; expected '{RECORD}' or '{REPLAY}'")
+        if mode == RECORD and inner is None:
+            raise ValueError("Record mode needs an inner transport")
+        self.mode = mode
+        self.cassette = cassette
+        self.inner = inner
+        self.replay_timing = replay_timing
+        self.hits = 0
+        self.misses = 0
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        await request.aread()
+        key = request_key(request)
+        if self.mode == REPLAY:
+            return await self._replay(request, key)
+
+        started = time.perf_counter()
+        response = await self.inner.handle_async_request(request)
+        entry = {
+            "key": key,
+            "method": request.method,
+            "path": request.url.path,
+            "status": response.status_code,
+            "headers": [[k, v] for k, v in response.headers.multi_items() if k.lower() not in SKIP_HEADERS],
+            "elapsed": round(time.perf_counter() - started, 4),
+            "chunks": [],
+        }
+        return httpx.Response(
+            status_code=response.status_code,
+            headers=response.headers,
+            stream=RecordingStream(response.stream, entry, started, self.cassette),
+            extensions=response.extensions,
+        )
+
+    async def _replay(self, request: httpx.Request, key: str) -> httpx.Response:
+        entry = self.cassette.get(key)
+        if entry is None:
+            self.misses += 1
+            logger.warning("No cassette entry for %s %s (%s)", request.method, request.url.path, key[:12])
+            return httpx.Response(404, json={"error": "No recorded response for this request"})
+        self.hits += 1
+        if self.replay_timing and entry["elapsed"] > 0:
+            await asyncio.sleep(entry["elapsed"])
+        # Chunk offsets were taken from the start of the request, body timing is relative to the headers
+        chunks = [{**chunk, "t": max(0.0, chunk["t"] - entry["elapsed"])} for chunk in entry["chunks"]]
+        return httpx.Response(
+            status_code=entry["status"],
+            headers=entry["headers"],
+            stream=ReplayStream(chunks, self.replay_timing),
+        )
+
+    async def aclose(self) -> None:
+        if self.inner is not None:
+            await self.inner.aclose()
+
+    def stats(self) -> Dict:
+        return {"mode": self.mode, "entries": len(self.cassette), "hits": self.hits, "misses": self.misses}
@@ -0,0 +1,276 @@
+"""Chat over WebSocket: per-connection session state, heartbeats and outbound backpressure"""
+
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import TYPE_CHECKING, Deque, Dict, Optional, Set
+
+import orjson
+
+from rate_limit import BucketRule, refill, retry_after
+
+if TYPE_CHECKING:
+    from starlette.websockets import WebSocket
+
+    from session_store import ChatSession, SessionStore
+
+logger = logging.getLogger(__name__)
+
+# Close codes (RFC 6455 7.4.1)
+GOING_AWAY = 1001
+POLICY_VIOLATION = 1008
+MESSAGE_TOO_BIG = 1009
+TRY_AGAIN_LATER = 1013
+
+# Approximate bytes of JSON framing counted per queued frame on top of its content
+FRAME_OVERHEAD = 32
+
+
+class SlowConsumer(Exception):
+    """The client isn't reading its frames and the outbound buffer is full"""
+
+
+class OutboundBuffer:
+    """Frames waiting to be written to one socket, bounded by their encoded size.
+
+    Consecutive ``delta`` frames are merged while they wait, so a client that
+    reads slower than tokens arrive gets fewer, larger frames instead of
+    stalling the upstream read. A client that stops reading altogether runs
+    the buffer past ``max_bytes`` and ``put`` raises ``SlowConsumer``.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.pending_bytes = 0
+        self.merged = 0
+        self._frames: Deque[Dict] = deque()
+        self._ready = asyncio.Event()
+
+    def put(self, frame: Dict) -> None:
+        size = len(frame.get("content", ""))
+        if frame["type"] == "delta" and self._frames and self._frames[-1]["type"] == "delta":
+            last = self._frames[-1]
+            last["content"] += frame["content"]
+            self.merged += 1
+        else:
+            self._frames.append(dict(frame))
+            size += FRAME_OVERHEAD
+        self.pending_bytes += size
+        if self.pending_bytes > self.max_bytes:
+            raise SlowConsumer(f"{self.pending_bytes} bytes waiting to be sent")
+        self._ready.set()
+
+    async def get(self) -> bytes:
+        while not self._frames:
+            self._ready.clear()
+            await self._ready.wait()
+        frame = self._frames.popleft()
+        self.pending_bytes -= len(frame.get("content", "")) + FRAME_OVERHEAD
+        return orjson.dumps(frame)
+
+    def __len__(self) -> int:
+        return len(self._frames)
+
+
+class ChatSocket:
+    """One open chat connection and the session it owns while it is open.
+
+    The session is read from the store once on connect and updated in place
+    turn by turn; it is written back to the store by ``flush`` when the
+    connection closes, so a long conversation doesn't pay a store round-trip
+    per message. Every inbound frame is charged to a per-connection token
+    bucket; a client that exceeds it is disconnected.
+    """
+
+    def __init__(
+        self,
+        websocket: "WebSocket",
+        session_id: str,
+        session: "ChatSession",
+        store: "SessionStore",
+        frame_rule: BucketRule,
+        max_buffered_bytes: int = 256 * 1024,
+        max_frame_bytes: int = 16 * 1024,
+    ):
+        self.websocket = websocket
+        self.session_id = session_id
+        self.session = session
+        self.store = store
+        self.frame_rule = frame_rule
+        self.max_frame_bytes = max_frame_bytes
+        self.outbound = OutboundBuffer(max_buffered_bytes)
+        self.turn: Optional[asyncio.Task] = None
+        self.turns = 0
+        self.dirty = False
+        self.last_seen = time.monotonic()
+        self._tokens = frame_rule.capacity
+        self._tokens_at = time.monotonic()
+        self._writer: Optional[asyncio.Task] = None
+        self._closing: Optional[asyncio.Task] = None
+
+    def send(self, frame: Dict) -> None:
+        """Queue a frame for the writer; a client too far behind is disconnected"""
+        if self._closing is not None:
+            return
+        try:
+            self.outbound.put(frame)
+        except SlowConsumer as e:
+            logger.warning("Closing chat socket for session %s: %s", self.session_id, e)
+            self.close(POLICY_VIOLATION, "Client is not reading")
+
+    def take_frame_token(self) -> Optional[int]:
+        """Charge one inbound frame; returns seconds until one is allowed again when over the limit"""
+        now = time.monotonic()
+        self._tokens = refill(self._tokens, self._tokens_at, now, self.frame_rule)
+        self._tokens_at = now
+        if self._tokens < 1:
+            return retry_after(self._tokens, self.frame_rule)
+        self._tokens -= 1
+        return None
+
+    def add_turn(self, user_message: str, ai_response: str) -> None:
+        self.session.add_turn(user_message, ai_response)
+        self.turns += 1
+        self.dirty = True
+
+    def flush(self) -> None:
+        """Write the session back to the store if it changed since the last flush"""
+        if self.dirty:
+            # Re-register so the store refreshes LRU order and byte accounting
+            self.store[self.session_id] = self.session
+            self.dirty = False
+
+    def close(self, code: int, reason: Optional[str] = None) -> None:
+        """Stop the writer and close the socket; the receive loop then sees the disconnect"""
+        if self._closing is None:
+            if self._writer is not None:
+                self._writer.cancel()
+            self._closing = asyncio.ensure_future(self._close(code, reason))
+
+    async def _close(self, code: int, reason: Optional[str]) -> None:
+        try:
+            await self.websocket.close(code=code, reason=reason)
+        except RuntimeError:
+            pass  # already closed by the client
+
+    async def receive(self) -> Optional[Dict]:
+        """The next client frame to act on, or None once the connection is closing.
+
+        Heartbeats are answered here, and a malformed frame gets an ``error``
+        frame back and is skipped.
+        """
+        while self._closing is None:
+            message = await self.websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                return None
+            self.last_seen = time.monotonic()
+            wait = self.take_frame_token()
+            if wait is not None:
+                self.close(POLICY_VIOLATION, f"Too many frames; retry in {wait}s")
+                return None
+            raw = message.get("text") or message.get("bytes") or b""
+            if len(raw) > self.max_frame_bytes:
+                self.close(MESSAGE_TOO_BIG, "Frame too large")
+                return None
+            try:
+                frame = orjson.loads(raw)
+            except orjson.JSONDecodeError:
+                frame = None
+            if not isinstance(frame, dict) or not isinstance(frame.get("type"), str):
+                self.send({"type": "error", "detail": "Frames must be JSON objects with a 'type'"})
+                continue
+            if frame["type"] == "ping":
+                self.send({"type": "pong"})
+            elif frame["type"] != "pong":
+                return frame
+        return None
+
+    async def _write(self) -> None:
+        try:
+            while True:
+                await self.websocket.send_text((await self.outbound.get()).decode())
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            # The client is gone; the receive loop will see the disconnect
+            logger.debug("Chat socket write for session %s failed: %s", self.session_id, e)
+
+    def start(self) -> None:
+        self._writer = asyncio.create_task(self._write())
+
+    async def stop(self) -> None:
+        """Cancel the in-flight turn and the writer, finish closing, then persist the session"""
+        try:
+            for task in (self.turn, self._writer):
+                if task is not None and not task.done():
+                    task.cancel()
+                    try:
+                        await task
+                    except (asyncio.CancelledError, Exception):
+                        pass
+            if self._closing is not None:
+                await self._closing
+        finally:
+            # Even when the handler itself is being cancelled
+            self.flush()
+
+
+class SocketHub:
+    """Open chat sockets, with one task sending heartbeats to all of them.
+
+    Every ``heartbeat_interval`` seconds each socket is sent a ``ping`` frame;
+    one that hasn't sent anything (a ``pong``, ``ping`` or message) for
+    ``idle_timeout`` seconds is closed. A single timer for all connections
+    keeps an idle socket down to its receive loop and a buffer.
+    """
+
+    def __init__(self, max_connections: int = 5000, heartbeat_interval: float = 25.0, idle_timeout: float = 60.0):
+        self.max_connections = max_connections
+        self.heartbeat_interval = heartbeat_interval
+        self.idle_timeout = idle_timeout
+        self.sockets: Set[ChatSocket] = set()
+        self.accepted = 0
+        self.rejected = 0
+        self.timed_out = 0
+
+    def full(self) -> bool:
+        return len(self.sockets) >= self.max_connections
+
+    def add(self, socket: ChatSocket) -> None:
+        self.sockets.add(socket)
+        self.accepted += 1
+        socket.start()
+
+    async def remove(self, socket: ChatSocket) -> None:
+        self.sockets.discard(socket)
+        await socket.stop()
+
+    def heartbeat(self) -> None:
+        now = time.monotonic()
+        for socket in list(self.sockets):
+            if now - socket.last_seen > self.idle_timeout:
+                self.timed_out += 1
+                socket.close(GOING_AWAY)
+            else:
+                socket.send({"type": "ping"})
+
+    async def run(self) -> None:
+        while True:
+            await asyncio.sleep(self.heartbeat_interval)
+            self.heartbeat()
+
+    async def close_all(self) -> None:
+        """Close every socket and persist its session, e.g. on shutdown"""
+        for socket in list(self.sockets):
+            socket.close(GOING_AWAY)
+            await self.remove(socket)
+
+    def stats(self) -> Dict:
+        return {
+            "open": len(self.sockets),
+            "accepted": self.accepted,
+            "rejected": self.rejected,
+            "timedOut": self.timed_out,
+            "bufferedFrames": sum(len(s.outbound) for s in self.sockets),
+        }
@@ -0,0 +1,322 @@
+"""Durable outbox for contact form submissions, delivered in the background"""
+
+import asyncio
+import json
+import logging
+import random
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+PENDING = "pending"
+SENT = "sent"
+FAILED = "failed"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS outbox (
+    id TEXT PRIMARY KEY,
+    payload TEXT NOT NULL,
+    status TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt_at REAL NOT NULL,
+    last_error TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS outbox_due ON outbox (status, next_attempt_at);
+"""
+
+
+def connect(path: str) -> sqlite3.Connection:
+    conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+    conn.execute("PRAGMA journal_mode=WAL")
+    # FULL fsyncs the WAL on every commit, so an acknowledged submission survives a crash
+    conn.execute("PRAGMA synchronous=FULL")
+    conn.execute("PRAGMA busy_timeout=5000")
+    return conn
+
+
+class ContactOutbox:
+    """Contact submissions journaled to SQLite before they are acknowledged.
+
+    ``submit`` resolves once the row is committed. Submissions arriving
+    within ``commit_interval`` of each other share one transaction, so one
+    fsync covers the whole group. A dispatcher task claims due rows with a
+    lease (so several workers sharing the file don't send the same message
+    twice), hands them to ``deliver`` and retries failures with exponential
+    backoff until ``max_attempts`` is reached, after which the row is marked
+    failed; errors ``is_permanent`` recognises fail the row at once. Each claimed batch is delivered concurrently, so the email worker
+    can send it over one connection. Sent rows are deleted once they are
+    ``retention_seconds`` old and failed rows, kept longer for inspection,
+    once they are ``failed_retention_seconds`` old, so submitters' details
+    aren't kept forever.
+
+    All SQLite access, reads included, runs on one writer thread, so status
+    lookups and stats never block the event loop. ``pending`` is kept in
+    memory for the metrics gauge: adjusted as rows are inserted and settled,
+    and recounted from the file on every dispatch pass.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        deliver: Callable[[Dict], Awaitable[None]],
+        max_attempts: int = 5,
+        base_delay: float = 5.0,
+        max_delay: float = 600.0,
+        commit_interval: float = 0.002,
+        poll_interval: float = 5.0,
+        lease_seconds: float = 120.0,
+        batch_size: int = 20,
+        retention_seconds: float = 7 * 86400,
+        failed_retention_seconds: float = 30 * 86400,
+        is_permanent: Callable[[Exception], bool] = lambda error: False,
+        prune_interval: float = 3600.0,
+    ):
+        self.path = path
+        self.deliver = deliver
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.commit_interval = commit_interval
+        self.poll_interval = poll_interval
+        self.lease_seconds = lease_seconds
+        self.batch_size = batch_size
+        self.retention_seconds = retention_seconds
+        self.failed_retention_seconds = failed_retention_seconds
+        self.is_permanent = is_permanent
+        self.prune_interval = prune_interval
+        self._next_prune = 0.0
+
+        self._writer: Optional[sqlite3.Connection] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._pending: List[Tuple[str, str, asyncio.Future]] = []
+        self._commit_task: Optional[asyncio.Task] = None
+        self._dispatcher: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self.commits = 0
+        self.rows_committed = 0
+        self.delivered = 0
+        self.retries = 0
+        self.failed = 0
+        self.pruned = 0
+        self.pending = 0
+
+    # --- SQLite, executor thread only ---
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._writer is None:
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+            self._writer = connect(self.path)
+            self._writer.executescript(SCHEMA)
+        return self._writer
+
+    def _transaction(self, fn):
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            result = fn(conn)
+            conn.execute("COMMIT")
+            return result
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def _count_pending(self, conn: sqlite3.Connection) -> None:
+        self.pending = conn.execute("SELECT COUNT(*) FROM outbox WHERE status = ?", (PENDING,)).fetchone()[0]
+
+    def _insert(self, rows: List[Tuple[str, str]]) -> None:
+        now = time.time()
+        self._transaction(lambda conn: conn.executemany(
+            "INSERT INTO outbox (id, payload, status, next_attempt_at, created_at, updated_at) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            [(message_id, payload, PENDING, now, now, now) for message_id, payload in rows],
+        ))
+        self.pending += len(rows)
+
+    def _claim(self, now: float) -> List[Tuple[str, str, int]]:
+        def claim(conn: sqlite3.Connection) -> List[Tuple[str, str, int]]:
+            rows = conn.execute(
+                "SELECT id, payload, attempts FROM outbox "
+                "WHERE status = ? AND next_attempt_at <= ? ORDER BY next_attempt_at LIMIT ?",
+                (PENDING, now, self.batch_size),
+            ).fetchall()
+            # Push the rows out of reach of other dispatchers until the lease runs out
+            conn.executemany(
+                "UPDATE outbox SET next_attempt_at = ? WHERE id = ?",
+                [(now + self.lease_seconds, row[0]) for row in rows],
+            )
+            self._count_pending(conn)
+            return rows
+
+        return self._transaction(claim)
+
+    def _record(self, message_id: str, status: str, attempts: int, next_attempt_at: float, error: Optional[str]) -> None:
+        self._transaction(lambda conn: conn.execute(
+            "UPDATE outbox SET status = ?, attempts = ?, next_attempt_at = ?, last_error = ?, updated_at = ? "
+            "WHERE id = ?",
+            (status, attempts, next_attempt_at, error, time.time(), message_id),
+        ))
+        if status != PENDING:
+            self.pending = max(0, self.pending - 1)
+
+    def _status(self, message_id: str) -> Optional[Tuple]:
+        return self._connection().execute(
+            "SELECT status, attempts, last_error, created_at, updated_at FROM outbox WHERE id = ?",
+            (message_id,),
+        ).fetchone()
+
+    def _status_counts(self) -> Dict[str, int]:
+        counts = dict(self._connection().execute("SELECT status, COUNT(*) FROM outbox GROUP BY status").fetchall())
+        self.pending = counts.get(PENDING, 0)
+        return counts
+
+    def _prune(self, sent_cutoff: float, failed_cutoff: float) -> int:
+        return self._transaction(lambda conn: conn.execute(
+            "DELETE FROM outbox WHERE (status = ? AND updated_at < ?) OR (status = ? AND updated_at < ?)",
+            (SENT, sent_cutoff, FAILED, failed_cutoff),
+        ).rowcount)
+
+    # --- event loop side ---
+
+    async def _run_in_writer(self, fn, *args):
+        return await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+
+    async def submit(self, message_id: str, payload: Dict) -> None:
+        """Journal a submission; returns once it is durably committed"""
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((message_id, json.dumps(payload, separators=(",", ":")), future))
+        if self._commit_task is None or self._commit_task.done():
+            self._commit_task = asyncio.create_task(self._group_commit())
+        await future
+
+    async def _group_commit(self) -> None:
+        # Give concurrent submissions a moment to join this transaction
+        await asyncio.sleep(self.commit_interval)
+        while self._pending:
+            group, self._pending = self._pending, []
+            try:
+                await self._run_in_writer(self._insert, [(message_id, payload) for message_id, payload, _ in group])
+            except Exception as e:
+                for _, _, future in group:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            self.commits += 1
+            self.rows_committed += len(group)
+            for _, _, future in group:
+                if not future.done():
+                    future.set_result(None)
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    def backoff(self, attempts: int) -> float:
+        return random.uniform(0.5, 1.0) * min(self.max_delay, self.base_delay * (2 ** (attempts - 1)))
+
+    async def _deliver_one(self, message_id: str, payload: str, attempts: int) -> None:
+        attempts += 1
+        try:
+            await self.deliver(json.loads(payload))
+        except Exception as e:
+            if attempts >= self.max_attempts or self.is_permanent(e):
+                self.failed += 1
+                logger.error("Giving up on contact message %s after %d attempts: %s", message_id, attempts, e)
+                await self._run_in_writer(self._record, message_id, FAILED, attempts, 0.0, str(e))
+            else:
+                self.retries += 1
+                logger.warning("Contact message %s attempt %d failed, will retry: %s", message_id, attempts, e)
+                next_attempt_at = time.time() + self.backoff(attempts)
+                await self._run_in_writer(self._record, message_id, PENDING, attempts, next_attempt_at, str(e))
+            return
+        self.delivered += 1
+        await self._run_in_writer(self._record, message_id, SENT, attempts, 0.0, None)
+
+    async def dispatch(self) -> int:
+        """Deliver every due submission once; returns the number attempted"""
+        rows = await self._run_in_writer(self._claim, time.time())
+        await asyncio.gather(*(self._deliver_one(message_id, payload, attempts) for message_id, payload, attempts in rows))
+        return len(rows)
+
+    async def prune(self) -> int:
+        """Delete sent and failed submissions past their retention periods; returns how many"""
+        now = time.time()
+        pruned = await self._run_in_writer(
+            self._prune, now - self.retention_seconds, now - self.failed_retention_seconds
+        )
+        self.pruned += pruned
+        return pruned
+
+    async def _run_dispatcher(self) -> None:
+        while True:
+            try:
+                attempted = await self.dispatch()
+            except sqlite3.Error as e:
+                logger.error("Contact outbox dispatch failed: %s", e)
+                attempted = 0
+            if time.monotonic() >= self._next_prune:
+                self._next_prune = time.monotonic() + self.prune_interval
+                try:
+                    await self.prune()
+                except sqlite3.Error as e:
+                    logger.error("Contact outbox prune failed: %s", e)
+            if attempted >= self.batch_size:
+                continue
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    def start(self, dispatch: bool = True) -> None:
+        """Start delivering in the background; without ``dispatch`` submissions only accumulate"""
+        # All SQLite access goes through one connection on one thread
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="outbox-writer")
+        self._executor.submit(self._status_counts)  # schema and initial pending count, off the loop
+        self._wakeup = asyncio.Event()
+        if dispatch:
+            self._dispatcher = asyncio.create_task(self._run_dispatcher())
+
+    async def close(self) -> None:
+        if self._dispatcher is not None:
+            self._dispatcher.cancel()
+            self._dispatcher = None
+        if self._commit_task is not None and not self._commit_task.done():
+            await self._commit_task
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+    async def status(self, message_id: str) -> Optional[Dict]:
+        row = await self._run_in_writer(self._status, message_id)
+        if row is None:
+            return None
+        status, attempts, last_error, created_at, updated_at = row
+        return {
+            "messageId": message_id,
+            "status": status,
+            "attempts": attempts,
+            "error": last_error,
+            "createdAt": created_at,
+            "updatedAt": updated_at,
+        }
+
+    async def stats(self) -> Dict:
+        counts = await self._run_in_writer(self._status_counts)
+        return {
+            "pending": counts.get(PENDING, 0),
+            "sent": counts.get(SENT, 0),
+            "failed": counts.get(FAILED, 0),
+            "commits": self.commits,
+            "rowsPerCommit": round(self.rows_committed / self.commits, 2) if self.commits else 0.0,
+            "delivered": self.delivered,
+            "retries": self.retries,
+            "deliveryFailures": self.failed,
+            "pruned": self.pruned,
+        }
@@ -0,0 +1,88 @@
+"""Token-budget-aware prompt context for Venice AI chat requests"""
+
+from itertools import islice
+from typing import TYPE_CHECKING, Dict, List, Optional
+
+if TYPE_CHECKING:
+    from session_store import ChatSession, MessageRecord
+
+# Roughly four characters per token for English text, plus per-message framing
+CHARS_PER_TOKEN = 4
+MESSAGE_TOKEN_OVERHEAD = 4
+
+# How much of each folded message is kept in the running summary
+SUMMARY_LINE_CHARS = 160
+SUMMARY_HEADER = "Summary of earlier conversation:"
+
+
+def estimate_tokens(text: str) -> int:
+    """Approximate token count without running a tokenizer"""
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def message_tokens(content: str) -> int:
+    return estimate_tokens(content) + MESSAGE_TOKEN_OVERHEAD
+
+
+def summarize_line(role: str, content: str) -> str:
+    """Condense one message into a single summary line"""
+    text = " ".join(content[:SUMMARY_LINE_CHARS + 1].split())
+    if len(content) > SUMMARY_LINE_CHARS:
+        text = text[:SUMMARY_LINE_CHARS].rstrip() + "…"
+    return f"- {role}: {text}"
+
+
+def fit_newest(records: List["MessageRecord"], budget: int) -> List["MessageRecord"]:
+    """Take records newest to oldest while they fit in ``budget`` tokens; returned oldest first"""
+    taken: List["MessageRecord"] = []
+    for record in reversed(records):
+        cost = message_tokens(record.content)
+        if cost > budget:
+            break
+        budget -= cost
+        taken.append(record)
+    taken.reverse()
+    return taken
+
+
+def build_context(
+    session: Optional["ChatSession"],
+    system_prompt: str,
+    user_message: str,
+    token_budget: int,
+) -> List[Dict]:
+    """Build the message list for one turn within ``token_budget`` input tokens.
+
+    History is taken newest to oldest while it fits in the budget left after
+    the system prompt and the new user message. Once anything has to be left
+    out, room for the session's running summary is reserved, the turns that
+    no longer fit are folded into it, and it is sent as a second system
+    message ahead of the retained history.
+    """
+    messages = [{"role": "system", "content": system_prompt}]
+    user_entry = {"role": "user", "content": user_message}
+    if session is None or not session.messages:
+        messages.append(user_entry)
+        return messages
+
+    available = token_budget - message_tokens(system_prompt) - message_tokens(user_message)
+
+    # Messages already folded into the summary are never resent verbatim
+    first_index = session.total - len(session.messages)
+    start = max(session.summary_upto, first_index)
+    candidates = session.recent(session.total - start)
+    history = fit_newest(candidates, available)
+    if session.summary_lines or len(history) < len(candidates):
+        reserve = message_tokens(SUMMARY_HEADER) + session.summary_max_tokens
+        history = fit_newest(candidates, available - reserve)
+
+    evicted_upto = session.total - len(history)
+    if evicted_upto > start:
+        session.fold(islice(session.messages, start - first_index, evicted_upto - first_index))
+        session.summary_upto = evicted_upto
+
+    if session.summary_lines:
+        messages.append({"role": "system", "content": f"{SUMMARY_HEADER}\n{session.summary}"})
+    messages.extend({"role": record.role, "content": record.content} for record in history)
+    messages.append(user_entry)
+    return messages
@@ -0,0 +1,53 @@
+"""Cancel in-flight work when the HTTP client goes away"""
+
+import asyncio
+from typing import Awaitable, Dict, TypeVar
+
+from starlette.requests import Request
+
+T = TypeVar("T")
+
+
+class ClientDisconnected(Exception):
+    """The client disconnected before the response was ready"""
+
+
+async def wait_for_disconnect(request: Request) -> None:
+    """Return once the ASGI server reports ``http.disconnect`` for this request"""
+    while True:
+        message = await request.receive()
+        if message["type"] == "http.disconnect":
+            return
+
+
+class DisconnectGuard:
+    """Races request handling work against the client disconnecting.
+
+    The request body has already been consumed by the time an endpoint runs,
+    so the next ASGI ``receive`` only completes when the client goes away.
+    """
+
+    def __init__(self):
+        self.cancelled: Dict[str, int] = {}
+
+    async def run(self, request: Request, work: Awaitable[T], label: str = "chat") -> T:
+        """Await ``work``; cancel it and raise ``ClientDisconnected`` if the client leaves first"""
+        task = asyncio.ensure_future(work)
+        watcher = asyncio.ensure_future(wait_for_disconnect(request))
+        try:
+            done, _ = await asyncio.wait({task, watcher}, return_when=asyncio.FIRST_COMPLETED)
+            if task in done:
+                return task.result()
+            task.cancel()
+            self.record(label)
+            raise ClientDisconnected()
+        finally:
+            watcher.cancel()
+            if not task.done():
+                task.cancel()
+
+    def record(self, label: str) -> None:
+        self.cancelled[label] = self.cancelled.get(label, 0) + 1
+
+    def stats(self) -> Dict:
+        return {"cancelled": dict(self.cancelled)}
@@ -0,0 +1,204 @@
+"""Background SMTP sender that reuses one authenticated connection"""
+
+import asyncio
+import logging
+import smtplib
+import time
+from concurrent.futures import ThreadPoolExecutor
+from email.message import Message
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+def is_connection_error(error: Exception) -> bool:
+    """Whether the connection can't be trusted after ``error`` and should be reopened.
+
+    SMTP protocol errors subclass ``OSError`` too, but a refused recipient or
+    a 5xx reply is the server's answer about this message: resending it over
+    a new connection would only be refused again.
+    """
+    if isinstance(error, smtplib.SMTPServerDisconnected):
+        return True
+    return isinstance(error, OSError) and not isinstance(error, smtplib.SMTPException)
+
+
+def is_permanent_error(error: Exception) -> bool:
+    """Whether the server refused the message outright (5xx), so resending it can't succeed"""
+    if isinstance(error, smtplib.SMTPRecipientsRefused):
+        return True
+    return isinstance(error, smtplib.SMTPResponseException) and error.smtp_code >= 500
+
+
+class EmailWorker:
+    """Queue of outgoing messages drained in batches over a persistent SMTP connection.
+
+    The connection (EHLO, STARTTLS, LOGIN) is opened on first use and kept
+    alive between batches; it is checked with NOOP after ``keepalive_check``
+    idle seconds, closed after ``idle_timeout`` idle seconds, and reopened
+    once on a connection error mid-batch. All SMTP I/O runs on a dedicated
+    single-thread executor so it never competes with the default pool.
+    """
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        user: Optional[str] = None,
+        password: Optional[str] = None,
+        use_tls: bool = True,
+        batch_size: int = 20,
+        queue_size: int = 1000,
+        idle_timeout: float = 300.0,
+        keepalive_check: float = 30.0,
+        timeout: float = 30.0,
+        send_latency=None,
+    ):
+        self.host = host
+        self.port = port
+        self.user = user
+        self.password = password
+        self.use_tls = use_tls
+        self.batch_size = batch_size
+        self.idle_timeout = idle_timeout
+        self.keepalive_check = keepalive_check
+        self.timeout = timeout
+        self.queue_size = queue_size
+        # Optional histogram (anything with ``observe``) for per-message send time
+        self.send_latency = send_latency
+        self._queue: Optional["asyncio.Queue[Tuple[Message, asyncio.Future]]"] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._smtp: Optional[smtplib.SMTP] = None
+        self._last_used = 0.0
+        self._task: Optional[asyncio.Task] = None
+        self.sent = 0
+        self.failed = 0
+        self.batches = 0
+        self.connections = 0
+        self.reconnects = 0
+        self.total_send_seconds = 0.0
+
+    # --- SMTP connection, executor thread only ---
+
+    def _connect(self) -> smtplib.SMTP:
+        smtp = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        smtp.ehlo()
+        if self.use_tls:
+            smtp.starttls()
+            smtp.ehlo()
+        if self.user and self.password:
+            smtp.login(self.user, self.password)
+        self.connections += 1
+        return smtp
+
+    def _disconnect(self) -> None:
+        if self._smtp is None:
+            return
+        try:
+            self._smtp.quit()
+        except Exception:
+            self._smtp.close()
+        self._smtp = None
+
+    def _connection(self) -> smtplib.SMTP:
+        if self._smtp is not None and time.monotonic() - self._last_used > self.keepalive_check:
+            try:
+                healthy = self._smtp.noop()[0] == 250
+            except OSError:
+                healthy = False
+            if not healthy:
+                self._smtp.close()
+                self._smtp = None
+        if self._smtp is None:
+            self._smtp = self._connect()
+        return self._smtp
+
+    def _send_one(self, message: Message) -> None:
+        try:
+            self._connection().send_message(message)
+        except OSError as e:
+            if not is_connection_error(e):
+                raise
+            # Stale or dropped connection: reconnect once and retry this message
+            if self._smtp is not None:
+                self._smtp.close()
+            self._smtp = None
+            self.reconnects += 1
+            self._connection().send_message(message)
+        self._last_used = time.monotonic()
+
+    def _send_batch(self, messages: List[Message]) -> List[Tuple[Optional[Exception], float]]:
+        results: List[Tuple[Optional[Exception], float]] = []
+        for message in messages:
+            started = time.monotonic()
+            error = None
+            try:
+                self._send_one(message)
+            except Exception as e:
+                error = e
+            results.append((error, time.monotonic() - started))
+        return results
+
+    # --- event loop side ---
+
+    async def send(self, message: Message) -> None:
+        """Queue ``message`` and wait until it has been handed to the SMTP server"""
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((message, future))
+        await future
+
+    async def _next_batch(self) -> List[Tuple[Message, asyncio.Future]]:
+        batch = [await self._queue.get()]
+        while len(batch) < self.batch_size and not self._queue.empty():
+            batch.append(self._queue.get_nowait())
+        return batch
+
+    async def run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            try:
+                batch = await asyncio.wait_for(self._next_batch(), timeout=self.idle_timeout)
+            except asyncio.TimeoutError:
+                await loop.run_in_executor(self._executor, self._disconnect)
+                continue
+
+            results = await loop.run_in_executor(self._executor, self._send_batch, [m for m, _ in batch])
+            self.batches += 1
+            for (_, future), (error, seconds) in zip(batch, results):
+                self.total_send_seconds += seconds
+                if self.send_latency is not None:
+                    self.send_latency.observe(seconds)
+                if error is None:
+                    self.sent += 1
+                    if not future.done():
+                        future.set_result(None)
+                else:
+                    self.failed += 1
+                    logger.error("Failed to send email: %s", error)
+                    if not future.done():
+                        future.set_exception(error)
+
+    def start(self) -> None:
+        self._queue = asyncio.Queue(maxsize=self.queue_size)
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="smtp-sender")
+        self._task = asyncio.create_task(self.run())
+
+    async def close(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        self._task = None
+        await asyncio.get_running_loop().run_in_executor(self._executor, self._disconnect)
+        self._executor.shutdown(wait=True)
+
+    def stats(self) -> Dict:
+        attempts = self.sent + self.failed
+        return {
+            "queueDepth": self._queue.qsize() if self._queue else 0,
+            "sent": self.sent,
+            "failed": self.failed,
+            "batches": self.batches,
+            "connectionsOpened": self.connections,
+            "reconnects": self.reconnects,
+            "avgSendSeconds": round(self.total_send_seconds / attempts, 4) if attempts else 0.0,
+        }
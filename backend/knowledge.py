@@ -0,0 +1,169 @@
+"""In-memory BM25 index over the portfolio's own content, for answering or grounding chat prompts"""
+
+import re
+from typing import Dict, Iterable, List, NamedTuple, Optional
+
+import numpy as np
+
+_WORDS = re.compile(r"[a-z0-9]+(?:[.+#][a-z0-9]+)*[+#]*")
+_CAMEL = re.compile(r"(?<=[a-z])(?=[A-Z])")
+
+# Words that say nothing about which document is meant, including the ones
+# every question to a portfolio assistant has ("what", "your", "tell me about")
+STOPWORDS = frozenset("""
+a about after all also am an and any are as at be been being but by can could did do does doing for from
+had has have how i if in into is it its just me more most my no not of on or our out over so some such
+than that the their them then there these they this to too up us very was we were what when where which
+while who whom why will with would you your yours yourself tell know like get give show describe explain
+s t m re ve ll d don
+""".split())
+
+
+def tokenize(text: str) -> List[str]:
+    """Lower-cased content words, with a plural ``s`` folded away"""
+    terms = []
+    for word in _WORDS.findall(text.lower()):
+        if word in STOPWORDS:
+            continue
+        if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+            word = word[:-1]
+        terms.append(word)
+    return terms
+
+
+class Document(NamedTuple):
+    """A retrievable piece of site content; FAQ entries carry a ready ``answer``"""
+
+    title: str
+    text: str
+    answer: Optional[str] = None
+
+
+class Hit(NamedTuple):
+    document: Document
+    score: float
+    coverage: float  # fraction of the query's content words found in the document
+
+
+class KnowledgeMatch(NamedTuple):
+    answer: Optional[str]
+    snippets: List[str]
+
+
+def content_documents(content: Dict) -> List[Document]:
+    """Documents from the site content file: projects, skill categories and About paragraphs"""
+    documents = []
+    for project in content.get("projects", []):
+        technologies = ", ".join(project.get("technologies", []))
+        documents.append(Document(
+            f"Project: {project['title']}",
+            f"Project: {project['title']}. {project['description']} Technologies: {technologies}.",
+        ))
+    for key, category in content.get("skills", {}).items():
+        name = _CAMEL.sub(" ", key).lower()
+        documents.append(Document(
+            f"Skills: {name}",
+            f"Skills in {name} (proficiency {category['level']}%): {', '.join(category['skills'])}.",
+        ))
+    for paragraph in content.get("about", []):
+        documents.append(Document("About", paragraph))
+    return documents
+
+
+def faq_documents(entries: Iterable[Dict]) -> List[Document]:
+    return [
+        Document(entry["question"], f"{entry['question']} {entry['answer']}", answer=entry["answer"])
+        for entry in entries
+    ]
+
+
+class KnowledgeIndex:
+    """Okapi BM25 over a small, fixed set of documents, precomputed as one dense weight matrix.
+
+    Building the index computes every document/term BM25 weight once, so a
+    query is a column gather and a row sum in NumPy. ``lookup`` answers
+    directly from an FAQ entry when it clearly matches (it covers at least
+    ``answer_coverage`` of the query's content words and outscores the
+    runner-up by ``answer_margin``); otherwise it returns up to ``top_k``
+    snippets to ground the model's reply. A snippet must score at least
+    ``min_score`` and contain at least ``ground_coverage`` of the query's
+    content words, so one shared term ("Python") doesn't make a general
+    question look like one about the portfolio.
+    """
+
+    def __init__(
+        self,
+        documents: List[Document],
+        top_k: int = 3,
+        min_score: float = 2.0,
+        answer_coverage: float = 0.8,
+        answer_margin: float = 1.5,
+        ground_coverage: float = 0.6,
+        k1: float = 1.5,
+        b: float = 0.75,
+    ):
+        self.documents = documents
+        self.top_k = top_k
+        self.min_score = min_score
+        self.answer_coverage = answer_coverage
+        self.answer_margin = answer_margin
+        self.ground_coverage = ground_coverage
+        self.lookups = 0
+        self.answered = 0
+        self.grounded = 0
+
+        tokens = [tokenize(document.text) for document in documents]
+        self.vocabulary: Dict[str, int] = {
+            term: i for i, term in enumerate(sorted({t for terms in tokens for t in terms}))
+        }
+        tf = np.zeros((len(documents), len(self.vocabulary)), dtype=np.float32)
+        for row, terms in enumerate(tokens):
+            for term in terms:
+                tf[row, self.vocabulary[term]] += 1
+        lengths = tf.sum(axis=1)
+        average = lengths.mean() if len(documents) else 1.0
+        df = (tf > 0).sum(axis=0)
+        idf = np.log1p((len(documents) - df + 0.5) / (df + 0.5))
+        norm = k1 * (1 - b + b * lengths / max(average, 1.0))
+        self.weights = (idf * tf * (k1 + 1) / (tf + norm[:, None])).astype(np.float32)
+        self.present = tf > 0
+
+    def search(self, query: str, k: Optional[int] = None) -> List[Hit]:
+        """The best ``k`` documents for ``query``, best first, that share at least one term with it"""
+        terms = set(tokenize(query))
+        columns = [self.vocabulary[t] for t in terms if t in self.vocabulary]
+        if not columns:
+            return []
+        scores = self.weights[:, columns].sum(axis=1)
+        k = min(k or self.top_k, len(self.documents))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        coverage = self.present[top][:, columns].sum(axis=1) / len(terms)
+        return [
+            Hit(self.documents[i], float(scores[i]), float(c))
+            for i, c in zip(top, coverage) if scores[i] > 0
+        ]
+
+    def lookup(self, query: str, answer: bool = True) -> KnowledgeMatch:
+        """A direct answer for ``query`` when confident (and ``answer`` allows it), else the snippets worth showing the model"""
+        self.lookups += 1
+        found = self.search(query)
+        hits = [hit for hit in found if hit.score >= self.min_score and hit.coverage >= self.ground_coverage]
+        if not hits:
+            return KnowledgeMatch(None, [])
+        best = hits[0]
+        runner_up = found[1].score if len(found) > 1 else 0.0
+        if answer and best.document.answer and best.coverage >= self.answer_coverage and best.score >= self.answer_margin * runner_up:
+            self.answered += 1
+            return KnowledgeMatch(best.document.answer, [])
+        self.grounded += 1
+        return KnowledgeMatch(None, [hit.document.text for hit in hits])
+
+    def stats(self) -> Dict:
+        return {
+            "documents": len(self.documents),
+            "terms": len(self.vocabulary),
+            "lookups": self.lookups,
+            "answered": self.answered,
+            "grounded": self.grounded,
+        }
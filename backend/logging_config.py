@@ -0,0 +1,169 @@
+"""Non-blocking structured logging: JSON records written by a background thread"""
+
+import atexit
+import logging
+import queue
+import random
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, Optional, Tuple
+
+import orjson
+
+# Attributes every LogRecord has; anything else came in through ``extra=``
+_STANDARD_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: time, level, logger, message, any ``extra`` fields and the traceback"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _STANDARD_ATTRS and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_text:
+            entry["exception"] = record.exc_text
+        elif record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return orjson.dumps(entry, default=str).decode()
+
+
+class SamplingFilter(logging.Filter):
+    """Keeps only a fraction of records for chosen message templates.
+
+    ``rates`` maps a message template (the unformatted ``msg``, which with
+    lazy %-style arguments identifies the kind of line) to the fraction kept.
+    Warnings and errors are never sampled out.
+    """
+
+    def __init__(self, rates: Dict[str, float]):
+        super().__init__()
+        self.rates = rates
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+        rate = self.rates.get(record.msg) if isinstance(record.msg, str) else None
+        return rate is None or random.random() < rate
+
+
+class RateLimitFilter(logging.Filter):
+    """Lets at most ``per_interval`` records of each template through per ``interval`` seconds.
+
+    The first record after a suppressed stretch carries a ``suppressed``
+    field with the number of lines that were dropped. Warnings and errors
+    are never suppressed, so an outage stays fully visible.
+    """
+
+    def __init__(self, per_interval: int, interval: float = 60.0):
+        super().__init__()
+        self.per_interval = per_interval
+        self.interval = interval
+        self._windows: Dict[Tuple[str, object], list] = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+        key = (record.name, record.msg)
+        now = time.monotonic()
+        with self._lock:
+            window = self._windows.get(key)
+            if window is None or now - window[0] >= self.interval:
+                suppressed = window[2] if window else 0
+                window = self._windows[key] = [now, 0, 0]
+                if suppressed:
+                    record.suppressed = suppressed
+            if window[1] >= self.per_interval:
+                window[2] += 1
+                return False
+            window[1] += 1
+        return True
+
+
+class DroppingQueueHandler(QueueHandler):
+    """Queues records for the listener thread, dropping them instead of blocking when the queue is full.
+
+    Formatting is left to the listener thread: only the traceback, which
+    can't safely cross threads, is rendered here.
+    """
+
+    def __init__(self, log_queue: "queue.Queue[logging.LogRecord]"):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+_listener: Optional[QueueListener] = None
+_queue_handler: Optional[DroppingQueueHandler] = None
+
+
+def configure_logging(
+    level: str = "INFO",
+    json_output: bool = True,
+    queue_size: int = 10_000,
+    sample_rates: Optional[Dict[str, float]] = None,
+    rate_limit_per_minute: int = 0,
+) -> DroppingQueueHandler:
+    """Route the root logger through a bounded queue to a stdout writer thread"""
+    global _listener, _queue_handler
+    if _listener is not None:
+        _listener.stop()
+
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(
+        JsonFormatter() if json_output else logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+    )
+    log_queue: "queue.Queue[logging.LogRecord]" = queue.Queue(maxsize=queue_size)
+    _queue_handler = DroppingQueueHandler(log_queue)
+    if sample_rates:
+        _queue_handler.addFilter(SamplingFilter(sample_rates))
+    if rate_limit_per_minute > 0:
+        _queue_handler.addFilter(RateLimitFilter(rate_limit_per_minute))
+
+    root = logging.getLogger()
+    for handler in [h for h in root.handlers if isinstance(h, DroppingQueueHandler)]:
+        root.removeHandler(handler)
+    root.addHandler(_queue_handler)
+    root.setLevel(level.upper())
+
+    _listener = QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    _listener.start()
+    return _queue_handler
+
+
+def stop_logging() -> None:
+    """Flush queued records and stop the writer thread"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def logging_stats() -> Dict:
+    if _queue_handler is None:
+        return {"queueDepth": 0, "dropped": 0}
+    return {"queueDepth": _queue_handler.queue.qsize(), "dropped": _queue_handler.dropped}
+
+
+atexit.register(stop_logging)
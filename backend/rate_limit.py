@@ -0,0 +1,253 @@
+"""Token-bucket rate limiting with state shared across worker processes"""
+
+import asyncio
+import logging
+import math
+import re
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+_RATE = re.compile(r"^\s*(\d+)\s*/\s*(second|minute|hour|day)\s*$")
+_PERIODS = {"second": 1, "minute": 60, "hour": 3600, "day": 86400}
+
+
+class RateLimited(Exception):
+    """Raised when a bucket is empty; ``retry_after`` is in seconds"""
+
+    def __init__(self, scope: str, retry_after: int):
+        super().__init__(f"Rate limit exceeded for {scope}")
+        self.scope = scope
+        self.retry_after = retry_after
+
+
+class BucketRule:
+    """A bucket of ``capacity`` tokens refilled continuously at ``refill_rate`` tokens/second"""
+
+    __slots__ = ("name", "capacity", "refill_rate")
+
+    def __init__(self, name: str, capacity: float, refill_rate: float):
+        self.name = name
+        self.capacity = capacity
+        self.refill_rate = refill_rate
+
+    @classmethod
+    def parse(cls, name: str, rate: str) -> "BucketRule":
+        """Build a rule from a slowapi-style string such as ``"10/minute"``"""
+        match = _RATE.match(rate)
+        if not match:
+            raise ValueError(f"Invalid rate limit {rate!r}; expected e.g. '10/minute'")
+        count = int(match.group(1))
+        return cls(name, capacity=count, refill_rate=count / _PERIODS[match.group(2)])
+
+    @property
+    def idle_seconds(self) -> float:
+        """After this long untouched a bucket is full again, so its state can be dropped"""
+        return self.capacity / self.refill_rate if self.refill_rate else math.inf
+
+
+def refill(tokens: float, updated_at: float, now: float, rule: BucketRule) -> float:
+    return min(rule.capacity, tokens + max(0.0, now - updated_at) * rule.refill_rate)
+
+
+def retry_after(tokens: float, rule: BucketRule) -> int:
+    if not rule.refill_rate:
+        return 3600
+    return max(1, math.ceil((1 - tokens) / rule.refill_rate))
+
+
+class MemoryBucketStorage:
+    """Per-process bucket state; limits are per worker"""
+
+    blocking = False
+
+    def __init__(self):
+        self._buckets: Dict[str, Tuple[float, float]] = {}
+
+    def take(self, key: str, rule: BucketRule, now: float) -> Tuple[bool, float]:
+        tokens, updated_at = self._buckets.get(key, (rule.capacity, now))
+        tokens = refill(tokens, updated_at, now, rule)
+        allowed = tokens >= 1
+        if allowed:
+            tokens -= 1
+        self._buckets[key] = (tokens, now)
+        return allowed, tokens
+
+    def give_back(self, key: str, rule: BucketRule) -> None:
+        if key in self._buckets:
+            tokens, updated_at = self._buckets[key]
+            self._buckets[key] = (min(rule.capacity, tokens + 1), updated_at)
+
+    def sweep(self, older_than: float) -> int:
+        idle = [key for key, (_, updated_at) in self._buckets.items() if updated_at < older_than]
+        for key in idle:
+            del self._buckets[key]
+        return len(idle)
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+
+class SQLiteBucketStorage:
+    """Bucket state in a local SQLite (WAL) file shared by every worker on the host.
+
+    Each take is one short ``BEGIN IMMEDIATE`` transaction, so concurrent
+    workers serialize on the row and the limit holds across processes.
+    Waiting for another worker's write lock is capped at ``busy_timeout_ms``.
+    The connection is opened lazily on first use.
+    """
+
+    blocking = True
+
+    def __init__(self, path: str, busy_timeout_ms: int = 50):
+        self.path = path
+        self.busy_timeout_ms = busy_timeout_ms
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        if self._conn is None:
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(f"PRAGMA busy_timeout={int(self.busy_timeout_ms)}")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS buckets "
+                "(key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated_at REAL NOT NULL)"
+            )
+            self._conn = conn
+        return self._conn
+
+    def _transaction(self, fn):
+        with self._lock:
+            conn = self.conn
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                result = fn(conn)
+                conn.execute("COMMIT")
+                return result
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+
+    def take(self, key: str, rule: BucketRule, now: float) -> Tuple[bool, float]:
+        def apply(conn: sqlite3.Connection) -> Tuple[bool, float]:
+            row = conn.execute("SELECT tokens, updated_at FROM buckets WHERE key = ?", (key,)).fetchone()
+            tokens = refill(row[0], row[1], now, rule) if row else rule.capacity
+            allowed = tokens >= 1
+            if allowed:
+                tokens -= 1
+            conn.execute(
+                "INSERT INTO buckets (key, tokens, updated_at) VALUES (?, ?, ?) "
+                "ON CONFLICT (key) DO UPDATE SET tokens = excluded.tokens, updated_at = excluded.updated_at",
+                (key, tokens, now),
+            )
+            return allowed, tokens
+
+        return self._transaction(apply)
+
+    def give_back(self, key: str, rule: BucketRule) -> None:
+        self._transaction(lambda conn: conn.execute(
+            "UPDATE buckets SET tokens = min(?, tokens + 1) WHERE key = ?", (rule.capacity, key)
+        ))
+
+    def sweep(self, older_than: float) -> int:
+        return self._transaction(
+            lambda conn: conn.execute("DELETE FROM buckets WHERE updated_at < ?", (older_than,)).rowcount
+        )
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self.conn.execute("SELECT COUNT(*) FROM buckets").fetchone()[0]
+
+
+class TokenBucketLimiter:
+    """Checks a request against a per-IP bucket and, when known, a per-session bucket.
+
+    ``check`` is the entry point for request handlers: with blocking storage
+    it runs on one dedicated thread (shared with the sweeper) so a worker
+    waiting on the SQLite write lock never stalls the event loop, and it
+    fails open when the storage errors, since refusing chat because the
+    limiter's file is busy would be worse than briefly not limiting.
+    """
+
+    def __init__(self, storage, ip_rule: BucketRule, session_rule: BucketRule, sweep_interval: float = 300.0):
+        self.storage = storage
+        self.ip_rule = ip_rule
+        self.session_rule = session_rule
+        self.sweep_interval = sweep_interval
+        self.rejections = {ip_rule.name: 0, session_rule.name: 0}
+        self.errors = 0
+        self._executor = (
+            ThreadPoolExecutor(max_workers=1, thread_name_prefix="rate-limit") if storage.blocking else None
+        )
+
+    def hit(self, client_ip: str, session_id: Optional[str] = None) -> None:
+        """Consume one token from each applicable bucket or raise ``RateLimited``"""
+        now = time.time()
+        ip_key = f"{self.ip_rule.name}:{client_ip}"
+        allowed, tokens = self.storage.take(ip_key, self.ip_rule, now)
+        if not allowed:
+            self.rejections[self.ip_rule.name] += 1
+            raise RateLimited(self.ip_rule.name, retry_after(tokens, self.ip_rule))
+
+        if session_id:
+            allowed, tokens = self.storage.take(f"{self.session_rule.name}:{session_id}", self.session_rule, now)
+            if not allowed:
+                # Don't charge the IP for a request that was refused
+                self.storage.give_back(ip_key, self.ip_rule)
+                self.rejections[self.session_rule.name] += 1
+                raise RateLimited(self.session_rule.name, retry_after(tokens, self.session_rule))
+
+    async def check(self, client_ip: str, session_id: Optional[str] = None) -> None:
+        """``hit`` without blocking the event loop; storage errors let the request through"""
+        try:
+            if self._executor is None:
+                self.hit(client_ip, session_id)
+            else:
+                await asyncio.get_running_loop().run_in_executor(self._executor, self.hit, client_ip, session_id)
+        except sqlite3.Error as e:
+            self.errors += 1
+            logger.warning("Rate limit storage unavailable, allowing request: %s", e)
+
+    def sweep(self) -> int:
+        """Drop buckets idle long enough to have refilled completely"""
+        idle_for = max(self.ip_rule.idle_seconds, self.session_rule.idle_seconds)
+        return self.storage.sweep(time.time() - idle_for)
+
+    async def run_sweeper(self) -> None:
+        while True:
+            await asyncio.sleep(self.sweep_interval)
+            try:
+                if self._executor is None:
+                    removed = self.sweep()
+                else:
+                    removed = await asyncio.get_running_loop().run_in_executor(self._executor, self.sweep)
+            except sqlite3.Error as e:
+                logger.error("Rate limit sweep failed: %s", e)
+                continue
+            if removed:
+                logger.info("Rate limit sweeper dropped %d idle buckets", removed)
+
+    async def stats(self) -> Dict:
+        try:
+            if self._executor is None:
+                buckets = len(self.storage)
+            else:
+                buckets = await asyncio.get_running_loop().run_in_executor(self._executor, len, self.storage)
+        except sqlite3.Error as e:
+            logger.warning("Rate limit storage unavailable for stats: %s", e)
+            buckets = None
+        return {
+            "storage": type(self.storage).__name__,
+            "buckets": buckets,
+            "rejections": dict(self.rejections),
+            "errors": self.errors,
+        }
@@ -0,0 +1,254 @@
+"""Retries, hedged requests and a circuit breaker around the Venice upstream"""
+
+import asyncio
+import random
+import time
+from collections import deque
+from typing import Awaitable, Callable, Deque, Dict, Optional
+
+import httpx
+
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+# Failures that happen before the upstream saw the request are always safe to retry
+RETRYABLE_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout, httpx.RemoteProtocolError)
+
+
+class UpstreamUnavailable(Exception):
+    """Raised while the circuit breaker is open; ``retry_after`` is in seconds"""
+
+    def __init__(self, reason: str, retry_after: int):
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker.
+
+    After ``failure_threshold`` consecutive failures the circuit opens and
+    calls are rejected for ``reset_timeout`` seconds. It then lets a single
+    trial call through (half-open); success closes it again, failure re-opens.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.trial_in_flight = False
+        self.rejected = 0
+        self.opened = 0
+
+    def check(self) -> None:
+        """Fail fast while open, without claiming the half-open trial"""
+        if self.state == self.OPEN:
+            remaining = self.reset_timeout - (time.monotonic() - self.opened_at)
+            if remaining > 0:
+                self.rejected += 1
+                raise UpstreamUnavailable("Venice AI upstream is unavailable", max(1, int(remaining + 0.999)))
+
+    def allow(self) -> None:
+        """Admit a call, claiming the trial slot when half-open; raises while open"""
+        if self.state == self.CLOSED:
+            return
+        elapsed = time.monotonic() - self.opened_at
+        if self.state == self.OPEN and elapsed >= self.reset_timeout:
+            self.state = self.HALF_OPEN
+        if self.state == self.HALF_OPEN and not self.trial_in_flight:
+            self.trial_in_flight = True
+            return
+        self.rejected += 1
+        retry_after = max(1, int(self.reset_timeout - elapsed + 0.999))
+        raise UpstreamUnavailable("Venice AI upstream is unavailable", retry_after)
+
+    def record_success(self) -> None:
+        self.state = self.CLOSED
+        self.failures = 0
+        self.trial_in_flight = False
+
+    def abandon_trial(self) -> None:
+        """Free the half-open trial slot without recording an outcome"""
+        self.trial_in_flight = False
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        # Only the transition into OPEN starts the timeout; late failures don't extend it
+        if self.state != self.OPEN and (self.state == self.HALF_OPEN or self.failures >= self.failure_threshold):
+            self.opened += 1
+            self.state = self.OPEN
+            self.opened_at = time.monotonic()
+        self.trial_in_flight = False
+
+    def stats(self) -> Dict:
+        return {
+            "state": self.state,
+            "consecutiveFailures": self.failures,
+            "opened": self.opened,
+            "rejected": self.rejected,
+        }
+
+
+class LatencyTracker:
+    """Sliding window of recent successful call latencies"""
+
+    def __init__(self, window: int = 200):
+        self.samples: Deque[float] = deque(maxlen=window)
+
+    def record(self, seconds: float) -> None:
+        self.samples.append(seconds)
+
+    def percentile(self, pct: float) -> Optional[float]:
+        if not self.samples:
+            return None
+        ordered = sorted(self.samples)
+        index = min(len(ordered) - 1, int(len(ordered) * pct / 100))
+        return ordered[index]
+
+
+def parse_retry_after(response: httpx.Response) -> Optional[float]:
+    value = response.headers.get("retry-after")
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        return None
+
+
+class ResilientUpstream:
+    """Wraps an upstream send with retries, optional hedging and a circuit breaker.
+
+    Retryable failures (connect errors, 429 and 5xx) are retried up to
+    ``max_retries`` times with capped exponential backoff and full jitter; a
+    ``Retry-After`` header is honored when it is no longer than
+    ``max_retry_after``, otherwise the call gives up immediately. With
+    hedging enabled, a duplicate request is fired once the first has been
+    outstanding longer than the ``hedge_percentile`` of recent latencies, and
+    whichever answers first wins. The breaker sees one outcome per call,
+    however many attempts it took.
+    """
+
+    def __init__(
+        self,
+        breaker: CircuitBreaker,
+        max_retries: int = 2,
+        base_delay: float = 0.25,
+        max_delay: float = 4.0,
+        max_retry_after: float = 10.0,
+        hedge_enabled: bool = False,
+        hedge_percentile: float = 95.0,
+        hedge_min_samples: int = 20,
+    ):
+        self.breaker = breaker
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.max_retry_after = max_retry_after
+        self.hedge_enabled = hedge_enabled
+        self.hedge_percentile = hedge_percentile
+        self.hedge_min_samples = hedge_min_samples
+        self.latency = LatencyTracker()
+        self.retries = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+
+    def backoff(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+        if retry_after is not None:
+            delay = max(delay, retry_after)
+        return delay
+
+    def hedge_delay(self) -> Optional[float]:
+        if not self.hedge_enabled or len(self.latency.samples) < self.hedge_min_samples:
+            return None
+        return self.latency.percentile(self.hedge_percentile)
+
+    async def _timed(self, send: Callable[[], Awaitable[httpx.Response]]) -> httpx.Response:
+        started = time.monotonic()
+        response = await send()
+        if response.status_code < 500:
+            self.latency.record(time.monotonic() - started)
+        return response
+
+    async def _send_hedged(self, send: Callable[[], Awaitable[httpx.Response]]) -> httpx.Response:
+        delay = self.hedge_delay()
+        if delay is None:
+            return await self._timed(send)
+
+        primary = asyncio.ensure_future(self._timed(send))
+        done, _ = await asyncio.wait({primary}, timeout=delay)
+        if done:
+            return primary.result()
+
+        self.hedges += 1
+        hedge = asyncio.ensure_future(self._timed(send))
+        pending = {primary, hedge}
+        last: Optional[asyncio.Future] = None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    last = task
+                    if task.exception() is None and task.result().status_code not in RETRYABLE_STATUS:
+                        if task is hedge:
+                            self.hedge_wins += 1
+                        return task.result()
+            return last.result()
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def call(self, send: Callable[[], Awaitable[httpx.Response]]) -> httpx.Response:
+        """Send with retries; returns the final response or raises the final transport error"""
+        self.breaker.allow()
+        attempt = 0
+        while True:
+            retry_after = None
+            try:
+                response = await self._send_hedged(send)
+            except RETRYABLE_ERRORS:
+                if attempt >= self.max_retries:
+                    self.breaker.record_failure()
+                    raise
+            except httpx.HTTPError:
+                self.breaker.record_failure()
+                raise
+            except asyncio.CancelledError:
+                # The caller went away; that says nothing about upstream health
+                self.breaker.abandon_trial()
+                raise
+            else:
+                if response.status_code not in RETRYABLE_STATUS:
+                    self.breaker.record_success()
+                    return response
+                retry_after = parse_retry_after(response)
+                if attempt >= self.max_retries or (
+                    retry_after is not None and retry_after > self.max_retry_after
+                ):
+                    self.breaker.record_failure()
+                    return response
+
+            await asyncio.sleep(self.backoff(attempt, retry_after))
+            attempt += 1
+            self.retries += 1
+            try:
+                # Stop retrying if other calls opened the circuit meanwhile
+                self.breaker.check()
+            except UpstreamUnavailable:
+                self.breaker.record_failure()
+                raise
+
+    def stats(self) -> Dict:
+        p95 = self.latency.percentile(95)
+        return {
+            "circuitBreaker": self.breaker.stats(),
+            "retries": self.retries,
+            "hedges": self.hedges,
+            "hedgeWins": self.hedge_wins,
+            "latencyP95Seconds": round(p95, 4) if p95 is not None else None,
+        }
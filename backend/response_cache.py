@@ -0,0 +1,105 @@
+"""TTL + LRU cache of chat completions keyed on the normalized prompt and its context"""
+
+import hashlib
+import json
+import logging
+import re
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import orjson
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE = re.compile(r"\s+")
+_TRAILING_PUNCTUATION = re.compile(r"[\s?!.]+$")
+
+
+def normalize_message(text: str) -> str:
+    """Case-fold and collapse whitespace so trivially different phrasings share a key"""
+    text = _WHITESPACE.sub(" ", text.strip().lower())
+    return _TRAILING_PUNCTUATION.sub("", text)
+
+
+def context_hash(context_messages: List[Dict]) -> str:
+    """Hash everything sent ahead of the user message (system prompt, summary, history)"""
+    encoded = orjson.dumps([(m["role"], m["content"]) for m in context_messages])
+    return hashlib.sha256(encoded).hexdigest()
+
+
+def make_cache_key(user_message: str, context_messages: List[Dict]) -> str:
+    raw = normalize_message(user_message) + "\0" + context_hash(context_messages)
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+class ResponseCache:
+    """Bounded LRU of responses with per-entry expiry.
+
+    Entries stored with ``ttl=None`` (e.g. curated FAQ answers) never expire
+    but remain subject to LRU eviction.
+    """
+
+    def __init__(self, max_entries: int = 1000, ttl_seconds: float = 3600.0):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, Tuple[str, Optional[float]]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.bypasses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: str) -> Optional[str]:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        response, expires_at = entry
+        if expires_at is not None and expires_at < time.monotonic():
+            del self._entries[key]
+            self.expirations += 1
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return response
+
+    def set(self, key: str, response: str, ttl: Optional[float] = -1) -> None:
+        """Store ``response``; ``ttl=-1`` uses the cache default and ``None`` never expires"""
+        if ttl == -1:
+            ttl = self.ttl_seconds
+        expires_at = None if ttl is None else time.monotonic() + ttl
+        self._entries[key] = (response, expires_at)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def record_bypass(self) -> None:
+        self.bypasses += 1
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def prewarm(self, faq_path: Path, context_messages: List[Dict]) -> int:
+        """Load ``[{"question": ..., "answer": ...}]`` entries as non-expiring first-turn answers"""
+        with open(faq_path, encoding="utf-8") as f:
+            entries = json.load(f)
+        for entry in entries:
+            self.set(make_cache_key(entry["question"], context_messages), entry["answer"], ttl=None)
+        return len(entries)
+
+    def stats(self) -> Dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "maxEntries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hitRatio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "bypasses": self.bypasses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
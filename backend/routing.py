@@ -0,0 +1,213 @@
+"""Per-prompt model routing with latency-SLO failover"""
+
+import json
+import logging
+import re
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+import orjson
+
+from resilience import LatencyTracker
+
+logger = logging.getLogger(__name__)
+
+_WORDS = re.compile(r"[a-z0-9']+")
+_SECOND_PERSON = re.compile(r"\b(?:you|your|yours|yourself)\b")
+
+
+class Route:
+    """One row of the routing table: the model and request settings for a class of prompt.
+
+    ``slo_ms`` is the p95 latency budget for a complete reply on this route;
+    while it is breached, prompts for this route go to ``fallback`` instead.
+    """
+
+    __slots__ = ("name", "model", "web_search", "max_completion_tokens", "slo_ms", "fallback", "venice_parameters")
+
+    def __init__(
+        self,
+        name: str,
+        model: str,
+        web_search: str = "auto",
+        max_completion_tokens: int = 512,
+        slo_ms: Optional[float] = None,
+        fallback: Optional[str] = None,
+    ):
+        if web_search not in ("on", "off", "auto"):
+            raise ValueError(f"Route {name!r}: webSearch must be 'on', 'off' or 'auto', not {web_search!r}")
+        self.name = name
+        self.model = model
+        self.web_search = web_search
+        self.max_completion_tokens = max_completion_tokens
+        self.slo_ms = slo_ms
+        self.fallback = fallback
+        # Encoded once; spliced into every request body for this route
+        self.venice_parameters = orjson.Fragment(orjson.dumps({
+            "include_venice_system_prompt": False,
+            "enable_web_search": web_search,
+        }))
+
+    @classmethod
+    def from_dict(cls, name: str, data: Dict) -> "Route":
+        return cls(
+            name,
+            model=data["model"],
+            web_search=data.get("webSearch", "auto"),
+            max_completion_tokens=int(data.get("maxCompletionTokens", 512)),
+            slo_ms=data.get("sloMs"),
+            fallback=data.get("fallback"),
+        )
+
+
+def keyword_pattern(terms: Iterable[str]) -> Optional[re.Pattern]:
+    """One regex matching any of ``terms`` as whole words or phrases"""
+    terms = sorted({t.lower().strip() for t in terms if t.strip()}, key=len, reverse=True)
+    if not terms:
+        return None
+    return re.compile(r"\b(?:" + "|".join(re.escape(t) for t in terms) + r")\b")
+
+
+class ModelRouter:
+    """Classifies prompts into routes and fails a route over while its p95 latency breaches its SLO.
+
+    Classification is a few regex checks, in order: prompts asking for fresh
+    information (``fresh`` keywords) get the ``fresh`` route; short
+    greetings and thanks (at most ``smalltalkMaxWords`` words) get
+    ``smalltalk``; short questions about the portfolio owner, naming them
+    (``portfolio`` keywords) or asking "you" about one of the
+    ``portfolioTopics``, get ``portfolio``; everything else gets the
+    default route. Prompts grounded in local content that are also
+    addressed to the owner ("you", or a ``portfolio`` keyword) go to
+    ``grounded_route`` when one is set, unless they need fresh information;
+    other grounded prompts keep their classified route.
+
+    Latency is observed per route for complete (non-streamed) replies. Once
+    a route has ``min_samples`` samples and its p95 exceeds ``slo_ms``, it
+    is failed over to its ``fallback`` for ``cooldown`` seconds; its samples
+    are then discarded so the route is judged afresh when traffic returns.
+    """
+
+    def __init__(
+        self,
+        routes: Dict[str, Route],
+        default: str,
+        rules: Optional[Dict] = None,
+        grounded_route: Optional[str] = None,
+        window: int = 100,
+        min_samples: int = 20,
+        cooldown: float = 60.0,
+    ):
+        if default not in routes:
+            raise ValueError(f"Default route {default!r} is not in the routing table")
+        if grounded_route is not None and grounded_route not in routes:
+            raise ValueError(f"Grounded route {grounded_route!r} is not in the routing table")
+        for route in routes.values():
+            if route.fallback is not None and route.fallback not in routes:
+                raise ValueError(f"Route {route.name!r} falls back to unknown route {route.fallback!r}")
+        rules = rules or {}
+        self.routes = routes
+        self.default = default
+        self.grounded_route = grounded_route
+        self.window = window
+        self.min_samples = min_samples
+        self.cooldown = cooldown
+        self.smalltalk_max_words = int(rules.get("smalltalkMaxWords", 4))
+        self.portfolio_max_chars = int(rules.get("portfolioMaxChars", 300))
+        self.patterns = {
+            name: keyword_pattern(rules.get(name, ()))
+            for name in ("fresh", "smalltalk", "portfolio", "portfolioTopics")
+        }
+        self.latency = {name: LatencyTracker(window) for name in routes}
+        self.failed_over_until: Dict[str, float] = {}
+        self.classified = {name: 0 for name in routes}
+        self.failovers = {name: 0 for name in routes}
+
+    @classmethod
+    def from_file(cls, path: Path, **kwargs) -> "ModelRouter":
+        config = json.loads(path.read_text())
+        routes = {name: Route.from_dict(name, data) for name, data in config["routes"].items()}
+        return cls(routes, config["default"], config.get("rules"), config.get("groundedRoute"), **kwargs)
+
+    def _matches(self, name: str, text: str) -> bool:
+        pattern = self.patterns[name]
+        return name in self.routes and pattern is not None and pattern.search(text) is not None
+
+    def _about_owner(self, text: str) -> bool:
+        """Names the owner, or asks "you" about their background, projects and so on"""
+        if self._matches("portfolio", text):
+            return True
+        topics = self.patterns["portfolioTopics"]
+        return (
+            "portfolio" in self.routes and topics is not None
+            and _SECOND_PERSON.search(text) is not None and topics.search(text) is not None
+        )
+
+    def _addresses_owner(self, text: str) -> bool:
+        return _SECOND_PERSON.search(text) is not None or self._matches("portfolio", text)
+
+    def classify(self, message: str) -> str:
+        text = message.lower()
+        if self._matches("fresh", text):
+            return "fresh"
+        if "smalltalk" in self.routes and len(_WORDS.findall(text)) <= self.smalltalk_max_words:
+            if not _WORDS.search(text) or self._matches("smalltalk", text):
+                return "smalltalk"
+        if len(text) <= self.portfolio_max_chars and self._about_owner(text):
+            return "portfolio"
+        return self.default
+
+    def failed_over(self, name: str) -> bool:
+        until = self.failed_over_until.get(name)
+        if until is None:
+            return False
+        if time.monotonic() < until:
+            return True
+        del self.failed_over_until[name]
+        logger.info("Route %s is back after its failover cooldown", name)
+        return False
+
+    def select(self, message: str, grounded: bool = False) -> Route:
+        """The route to use for ``message``, after failover"""
+        name = self.classify(message)
+        if grounded and self.grounded_route and name != "fresh" and self._addresses_owner(message.lower()):
+            name = self.grounded_route
+        self.classified[name] += 1
+        seen: List[str] = []
+        route = self.routes[name]
+        while route.fallback is not None and route.name not in seen and self.failed_over(route.name):
+            seen.append(route.name)
+            route = self.routes[route.fallback]
+        return route
+
+    def observe(self, route: Route, seconds: float) -> None:
+        """Record a complete reply's latency and fail the route over if its p95 breaches the SLO"""
+        tracker = self.latency[route.name]
+        tracker.record(seconds)
+        if route.slo_ms is None or route.fallback is None or len(tracker.samples) < self.min_samples:
+            return
+        p95 = tracker.percentile(95)
+        if p95 * 1000 > route.slo_ms and route.name not in self.failed_over_until:
+            self.failed_over_until[route.name] = time.monotonic() + self.cooldown
+            self.failovers[route.name] += 1
+            tracker.samples.clear()
+            logger.warning(
+                "Route %s p95 %.0fms is over its %.0fms SLO; using %s for %.0fs",
+                route.name, p95 * 1000, route.slo_ms, route.fallback, self.cooldown,
+            )
+
+    def stats(self) -> Dict:
+        routes = {}
+        for name, route in self.routes.items():
+            p95 = self.latency[name].percentile(95)
+            routes[name] = {
+                "model": route.model,
+                "webSearch": route.web_search,
+                "classified": self.classified[name],
+                "p95Ms": round(p95 * 1000, 1) if p95 is not None else None,
+                "sloMs": route.slo_ms,
+                "failedOver": self.failed_over(name),
+                "failovers": self.failovers[name],
+            }
+        return {"default": self.default, "routes": routes}
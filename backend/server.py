@@ -1,40 +1,323 @@
-from fastapi import FastAPI, APIRouter, HTTPException, Request
-from fastapi.responses import JSONResponse
+from fastapi import FastAPI, APIRouter, HTTPException, Request, WebSocket
+from fastapi.responses import JSONResponse, ORJSONResponse, Response, StreamingResponse
 from dotenv import load_dotenv
+from starlette.background import BackgroundTask
 from starlette.middleware.cors import CORSMiddleware
+from starlette.requests import HTTPConnection
 import os
 import logging
 from pathlib import Path
 from pydantic import BaseModel, Field, EmailStr
-from typing import List, Optional, Dict
+from typing import AsyncIterator, List, Optional, Dict
 import uuid
 from datetime import datetime
 import httpx
-import smtplib
+import orjson
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 import asyncio
-from slowapi import Limiter, _rate_limit_exceeded_handler
-from slowapi.util import get_remote_address
-from slowapi.errors import RateLimitExceeded
-from slowapi.middleware import SlowAPIMiddleware
+import time
+from contextlib import aclosing, asynccontextmanager
+
+from admission import AdmissionController, AdmissionRejected
+from cassette import LIVE, Cassette, CassetteTransport
+from chat_socket import TRY_AGAIN_LATER, ChatSocket, SocketHub
+from contact_outbox import ContactOutbox
+from context import build_context
+from email_worker import EmailWorker, is_permanent_error
+from knowledge import KnowledgeIndex, KnowledgeMatch, content_documents, faq_documents
+from logging_config import configure_logging, logging_stats
+from metrics import CONTENT_TYPE, MetricsMiddleware, Registry
+from disconnect import ClientDisconnected, DisconnectGuard
+from rate_limit import BucketRule, MemoryBucketStorage, RateLimited, SQLiteBucketStorage, TokenBucketLimiter
+from resilience import RETRYABLE_STATUS, CircuitBreaker, ResilientUpstream, UpstreamUnavailable
+from response_cache import ResponseCache, make_cache_key
+from routing import ModelRouter, Route
+from session_store import ChatSession, InMemorySessionStore, SessionStore
+from singleflight import SingleFlight
+from static_content import StaticContent
+from timing import ServerTimingMiddleware, SlowRequestProfiler, httpx_trace, phase, timed_endpoint
 
 
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
 load_dotenv(ROOT_DIR / '.env')
 
-# In-memory storage for chat sessions
-chat_sessions: Dict[str, Dict] = {}
+# Prometheus metrics exposed at /metrics; state other components already
+# track is read at scrape time (see register_metric_callbacks)
+metrics_registry = Registry()
+http_request_seconds = metrics_registry.histogram(
+    "http_request_duration_seconds", "HTTP request latency", ("method", "route", "status")
+)
+venice_request_seconds = metrics_registry.histogram(
+    "venice_request_duration_seconds", "Venice API latency per attempt, until response headers", ("endpoint",)
+)
+venice_responses = metrics_registry.counter(
+    "venice_responses_total", "Venice API responses by HTTP status, or transport error name", ("endpoint", "status")
+)
+venice_tokens = metrics_registry.counter("venice_tokens_total", "Tokens billed by Venice AI", ("type",))
+chat_routes = metrics_registry.counter("chat_routes_total", "Chat prompts by route served and model", ("route", "model"))
+email_send_seconds = metrics_registry.histogram("email_send_duration_seconds", "SMTP send time per message")
+
+# Chat session storage: bounded in-memory store by default, or a SQLite (WAL)
+# database shared by all workers on the host
+SESSION_BACKEND = os.getenv("SESSION_BACKEND", "memory").lower()
+SESSION_DB_PATH = os.getenv("SESSION_DB_PATH", str(ROOT_DIR / "data" / "sessions.db"))
+
+
+def create_session_store() -> SessionStore:
+    max_sessions = int(os.getenv("SESSION_MAX_COUNT", 10000))
+    ttl_seconds = float(os.getenv("SESSION_TTL_SECONDS", 3600))
+    sweep_interval = float(os.getenv("SESSION_SWEEP_INTERVAL", 60))
+    if SESSION_BACKEND == "sqlite":
+        from sqlite_session_store import SQLiteSessionStore
+
+        return SQLiteSessionStore(
+            SESSION_DB_PATH,
+            ttl_seconds=ttl_seconds,
+            max_sessions=max_sessions,
+            flush_interval=float(os.getenv("SESSION_FLUSH_INTERVAL", 0.05)),
+            cache_size=int(os.getenv("SESSION_CACHE_SIZE", 1000)),
+            cache_ttl=float(os.getenv("SESSION_CACHE_TTL", 1.0)),
+            sweep_interval=sweep_interval,
+        )
+    return InMemorySessionStore(
+        max_sessions=max_sessions,
+        ttl_seconds=ttl_seconds,
+        max_bytes=int(os.getenv("SESSION_MAX_BYTES", 128 * 1024 * 1024)),
+        sweep_interval=sweep_interval,
+    )
+
+
+chat_sessions = create_session_store()
+SESSION_MAX_MESSAGES = int(os.getenv("SESSION_MAX_MESSAGES", 100))
+
+# Chat over WebSocket: one heartbeat timer for all sockets, a per-connection
+# inbound frame limit and a bounded outbound buffer per socket
+chat_socket_hub = SocketHub(
+    max_connections=int(os.getenv("CHAT_WS_MAX_CONNECTIONS", 5000)),
+    heartbeat_interval=float(os.getenv("CHAT_WS_HEARTBEAT_INTERVAL", 25)),
+    idle_timeout=float(os.getenv("CHAT_WS_IDLE_TIMEOUT", 60)),
+)
+CHAT_WS_FRAME_RATE = os.getenv("CHAT_WS_FRAME_RATE", "120/minute")
+CHAT_WS_MAX_BUFFERED_BYTES = int(os.getenv("CHAT_WS_MAX_BUFFERED_BYTES", 256 * 1024))
+CHAT_WS_MAX_FRAME_BYTES = int(os.getenv("CHAT_WS_MAX_FRAME_BYTES", 16 * 1024))
+
+# Prompt context sizing: input-token budget per request and cap on the rolling summary
+CONTEXT_TOKEN_BUDGET = int(os.getenv("CONTEXT_TOKEN_BUDGET", 3000))
+SUMMARY_MAX_TOKENS = int(os.getenv("SUMMARY_MAX_TOKENS", 400))
+
+# Chat response cache for repeated / FAQ-style prompts
+response_cache = ResponseCache(
+    max_entries=int(os.getenv("CHAT_CACHE_MAX_ENTRIES", 1000)),
+    ttl_seconds=float(os.getenv("CHAT_CACHE_TTL_SECONDS", 3600)),
+)
+# Replies that needed live web results go stale quickly; 0 doesn't cache them at all
+CHAT_FRESH_CACHE_TTL_SECONDS = float(os.getenv("CHAT_FRESH_CACHE_TTL_SECONDS", 60))
+CHAT_FAQ_FILE = os.getenv("CHAT_FAQ_FILE", str(ROOT_DIR / "faq.json"))
+
+# Model routing: each prompt is classified into a row of the routing table
+# (model, web search, reply length); a route whose p95 latency breaches its
+# SLO fails over to its fallback for a while
+CHAT_ROUTING_FILE = os.getenv("CHAT_ROUTING_FILE", str(ROOT_DIR / "routing.json"))
+
+
+def create_model_router() -> ModelRouter:
+    options = dict(
+        window=int(os.getenv("ROUTING_LATENCY_WINDOW", 100)),
+        min_samples=int(os.getenv("ROUTING_MIN_SAMPLES", 20)),
+        cooldown=float(os.getenv("ROUTING_FAILOVER_SECONDS", 60)),
+    )
+    if CHAT_ROUTING_FILE and Path(CHAT_ROUTING_FILE).is_file():
+        return ModelRouter.from_file(Path(CHAT_ROUTING_FILE), **options)
+    # Without a table every prompt goes to the large model with web search
+    return ModelRouter({"default": Route("default", "qwen3-235b", web_search="on")}, "default", **options)
+
+
+model_router = create_model_router()
+
+# Batch chat: items per request, and how many of a batch's items run at once
+CHAT_BATCH_MAX_ITEMS = int(os.getenv("CHAT_BATCH_MAX_ITEMS", 50))
+CHAT_BATCH_CONCURRENCY = int(os.getenv("CHAT_BATCH_CONCURRENCY", 4))
+
+# Portfolio knowledge: a BM25 index over the site content and FAQ answers.
+# Clear matches are answered without calling Venice; otherwise the best
+# snippets are given to the model, which then needs no web search
+KNOWLEDGE_ENABLED = os.getenv("KNOWLEDGE_ENABLED", "true").lower() in ("1", "true", "yes")
+knowledge_index = KnowledgeIndex([])
+
+
+def rebuild_knowledge_index(content: Dict) -> None:
+    """Index the site content together with the FAQ; runs whenever the content file is (re)loaded"""
+    global knowledge_index
+    faq = orjson.loads(Path(CHAT_FAQ_FILE).read_bytes()) if CHAT_FAQ_FILE and Path(CHAT_FAQ_FILE).is_file() else []
+    knowledge_index = KnowledgeIndex(
+        content_documents(content) + faq_documents(faq),
+        top_k=int(os.getenv("KNOWLEDGE_TOP_K", 3)),
+        min_score=float(os.getenv("KNOWLEDGE_MIN_SCORE", 2.0)),
+        answer_coverage=float(os.getenv("KNOWLEDGE_ANSWER_COVERAGE", 0.8)),
+        answer_margin=float(os.getenv("KNOWLEDGE_ANSWER_MARGIN", 1.5)),
+        ground_coverage=float(os.getenv("KNOWLEDGE_GROUND_COVERAGE", 0.6)),
+    )
+
+
+# Skills and projects shown on the site, served precompressed with ETags and
+# reloaded when the file changes
+portfolio_content = StaticContent(
+    os.getenv("CONTENT_FILE", str(ROOT_DIR / "content.json")),
+    max_age=int(os.getenv("CONTENT_CACHE_MAX_AGE", 86400)),
+    stale_while_revalidate=int(os.getenv("CONTENT_STALE_WHILE_REVALIDATE", 604800)),
+    reload_interval=float(os.getenv("CONTENT_RELOAD_INTERVAL", 2)),
+    on_load=rebuild_knowledge_index,
+)
+
+# Identical in-flight upstream calls (same cache key) are coalesced into one
+upstream_calls = SingleFlight()
+
+# Cancels upstream work when the browser disconnects mid-request
+disconnect_guard = DisconnectGuard()
+
+# Admission control for upstream calls: concurrency cap plus a bounded, per-client fair queue
+upstream_admission = AdmissionController(
+    max_concurrent=int(os.getenv("UPSTREAM_MAX_CONCURRENCY", 16)),
+    max_queue=int(os.getenv("UPSTREAM_MAX_QUEUE", 64)),
+    max_wait=float(os.getenv("UPSTREAM_MAX_QUEUE_WAIT", 10)),
+)
+
+# Retries, hedging and circuit breaking around Venice calls
+venice_breaker = CircuitBreaker(
+    failure_threshold=int(os.getenv("VENICE_BREAKER_FAILURES", 5)),
+    reset_timeout=float(os.getenv("VENICE_BREAKER_RESET_SECONDS", 30)),
+)
+venice_upstream = ResilientUpstream(
+    venice_breaker,
+    max_retries=int(os.getenv("VENICE_MAX_RETRIES", 2)),
+    base_delay=float(os.getenv("VENICE_RETRY_BASE_DELAY", 0.25)),
+    max_delay=float(os.getenv("VENICE_RETRY_MAX_DELAY", 4)),
+    max_retry_after=float(os.getenv("VENICE_MAX_RETRY_AFTER", 10)),
+    hedge_enabled=os.getenv("VENICE_HEDGE_ENABLED", "false").lower() in ("1", "true", "yes"),
+    hedge_percentile=float(os.getenv("VENICE_HEDGE_PERCENTILE", 95)),
+    hedge_min_samples=int(os.getenv("VENICE_HEDGE_MIN_SAMPLES", 20)),
+)
+
+# Venice AI Configuration
+VENICE_API_KEY = os.getenv("VENICE_API_KEY")
+VENICE_BASE_URL = os.getenv("VENICE_BASE_URL", "https://api.venice.ai/api/v1")
+# live: talk to Venice; record: talk to Venice and save every exchange to the
+# cassette; replay: answer from the cassette only, with no network access
+VENICE_MODE = os.getenv("VENICE_MODE", LIVE).lower()
+VENICE_CASSETTE_PATH = os.getenv("VENICE_CASSETTE_PATH", str(ROOT_DIR / "data" / "venice_cassette.jsonl"))
+VENICE_REPLAY_TIMING = os.getenv("VENICE_REPLAY_TIMING", "false").lower() in ("1", "true", "yes")
+
+# Upstream HTTP client pool configuration
+VENICE_HTTP2 = os.getenv("VENICE_HTTP2", "false").lower() in ("1", "true", "yes")
+VENICE_MAX_CONNECTIONS = int(os.getenv("VENICE_MAX_CONNECTIONS", 100))
+VENICE_MAX_KEEPALIVE = int(os.getenv("VENICE_MAX_KEEPALIVE", 20))
+VENICE_KEEPALIVE_EXPIRY = float(os.getenv("VENICE_KEEPALIVE_EXPIRY", 30.0))
+VENICE_CONNECT_TIMEOUT = float(os.getenv("VENICE_CONNECT_TIMEOUT", 5.0))
+VENICE_READ_TIMEOUT = float(os.getenv("VENICE_READ_TIMEOUT", 30.0))
+VENICE_WRITE_TIMEOUT = float(os.getenv("VENICE_WRITE_TIMEOUT", 10.0))
+VENICE_POOL_TIMEOUT = float(os.getenv("VENICE_POOL_TIMEOUT", 5.0))
+
+
+def create_venice_client() -> httpx.AsyncClient:
+    """Build the shared, keep-alive pooled client used for all Venice calls"""
+    http2 = VENICE_HTTP2
+    if http2:
+        try:
+            import h2  # noqa: F401
+        except ImportError:
+            logger.warning("VENICE_HTTP2 is enabled but the 'h2' package is not installed; using HTTP/1.1")
+            http2 = False
+
+    transport = httpx.AsyncHTTPTransport(
+        http2=http2,
+        limits=httpx.Limits(
+            max_connections=VENICE_MAX_CONNECTIONS,
+            max_keepalive_connections=VENICE_MAX_KEEPALIVE,
+            keepalive_expiry=VENICE_KEEPALIVE_EXPIRY,
+        ),
+    )
+    if VENICE_MODE != LIVE:
+        logger.info("Venice upstream in %s mode using cassette %s", VENICE_MODE, VENICE_CASSETTE_PATH)
+        transport = CassetteTransport(
+            VENICE_MODE, Cassette(VENICE_CASSETTE_PATH), inner=transport, replay_timing=VENICE_REPLAY_TIMING
+        )
+
+    return httpx.AsyncClient(
+        transport=transport,
+        timeout=httpx.Timeout(
+            connect=VENICE_CONNECT_TIMEOUT,
+            read=VENICE_READ_TIMEOUT,
+            write=VENICE_WRITE_TIMEOUT,
+            pool=VENICE_POOL_TIMEOUT,
+        ),
+    )
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Open shared resources on startup and release them on shutdown"""
+    app.state.venice_client = create_venice_client()
+    prewarm_response_cache()
+    await chat_sessions.start()
+    rate_limit_sweeper = asyncio.create_task(chat_rate_limiter.run_sweeper())
+    socket_heartbeat = asyncio.create_task(chat_socket_hub.run())
+    email_worker.start()
+    # Without mail credentials submissions stay pending until the server is configured
+    contact_outbox.start(dispatch=bool(EMAIL_USER and EMAIL_PASS))
+    try:
+        yield
+    finally:
+        rate_limit_sweeper.cancel()
+        socket_heartbeat.cancel()
+        # Open sockets hold their sessions; write them back before the store closes
+        await chat_socket_hub.close_all()
+        await contact_outbox.close()
+        await email_worker.close()
+        await chat_sessions.close()
+        await app.state.venice_client.aclose()
+
 
 # Create the main app without a prefix
-app = FastAPI()
+app = FastAPI(lifespan=lifespan, default_response_class=ORJSONResponse)
+
+# Rate limiting for chat: token buckets per client IP and per session, stored in a
+# SQLite file shared by all workers so limits hold across processes
+RATE_LIMIT_STORAGE = os.getenv("RATE_LIMIT_STORAGE", "sqlite").lower()
+RATE_LIMIT_DB_PATH = os.getenv("RATE_LIMIT_DB_PATH", str(ROOT_DIR / "data" / "ratelimit.db"))
+chat_rate_limiter = TokenBucketLimiter(
+    SQLiteBucketStorage(RATE_LIMIT_DB_PATH, busy_timeout_ms=int(os.getenv("RATE_LIMIT_BUSY_TIMEOUT_MS", 50)))
+    if RATE_LIMIT_STORAGE == "sqlite" else MemoryBucketStorage(),
+    ip_rule=BucketRule.parse("ip", os.getenv("CHAT_RATE_LIMIT_PER_IP", "10/minute")),
+    session_rule=BucketRule.parse("session", os.getenv("CHAT_RATE_LIMIT_PER_SESSION", "10/minute")),
+    sweep_interval=float(os.getenv("RATE_LIMIT_SWEEP_INTERVAL", 300)),
+)
 
-# Rate limiting
-limiter = Limiter(key_func=get_remote_address)
-app.state.limiter = limiter
-app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
-app.add_middleware(SlowAPIMiddleware)
+
+def client_ip(request: HTTPConnection) -> str:
+    return request.client.host if request.client else "127.0.0.1"
+
+
+async def _rate_limited_handler(request: Request, exc: RateLimited):
+    return JSONResponse(
+        status_code=429,
+        content={"error": f"Rate limit exceeded: {exc.scope}"},
+        headers={"Retry-After": str(exc.retry_after)},
+    )
+
+app.add_exception_handler(RateLimited, _rate_limited_handler)
+
+
+async def _service_unavailable_handler(request: Request, exc: Exception):
+    return JSONResponse(
+        status_code=503,
+        content={"detail": f"Chat service unavailable: {exc.reason}"},
+        headers={"Retry-After": str(exc.retry_after)},
+    )
+
+app.add_exception_handler(AdmissionRejected, _service_unavailable_handler)
+app.add_exception_handler(UpstreamUnavailable, _service_unavailable_handler)
 
 # Create a router with the /api prefix
 api_router = APIRouter(prefix="/api")
@@ -44,12 +327,27 @@ api_router = APIRouter(prefix="/api")
 class ChatMessage(BaseModel):
     message: str
     sessionId: Optional[str] = None
+    noCache: bool = False
 
 class ChatResponse(BaseModel):
     response: str
     sessionId: str
     timestamp: datetime = Field(default_factory=datetime.utcnow)
 
+class ChatBatchRequest(BaseModel):
+    items: List[ChatMessage] = Field(min_length=1, max_length=CHAT_BATCH_MAX_ITEMS)
+
+class ChatBatchResult(BaseModel):
+    response: Optional[str] = None
+    sessionId: str
+    timestamp: Optional[datetime] = None
+    error: Optional[str] = None
+
+class ChatBatchResponse(BaseModel):
+    results: List[ChatBatchResult]
+    succeeded: int
+    failed: int
+
 class ContactForm(BaseModel):
     name: str
     email: EmailStr
@@ -62,9 +360,13 @@ class ContactResponse(BaseModel):
     messageId: Optional[str] = None
     error: Optional[str] = None
 
-# Venice AI Configuration
-VENICE_API_KEY = os.getenv("VENICE_API_KEY")
-VENICE_BASE_URL = "https://api.venice.ai/api/v1"
+class ContactStatus(BaseModel):
+    messageId: str
+    status: str
+    attempts: int
+    error: Optional[str] = None
+    createdAt: datetime
+    updatedAt: datetime
 
 # Email Configuration
 EMAIL_HOST = os.getenv('EMAIL_HOST', 'smtp.gmail.com')
@@ -72,131 +374,649 @@ EMAIL_PORT = int(os.getenv('EMAIL_PORT', 587))
 EMAIL_USER = os.getenv('EMAIL_USER')
 EMAIL_PASS = os.getenv('EMAIL_PASS')
 EMAIL_TO = os.getenv('EMAIL_TO', 'tolu.a.shekoni@gmail.com')
+EMAIL_USE_TLS = os.getenv('EMAIL_USE_TLS', 'true').lower() in ('1', 'true', 'yes')
+
+# Outgoing mail goes through one persistent SMTP connection on a dedicated thread
+email_worker = EmailWorker(
+    EMAIL_HOST,
+    EMAIL_PORT,
+    user=EMAIL_USER,
+    password=EMAIL_PASS,
+    use_tls=EMAIL_USE_TLS,
+    batch_size=int(os.getenv('EMAIL_BATCH_SIZE', 20)),
+    queue_size=int(os.getenv('EMAIL_QUEUE_SIZE', 1000)),
+    idle_timeout=float(os.getenv('EMAIL_IDLE_TIMEOUT', 300)),
+    send_latency=email_send_seconds,
+)
+
+
+async def deliver_contact_email(payload: Dict):
+    await email_worker.send(build_contact_email(ContactForm(**payload)))
+    logger.info("Email sent successfully for contact from %s", payload['email'])
+
+
+# Submissions are journaled before they are acknowledged and mailed in the background
+contact_outbox = ContactOutbox(
+    os.getenv('CONTACT_OUTBOX_PATH', str(ROOT_DIR / "data" / "outbox.db")),
+    deliver_contact_email,
+    max_attempts=int(os.getenv('CONTACT_MAX_ATTEMPTS', 5)),
+    base_delay=float(os.getenv('CONTACT_RETRY_DELAY', 5)),
+    retention_seconds=float(os.getenv('CONTACT_RETENTION_DAYS', 7)) * 86400,
+    failed_retention_seconds=float(os.getenv('CONTACT_FAILED_RETENTION_DAYS', 30)) * 86400,
+    is_permanent=is_permanent_error,
+)
+
+# Venice AI request helpers
+SYSTEM_PROMPT = """You are a helpful AI assistant powered by Venice AI. You have access to web search capabilities to provide accurate and up-to-date information. 
+
+You can:
+- Answer questions on any topic using your knowledge and web search
+- Provide explanations, summaries, and insights
+- Help with problem-solving and research
+- Engage in general conversation
+
+When answering questions:
+- Use web search when you need current information or to verify facts
+- Be informative, accurate, and helpful
+- Cite sources when appropriate
+- Keep responses clear and well-structured"""
+
+
+def build_chat_messages(session: Optional[ChatSession], user_message: str) -> List[Dict]:
+    """Build the Venice AI message list: system prompt, summary, budgeted history and the new message"""
+    return build_context(session, SYSTEM_PROMPT, user_message, CONTEXT_TOKEN_BUDGET)
+
+def venice_headers() -> Dict[str, str]:
+    return {
+        "Authorization": f"Bearer {VENICE_API_KEY}",
+        "Content-Type": "application/json"
+    }
+
+# The system prompt never changes, so it is encoded once at startup (as are
+# each route's venice_parameters)
+VENICE_SYSTEM_MESSAGE = orjson.Fragment(orjson.dumps({"role": "system", "content": SYSTEM_PROMPT}))
+
+def consult_knowledge(user_message: str, answer: bool = True) -> KnowledgeMatch:
+    """Look the prompt up in the portfolio knowledge index; a cache bypass passes ``answer=False`` to get a fresh reply"""
+    if not KNOWLEDGE_ENABLED:
+        return KnowledgeMatch(None, [])
+    return knowledge_index.lookup(user_message, answer)
+
+def ground_messages(messages: List[Dict], snippets: List[str]) -> List[Dict]:
+    """Put portfolio snippets in a system message just ahead of the user's message"""
+    if not snippets:
+        return messages
+    facts = "\n".join(f"- {snippet}" for snippet in snippets)
+    note = {
+        "role": "system",
+        "content": "Facts from Tolu Shekoni's portfolio site that may answer the next message. "
+                   "Answer from them where they apply and don't invent details they don't cover:\n" + facts,
+    }
+    return [*messages[:-1], note, messages[-1]]
+
+def select_route(user_message: str, grounded: bool = False) -> Route:
+    """Pick the model and request settings for a prompt"""
+    route = model_router.select(user_message, grounded)
+    chat_routes.labels(route.name, route.model).inc()
+    return route
+
+def venice_request_content(messages: List[Dict], route: Route, stream: bool = False) -> bytes:
+    """Encode the Venice request body; ``messages`` must start with the system prompt, as built by build_chat_messages"""
+    body = {
+        "model": route.model,
+        "messages": [VENICE_SYSTEM_MESSAGE, *messages[1:]],
+        "temperature": 0.7,
+        "max_completion_tokens": route.max_completion_tokens,
+        "venice_parameters": route.venice_parameters
+    }
+    if stream:
+        body["stream"] = True
+    return orjson.dumps(body)
+
+async def save_chat_turn(session_id: str, session: Optional[ChatSession], user_message: str, ai_response: str):
+    """Append a completed user/assistant exchange to the session in place"""
+    if session is None:
+        # Another request may have created the session while this one awaited upstream
+        session = await chat_sessions.fetch(session_id)
+    if session is None:
+        session = ChatSession(max_messages=SESSION_MAX_MESSAGES, summary_max_tokens=SUMMARY_MAX_TOKENS)
+    session.add_turn(user_message, ai_response)
+    # Re-register so the store refreshes LRU order and byte accounting
+    chat_sessions[session_id] = session
+
+def record_venice_usage(usage: Optional[Dict]):
+    """Count the prompt and completion tokens Venice reports for a call"""
+    if not usage:
+        return
+    venice_tokens.labels("prompt").inc(usage.get("prompt_tokens", 0))
+    venice_tokens.labels("completion").inc(usage.get("completion_tokens", 0))
+
+async def timed_venice_call(endpoint: str, send) -> httpx.Response:
+    """Run one Venice request attempt, recording its latency and outcome"""
+    started = time.perf_counter()
+    try:
+        response = await send()
+    except httpx.HTTPError as e:
+        venice_responses.labels(endpoint, type(e).__name__).inc()
+        raise
+    venice_request_seconds.labels(endpoint).observe(time.perf_counter() - started)
+    venice_responses.labels(endpoint, str(response.status_code)).inc()
+    return response
+
+async def fetch_completion(client: httpx.AsyncClient, messages: List[Dict], client_key: str, route: Route) -> str:
+    """Request a chat completion from Venice AI and return the assistant message"""
+    # Don't queue for a slot while the upstream is known to be down
+    venice_breaker.check()
+    async with upstream_admission.slot(client_key):
+        logger.info("Making Venice AI request to: %s/chat/completions", VENICE_BASE_URL)
+        started = time.perf_counter()
+        response = await venice_upstream.call(lambda: timed_venice_call("chat", lambda: client.post(
+            f"{VENICE_BASE_URL}/chat/completions",
+            headers=venice_headers(),
+            content=venice_request_content(messages, route),
+            extensions=httpx_trace("venice")
+        )))
+        if response.status_code == 200:
+            model_router.observe(route, time.perf_counter() - started)
+    
+    if response.status_code != 200:
+        error_detail = response.text
+        try:
+            error_detail = response.json()
+        except Exception:
+            pass
+        logger.error("Venice AI API error: %s - %s", response.status_code, error_detail)
+        raise HTTPException(status_code=500, detail=f"Venice AI API error: {response.status_code}")
+    
+    result = orjson.loads(response.content)
+    record_venice_usage(result.get("usage"))
+    return result["choices"][0]["message"]["content"]
+
+def cache_reply(cache_key: str, route: Route, ai_response: str) -> None:
+    """Cache a reply for later identical prompts; replies from web-search routes only briefly"""
+    if route.web_search != "on":
+        response_cache.set(cache_key, ai_response)
+    elif CHAT_FRESH_CACHE_TTL_SECONDS > 0:
+        response_cache.set(cache_key, ai_response, ttl=CHAT_FRESH_CACHE_TTL_SECONDS)
+
+async def fetch_and_cache_completion(
+    client: httpx.AsyncClient, messages: List[Dict], client_key: str, route: Route, cache_key: str
+) -> str:
+    """Fetch a completion and cache it for later identical prompts"""
+    ai_response = await fetch_completion(client, messages, client_key, route)
+    cache_reply(cache_key, route, ai_response)
+    return ai_response
+
+def chat_cache_key(request: Request, chat_input: ChatMessage, messages: List[Dict]) -> Optional[str]:
+    """Cache key for this turn, or None when the client asked to bypass the cache"""
+    if chat_input.noCache or "no-cache" in request.headers.get("cache-control", "").lower():
+        response_cache.record_bypass()
+        return None
+    return make_cache_key(chat_input.message, messages[:-1])
+
+def prewarm_response_cache():
+    """Seed the response cache with curated first-turn FAQ answers"""
+    if not CHAT_FAQ_FILE or not Path(CHAT_FAQ_FILE).is_file():
+        return
+    try:
+        first_turn_context = build_chat_messages(None, "")[:-1]
+        count = response_cache.prewarm(Path(CHAT_FAQ_FILE), first_turn_context)
+        logger.info("Pre-warmed chat response cache with %d FAQ entries from %s", count, CHAT_FAQ_FILE)
+    except (OSError, ValueError, KeyError) as e:
+        logger.error("Failed to pre-warm chat response cache from %s: %s", CHAT_FAQ_FILE, e)
+
+class UpstreamStreamError(Exception):
+    """A streamed Venice call failed; ``detail`` is what the client is told"""
+
+    def __init__(self, detail: str):
+        super().__init__(detail)
+        self.detail = detail
+
+async def stream_completion(client: httpx.AsyncClient, messages: List[Dict], route: Route) -> AsyncIterator[str]:
+    """Yield the content deltas of a streamed Venice completion, keeping the circuit breaker informed.
+
+    The caller holds the upstream admission slot for the whole stream.
+    """
+    started = time.perf_counter()
+    try:
+        async with client.stream(
+            "POST",
+            f"{VENICE_BASE_URL}/chat/completions",
+            headers=venice_headers(),
+            content=venice_request_content(messages, route, stream=True)
+        ) as response:
+            venice_request_seconds.labels("chat_stream").observe(time.perf_counter() - started)
+            venice_responses.labels("chat_stream", str(response.status_code)).inc()
+            if response.status_code in RETRYABLE_STATUS:
+                venice_breaker.record_failure()
+            else:
+                venice_breaker.record_success()
+            if response.status_code != 200:
+                await response.aread()
+                logger.error("Venice AI API stream error: %s - %s", response.status_code, response.text)
+                raise UpstreamStreamError(f"Venice AI API error: {response.status_code}")
+            
+            async for line in response.aiter_lines():
+                if not line.startswith("data:"):
+                    continue
+                data = line[len("data:"):].strip()
+                if data == "[DONE]":
+                    break
+                try:
+                    chunk = orjson.loads(data)
+                    record_venice_usage(chunk.get("usage"))
+                    delta = chunk["choices"][0].get("delta", {}).get("content")
+                except (ValueError, KeyError, IndexError, AttributeError):
+                    continue
+                if delta:
+                    yield delta
+    except asyncio.CancelledError:
+        venice_breaker.abandon_trial()
+        raise
+    except httpx.HTTPError as e:
+        venice_breaker.record_failure()
+        venice_responses.labels("chat_stream", type(e).__name__).inc()
+        logger.error("Chat stream error: %s", e)
+        raise UpstreamStreamError(f"Chat service error: {str(e)}")
+
+def chat_response(ai_response: str, session_id: str) -> ORJSONResponse:
+    """Serialize a chat reply directly; it is built here, so response_model validation is skipped"""
+    return ORJSONResponse({"response": ai_response, "sessionId": session_id, "timestamp": datetime.utcnow()})
+
+def sse_event(event: str, data: Dict) -> str:
+    """Format a server-sent event frame"""
+    return f"event: {event}\ndata: {orjson.dumps(data).decode()}\n\n"
 
 # Add your routes to the router instead of directly to app
 @api_router.get("/")
 async def root():
     return {"message": "Tolu Shekoni Portfolio API - Venice AI Powered"}
 
+@api_router.get("/stats")
+async def stats():
+    """Report internal resource usage for monitoring"""
+    return {
+        "sessions": chat_sessions.stats(),
+        "responseCache": response_cache.stats(),
+        "upstreamCoalescing": upstream_calls.stats(),
+        "upstreamAdmission": upstream_admission.stats(),
+        "upstream": venice_upstream.stats(),
+        "clientDisconnects": disconnect_guard.stats(),
+        "rateLimit": await chat_rate_limiter.stats(),
+        "email": email_worker.stats(),
+        "contactOutbox": await contact_outbox.stats(),
+        "logging": logging_stats(),
+        "chatSockets": chat_socket_hub.stats(),
+        "routing": model_router.stats(),
+        "knowledge": knowledge_index.stats(),
+        "content": portfolio_content.stats(),
+    }
+
+def content_response(section: str, request: Request) -> Response:
+    response = portfolio_content.response(section, request.headers)
+    if response is None:
+        raise HTTPException(status_code=503, detail="Content is not available")
+    return response
+
+@api_router.get("/skills")
+async def get_skills(request: Request):
+    """Skill categories with proficiency levels"""
+    return content_response("skills", request)
+
+@api_router.get("/projects")
+async def get_projects(request: Request):
+    """Portfolio projects"""
+    return content_response("projects", request)
+
 @api_router.post("/chat", response_model=ChatResponse)
-@limiter.limit("10/minute")
+@timed_endpoint
 async def chat_with_ai(request: Request, chat_input: ChatMessage):
     """Handle AI chat conversations using Venice AI"""
     
+    with phase("rate_limit"):
+        await chat_rate_limiter.check(client_ip(request), chat_input.sessionId)
+    
     if not VENICE_API_KEY:
         logger.error("Venice AI API key not configured")
         raise HTTPException(status_code=500, detail="Venice AI API key not configured")
     
-    # Log API key status for debugging (without exposing the key)
-    logger.info(f"Venice API key configured: {bool(VENICE_API_KEY)}, length: {len(VENICE_API_KEY) if VENICE_API_KEY else 0}")
-    
     # Generate or use existing session ID
     session_id = chat_input.sessionId or str(uuid.uuid4())
     
     try:
         # Get conversation history for this session from in-memory storage
-        session_data = chat_sessions.get(session_id, {})
-        conversation_history = session_data.get("messages", [])
+        with phase("context"):
+            session = await chat_sessions.fetch(session_id)
+            messages = build_chat_messages(session, chat_input.message)
         
-        # Build messages for Venice AI
-        messages = [
-            {
-                "role": "system", 
-                "content": """You are a helpful AI assistant powered by Venice AI. You have access to web search capabilities to provide accurate and up-to-date information. 
-
-You can:
-- Answer questions on any topic using your knowledge and web search
-- Provide explanations, summaries, and insights
-- Help with problem-solving and research
-- Engage in general conversation
-
-When answering questions:
-- Use web search when you need current information or to verify facts
-- Be informative, accurate, and helpful
-- Cite sources when appropriate
-- Keep responses clear and well-structured"""
-            }
-        ]
+        # Serve repeated and FAQ prompts from the response cache
+        with phase("cache"):
+            cache_key = chat_cache_key(request, chat_input, messages)
+            cached_response = response_cache.get(cache_key) if cache_key else None
+        if cached_response is not None:
+            with phase("session_save"):
+                await save_chat_turn(session_id, session, chat_input.message, cached_response)
+            return chat_response(cached_response, session_id)
         
-        # Add conversation history
-        for msg in conversation_history[-10:]:  # Last 10 messages for context
-            messages.append({
-                "role": msg["role"],
-                "content": msg["content"]
-            })
+        # Answer from the site's own content when it clearly covers the question
+        with phase("knowledge"):
+            knowledge = consult_knowledge(chat_input.message, cache_key is not None)
+        if knowledge.answer is not None:
+            with phase("session_save"):
+                await save_chat_turn(session_id, session, chat_input.message, knowledge.answer)
+            return chat_response(knowledge.answer, session_id)
+        messages = ground_messages(messages, knowledge.snippets)
         
-        # Add current user message
-        messages.append({
-            "role": "user",
-            "content": chat_input.message
-        })
+        # Pick model, web search and reply length for this prompt
+        with phase("route"):
+            route = select_route(chat_input.message, grounded=bool(knowledge.snippets))
         
-        # Call Venice AI
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            logger.info(f"Making Venice AI request to: {VENICE_BASE_URL}/chat/completions")
-            response = await client.post(
-                f"{VENICE_BASE_URL}/chat/completions",
-                headers={
-                    "Authorization": f"Bearer {VENICE_API_KEY}",
-                    "Content-Type": "application/json"
-                },
-                json={
-                    "model": "qwen3-235b",
-                    "messages": messages,
-                    "temperature": 0.7,
-                    "max_completion_tokens": 512,
-                    "venice_parameters": {
-                        "include_venice_system_prompt": False,
-                        "enable_web_search": "on"
-                    }
-                }
+        # Call Venice AI over the shared, pooled client; identical concurrent
+        # prompts share one upstream call, and the call is cancelled if the
+        # browser disconnects before it completes
+        client: httpx.AsyncClient = request.app.state.venice_client
+        client_key = client_ip(request)
+        if cache_key:
+            upstream = upstream_calls.do(
+                cache_key, lambda: fetch_and_cache_completion(client, messages, client_key, route, cache_key)
             )
-            
-            if response.status_code != 200:
-                error_detail = response.text
-                try:
-                    error_detail = response.json()
-                except Exception:
-                    pass
-                logger.error(f"Venice AI API error: {response.status_code} - {error_detail}")
-                logger.error(f"Request headers: Authorization: Bearer {VENICE_API_KEY[:10]}...")  # Log first 10 chars only
-                raise HTTPException(status_code=500, detail=f"Venice AI API error: {response.status_code}")
-            
-            result = response.json()
-            ai_response = result["choices"][0]["message"]["content"]
+        else:
+            upstream = fetch_completion(client, messages, client_key, route)
+        with phase("upstream"):
+            ai_response = await disconnect_guard.run(request, upstream)
         
         # Save conversation to in-memory storage
-        new_messages = conversation_history + [
-            {"role": "user", "content": chat_input.message, "timestamp": datetime.utcnow().isoformat()},
-            {"role": "assistant", "content": ai_response, "timestamp": datetime.utcnow().isoformat()}
-        ]
+        with phase("session_save"):
+            await save_chat_turn(session_id, session, chat_input.message, ai_response)
         
-        chat_sessions[session_id] = {
-            "messages": new_messages,
-            "updatedAt": datetime.utcnow().isoformat()
-        }
-        
-        return ChatResponse(
-            response=ai_response,
-            sessionId=session_id
-        )
+        return chat_response(ai_response, session_id)
         
+    except (HTTPException, AdmissionRejected, UpstreamUnavailable):
+        raise
+    except ClientDisconnected:
+        # Nothing is persisted for a turn the visitor abandoned
+        logger.info("Client disconnected; cancelled upstream call for session %s", session_id)
+        return Response(status_code=499)
     except Exception as e:
-        logger.error(f"Chat error: {str(e)}")
+        logger.error("Chat error: %s", e)
         raise HTTPException(status_code=500, detail=f"Chat service error: {str(e)}")
 
-@api_router.post("/contact", response_model=ContactResponse)
-async def submit_contact_form(contact: ContactForm):
-    """Handle contact form submissions and send email"""
+async def batch_chat_item(client: httpx.AsyncClient, item: ChatMessage, session_id: str, client_key: str, slots: asyncio.Semaphore) -> ChatBatchResult:
+    """Answer one batch item like /api/chat would; failures become the item's error"""
+    try:
+        session = await chat_sessions.fetch(session_id)
+        messages = build_chat_messages(session, item.message)
+        cache_key = None if item.noCache else make_cache_key(item.message, messages[:-1])
+        if item.noCache:
+            response_cache.record_bypass()
+        ai_response = response_cache.get(cache_key) if cache_key else None
+        knowledge = consult_knowledge(item.message, cache_key is not None) if ai_response is None else KnowledgeMatch(None, [])
+        ai_response = ai_response or knowledge.answer
+        if ai_response is None:
+            # Every item that needs a completion costs one token of the caller's per-IP limit
+            await chat_rate_limiter.check(client_key)
+            messages = ground_messages(messages, knowledge.snippets)
+            route = select_route(item.message, grounded=bool(knowledge.snippets))
+            async with slots:
+                if cache_key:
+                    ai_response = await upstream_calls.do(
+                        cache_key, lambda: fetch_and_cache_completion(client, messages, client_key, route, cache_key)
+                    )
+                else:
+                    ai_response = await fetch_completion(client, messages, client_key, route)
+        await save_chat_turn(session_id, session, item.message, ai_response)
+        return ChatBatchResult(response=ai_response, sessionId=session_id, timestamp=datetime.utcnow())
+    except HTTPException as e:
+        return ChatBatchResult(sessionId=session_id, error=e.detail)
+    except RateLimited as e:
+        return ChatBatchResult(sessionId=session_id, error=f"{e} (retry after {e.retry_after}s)")
+    except (AdmissionRejected, UpstreamUnavailable) as e:
+        return ChatBatchResult(sessionId=session_id, error=f"Chat service unavailable: {e.reason}")
+    except Exception as e:
+        logger.error("Batch chat item error: %s", e)
+        return ChatBatchResult(sessionId=session_id, error=f"Chat service error: {str(e)}")
+
+async def run_chat_batch(client: httpx.AsyncClient, items: List[ChatMessage], client_key: str) -> List[ChatBatchResult]:
+    """Answer batch items concurrently, in order within each session, at most CHAT_BATCH_CONCURRENCY upstream at once"""
+    slots = asyncio.Semaphore(CHAT_BATCH_CONCURRENCY)
+    results: List[Optional[ChatBatchResult]] = [None] * len(items)
+    # Items of one session build on each other's history, so they run in turn
+    by_session: Dict[str, List[int]] = {}
+    for index, item in enumerate(items):
+        by_session.setdefault(item.sessionId or str(uuid.uuid4()), []).append(index)
+
+    async def run_session(session_id: str, indexes: List[int]):
+        for index in indexes:
+            results[index] = await batch_chat_item(client, items[index], session_id, client_key, slots)
+
+    await asyncio.gather(*(run_session(session_id, indexes) for session_id, indexes in by_session.items()))
+    return results
+
+@api_router.post("/chat/batch", response_model=ChatBatchResponse)
+@timed_endpoint
+async def chat_batch(request: Request, batch: ChatBatchRequest):
+    """Answer several chat messages, possibly for different sessions, in one request.
+
+    Each item that needs an upstream call costs one token of the caller's
+    per-IP chat limit, and items past the limit fail individually; upstream
+    calls go through the same admission queue as /api/chat. Results come
+    back in request order, each with either a response or an error.
+    """
+    if not VENICE_API_KEY:
+        logger.error("Venice AI API key not configured")
+        raise HTTPException(status_code=500, detail="Venice AI API key not configured")
+    
+    client: httpx.AsyncClient = request.app.state.venice_client
+    try:
+        with phase("upstream"):
+            results = await disconnect_guard.run(
+                request, run_chat_batch(client, batch.items, client_ip(request)), label="batch"
+            )
+    except ClientDisconnected:
+        logger.info("Client disconnected; cancelled chat batch of %d items", len(batch.items))
+        return Response(status_code=499)
+    
+    failed = sum(1 for result in results if result.error is not None)
+    return ChatBatchResponse(results=results, succeeded=len(results) - failed, failed=failed)
+
+@api_router.post("/chat/stream")
+async def chat_stream(request: Request, chat_input: ChatMessage):
+    """Stream Venice AI completion deltas to the client as server-sent events"""
+    
+    await chat_rate_limiter.check(client_ip(request), chat_input.sessionId)
+    
+    if not VENICE_API_KEY:
+        logger.error("Venice AI API key not configured")
+        raise HTTPException(status_code=500, detail="Venice AI API key not configured")
+    
+    session_id = chat_input.sessionId or str(uuid.uuid4())
+    session = await chat_sessions.fetch(session_id)
+    messages = build_chat_messages(session, chat_input.message)
+    cache_key = chat_cache_key(request, chat_input, messages)
+    cached_response = response_cache.get(cache_key) if cache_key else None
+    client: httpx.AsyncClient = request.app.state.venice_client
+    
+    if cached_response is None:
+        knowledge = consult_knowledge(chat_input.message, cache_key is not None)
+        cached_response = knowledge.answer
+        messages = ground_messages(messages, knowledge.snippets)
+    
+    # Hold an upstream slot for the whole stream; rejection surfaces as 503 before streaming starts
+    permit = None
+    route = None
+    if cached_response is None:
+        route = select_route(chat_input.message, grounded=bool(knowledge.snippets))
+        venice_breaker.check()
+        permit = await upstream_admission.acquire(client_ip(request))
+        try:
+            venice_breaker.allow()
+        except UpstreamUnavailable:
+            permit.release()
+            raise
+    
+    async def event_stream():
+        if cached_response is not None:
+            await save_chat_turn(session_id, session, chat_input.message, cached_response)
+            yield sse_event("delta", {"content": cached_response})
+            yield sse_event("done", {"sessionId": session_id, "timestamp": datetime.utcnow().isoformat()})
+            return
+        
+        chunks: List[str] = []
+        try:
+            async with aclosing(stream_completion(client, messages, route)) as deltas:
+                async for delta in deltas:
+                    chunks.append(delta)
+                    yield sse_event("delta", {"content": delta})
+        except asyncio.CancelledError:
+            # Client went away mid-stream; the upstream stream is closed and
+            # the partial turn is not persisted.
+            disconnect_guard.record("stream")
+            logger.info("Chat stream for session %s cancelled by client disconnect", session_id)
+            raise
+        except UpstreamStreamError as e:
+            yield sse_event("error", {"detail": e.detail})
+            return
+        finally:
+            permit.release()
+        
+        ai_response = "".join(chunks)
+        if cache_key:
+            cache_reply(cache_key, route, ai_response)
+        await save_chat_turn(session_id, session, chat_input.message, ai_response)
+        yield sse_event("done", {"sessionId": session_id, "timestamp": datetime.utcnow().isoformat()})
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        # Releases the slot if the client disconnects before the stream starts
+        background=BackgroundTask(permit.release) if permit else None
+    )
+
+async def socket_chat_turn(client: httpx.AsyncClient, socket: ChatSocket, ip: str, user_message: str, no_cache: bool):
+    """Answer one message on a chat socket; every turn ends with a ``done`` or an ``error`` frame"""
+    try:
+        await answer_socket_message(client, socket, ip, user_message, no_cache)
+    except Exception as e:
+        logger.error("Chat socket error: %s", e)
+        socket.send({"type": "error", "detail": f"Chat service error: {str(e)}"})
+
+async def answer_socket_message(client: httpx.AsyncClient, socket: ChatSocket, ip: str, user_message: str, no_cache: bool):
+    """Answer one message on a chat socket, streaming deltas as they arrive"""
+    try:
+        await chat_rate_limiter.check(ip, socket.session_id)
+    except RateLimited as e:
+        socket.send({"type": "error", "detail": f"Rate limit exceeded: {e.scope}", "retryAfter": e.retry_after})
+        return
+    if not VENICE_API_KEY:
+        logger.error("Venice AI API key not configured")
+        socket.send({"type": "error", "detail": "Venice AI API key not configured"})
+        return
+    
+    # The session lives on the socket, so no store lookup per message
+    messages = build_chat_messages(socket.session, user_message)
+    if no_cache:
+        response_cache.record_bypass()
+        cache_key = None
+    else:
+        cache_key = make_cache_key(user_message, messages[:-1])
+    ai_response = response_cache.get(cache_key) if cache_key else None
+    grounded = False
+    if ai_response is None:
+        knowledge = consult_knowledge(user_message, cache_key is not None)
+        ai_response = knowledge.answer
+        messages = ground_messages(messages, knowledge.snippets)
+        grounded = bool(knowledge.snippets)
+    
+    if ai_response is not None:
+        socket.send({"type": "delta", "content": ai_response})
+    else:
+        try:
+            venice_breaker.check()
+            permit = await upstream_admission.acquire(ip)
+        except (AdmissionRejected, UpstreamUnavailable) as e:
+            socket.send({"type": "error", "detail": f"Chat service unavailable: {e.reason}", "retryAfter": e.retry_after})
+            return
+        chunks: List[str] = []
+        try:
+            venice_breaker.allow()
+            route = select_route(user_message, grounded)
+            async with aclosing(stream_completion(client, messages, route)) as deltas:
+                async for delta in deltas:
+                    chunks.append(delta)
+                    socket.send({"type": "delta", "content": delta})
+        except UpstreamUnavailable as e:
+            socket.send({"type": "error", "detail": f"Chat service unavailable: {e.reason}", "retryAfter": e.retry_after})
+            return
+        except UpstreamStreamError as e:
+            socket.send({"type": "error", "detail": e.detail})
+            return
+        except asyncio.CancelledError:
+            # The socket closed mid-reply; the partial turn is not kept
+            disconnect_guard.record("socket")
+            raise
+        finally:
+            permit.release()
+        ai_response = "".join(chunks)
+        if cache_key:
+            cache_reply(cache_key, route, ai_response)
+    
+    socket.add_turn(user_message, ai_response)
+    socket.send({"type": "done", "sessionId": socket.session_id, "timestamp": datetime.utcnow().isoformat()})
+
+@api_router.websocket("/chat/ws")
+async def chat_websocket(websocket: WebSocket, sessionId: Optional[str] = None):
+    """Chat over one long-lived connection that holds the session while it is open.
+
+    Client frames are ``{"type": "message", "message": "...", "noCache": false}``
+    and ``ping``/``pong``. The server answers with ``ready`` (carrying the
+    ``sessionId``), then for each message ``delta`` frames and a final
+    ``done`` or ``error``; it sends ``ping`` heartbeats, which the client
+    answers with ``pong``.
+    """
+    if chat_socket_hub.full():
+        chat_socket_hub.rejected += 1
+        await websocket.close(code=TRY_AGAIN_LATER)
+        return
+    await websocket.accept()
+    
+    session_id = sessionId or str(uuid.uuid4())
+    session = await chat_sessions.fetch(session_id) or ChatSession(
+        max_messages=SESSION_MAX_MESSAGES, summary_max_tokens=SUMMARY_MAX_TOKENS
+    )
+    socket = ChatSocket(
+        websocket, session_id, session, chat_sessions,
+        frame_rule=BucketRule.parse("connection", CHAT_WS_FRAME_RATE),
+        max_buffered_bytes=CHAT_WS_MAX_BUFFERED_BYTES,
+        max_frame_bytes=CHAT_WS_MAX_FRAME_BYTES,
+    )
+    chat_socket_hub.add(socket)
+    socket.send({"type": "ready", "sessionId": session_id})
+    client: httpx.AsyncClient = websocket.app.state.venice_client
+    try:
+        while (frame := await socket.receive()) is not None:
+            if frame["type"] != "message" or not isinstance(frame.get("message"), str):
+                socket.send({"type": "error", "detail": f"Unsupported frame type {frame['type']!r}"})
+            elif socket.turn is not None and not socket.turn.done():
+                # One reply at a time per connection
+                socket.send({"type": "error", "detail": "Wait for the current reply to finish"})
+            else:
+                socket.turn = asyncio.create_task(socket_chat_turn(
+                    client, socket, client_ip(websocket), frame["message"], bool(frame.get("noCache"))
+                ))
+    finally:
+        await chat_socket_hub.remove(socket)
+
+@api_router.post("/contact", response_model=ContactResponse, status_code=202)
+@timed_endpoint
+async def submit_contact_form(contact: ContactForm, response: Response):
+    """Accept a contact form submission; the email is sent in the background"""
     
     message_id = str(uuid.uuid4())
     try:
-        # Log submission
-        logger.info(f"Received contact form submission {message_id} from {contact.email}")
-        
-        # Send email if configured
-        if EMAIL_USER and EMAIL_PASS:
-            await send_contact_email(contact)
+        with phase("outbox"):
+            await contact_outbox.submit(message_id, contact.model_dump())
+        logger.info("Received contact form submission %s from %s", message_id, contact.email)
         
         return ContactResponse(
             success=True,
@@ -204,23 +1024,29 @@ async def submit_contact_form(contact: ContactForm):
         )
         
     except Exception as e:
-        logger.error(f"Contact form error: {str(e)}")
+        logger.error("Contact form error: %s", e)
+        response.status_code = 503
         return ContactResponse(
             success=False,
             error=str(e)
         )
 
-async def send_contact_email(contact: ContactForm):
-    """Send contact form email"""
+@api_router.get("/contact/{message_id}", response_model=ContactStatus)
+async def get_contact_status(message_id: str):
+    """Report whether a contact submission is pending, sent or failed"""
+    status = await contact_outbox.status(message_id)
+    if status is None:
+        raise HTTPException(status_code=404, detail="Unknown message id")
+    return status
+
+def build_contact_email(contact: ContactForm) -> MIMEMultipart:
+    """Build the notification email for a contact form submission"""
+    msg = MIMEMultipart()
+    msg['From'] = EMAIL_USER
+    msg['To'] = EMAIL_TO
+    msg['Subject'] = f"Portfolio Contact: {contact.subject}"
     
-    def send_email():
-        try:
-            msg = MIMEMultipart()
-            msg['From'] = EMAIL_USER
-            msg['To'] = EMAIL_TO
-            msg['Subject'] = f"Portfolio Contact: {contact.subject}"
-            
-            body = f"""
+    body = f"""
 New contact form submission from your portfolio:
 
 Name: {contact.name}
@@ -233,24 +1059,51 @@ Message:
 
 ---
 This message was sent from your portfolio website.
-            """
-            
-            msg.attach(MIMEText(body, 'plain'))
-            
-            server = smtplib.SMTP(EMAIL_HOST, EMAIL_PORT)
-            server.starttls()
-            server.login(EMAIL_USER, EMAIL_PASS)
-            server.send_message(msg)
-            server.quit()
-            
-            logger.info(f"Email sent successfully for contact from {contact.email}")
-            
-        except Exception as e:
-            logger.error(f"Failed to send email: {str(e)}")
+    """
     
-    # Run email sending in thread to avoid blocking
-    loop = asyncio.get_event_loop()
-    await loop.run_in_executor(None, send_email)
+    msg.attach(MIMEText(body, 'plain'))
+    return msg
+
+def register_metric_callbacks():
+    """Expose counters and gauges the components already keep, read at scrape time"""
+    metrics_registry.callback(
+        "rate_limit_rejections_total", "Chat requests refused by the rate limiter",
+        lambda: {(scope,): count for scope, count in chat_rate_limiter.rejections.items()},
+        kind="counter", labelnames=("scope",),
+    )
+    metrics_registry.callback("chat_sessions", "Chat sessions held by the session store",
+                              lambda: chat_sessions.stats()["sessions"])
+    metrics_registry.callback(
+        "chat_session_evictions_total", "Chat sessions evicted from the store",
+        lambda: {(reason,): count for reason, count in chat_sessions.stats()["evictions"].items()},
+        kind="counter", labelnames=("reason",),
+    )
+    metrics_registry.callback("response_cache_entries", "Entries in the chat response cache",
+                              lambda: response_cache.stats()["entries"])
+    metrics_registry.callback("upstream_active_calls", "Venice calls currently holding an admission slot",
+                              lambda: upstream_admission.active)
+    metrics_registry.callback("upstream_queued_calls", "Venice calls waiting for an admission slot",
+                              lambda: upstream_admission.queued)
+    metrics_registry.callback("email_queue_depth", "Emails waiting for the SMTP worker",
+                              lambda: email_worker.stats()["queueDepth"])
+    metrics_registry.callback(
+        "emails_total", "Emails handed to the SMTP worker by outcome",
+        lambda: {("sent",): email_worker.sent, ("failed",): email_worker.failed},
+        kind="counter", labelnames=("outcome",),
+    )
+    metrics_registry.callback("chat_sockets_open", "Open chat WebSocket connections",
+                              lambda: len(chat_socket_hub.sockets))
+    metrics_registry.callback("contact_outbox_pending", "Contact submissions awaiting delivery",
+                              lambda: contact_outbox.pending)
+    metrics_registry.callback("log_records_dropped_total", "Log records dropped because the log queue was full",
+                              lambda: logging_stats()["dropped"], kind="counter")
+
+register_metric_callbacks()
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus scrape endpoint"""
+    return Response(metrics_registry.render(), media_type=CONTENT_TYPE)
 
 # Include the router in the main app
 app.include_router(api_router)
@@ -263,10 +1116,32 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+# Phase timings in a Server-Timing header; optionally profile requests slower
+# than SLOW_REQUEST_PROFILE_MS and write their stacks to SLOW_REQUEST_PROFILE_DIR
+SLOW_REQUEST_PROFILE_MS = float(os.getenv("SLOW_REQUEST_PROFILE_MS", 0))
+slow_request_profiler = SlowRequestProfiler(
+    threshold=SLOW_REQUEST_PROFILE_MS / 1000,
+    output_dir=os.getenv("SLOW_REQUEST_PROFILE_DIR", str(ROOT_DIR / "data" / "profiles")),
+    interval=float(os.getenv("SLOW_REQUEST_PROFILE_INTERVAL_MS", 5)) / 1000,
+) if SLOW_REQUEST_PROFILE_MS > 0 else None
+app.add_middleware(ServerTimingMiddleware, profiler=slow_request_profiler)
+
+# Outermost, so the latency histogram covers CORS and error handling too
+app.add_middleware(MetricsMiddleware, histogram=http_request_seconds)
+
+# Configure logging: records are queued and written as JSON lines by a
+# background thread, so request handlers never block on stdout
+LOG_SAMPLE_RATES = {
+    # Fraction of these per-request INFO lines that are kept
+    "Making Venice AI request to: %s/chat/completions": 0.1,
+}
+LOG_SAMPLE_RATES.update(orjson.loads(os.getenv("LOG_SAMPLE_RATES", "{}")))
+configure_logging(
+    level=os.getenv("LOG_LEVEL", "INFO"),
+    json_output=os.getenv("LOG_FORMAT", "json").lower() == "json",
+    queue_size=int(os.getenv("LOG_QUEUE_SIZE", 10000)),
+    sample_rates=LOG_SAMPLE_RATES,
+    rate_limit_per_minute=int(os.getenv("LOG_RATE_LIMIT_PER_MINUTE", 60)),
 )
 logger = logging.getLogger(__name__)
 
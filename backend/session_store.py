@@ -0,0 +1,299 @@
+"""Chat session records and the session store interface, with the default in-memory store"""
+
+import asyncio
+import logging
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict, deque
+from itertools import islice
+from typing import Deque, Dict, Iterable, Iterator, List, Optional
+
+from context import CHARS_PER_TOKEN, summarize_line
+
+logger = logging.getLogger(__name__)
+
+# Rough fixed cost of a message record (slots object, role, float timestamp) on top of its content
+MESSAGE_OVERHEAD_BYTES = 120
+SESSION_OVERHEAD_BYTES = 400
+
+
+class MessageRecord:
+    """A single chat message; ``timestamp`` is epoch seconds"""
+
+    __slots__ = ("role", "content", "timestamp")
+
+    def __init__(self, role: str, content: str, timestamp: float):
+        self.role = role
+        self.content = content
+        self.timestamp = timestamp
+
+    def to_dict(self) -> Dict:
+        return {"role": self.role, "content": self.content, "timestamp": self.timestamp}
+
+
+class ChatSession:
+    """Conversation history holding only the most recent ``max_messages`` records.
+
+    Messages are appended in place to a bounded deque, so a turn costs O(1)
+    regardless of history length and the oldest records fall off once the
+    retained window is full. ``content_bytes`` tracks the approximate size of
+    the retained messages and summary incrementally.
+
+    ``total`` counts every message ever appended, so ``total - len(messages)``
+    is the absolute index of the oldest retained record. Messages before
+    ``summary_upto`` have been folded into the running summary (one condensed
+    line each, oldest lines dropped past ``summary_max_tokens``); a record
+    that falls off the window before being summarized is folded on the way out.
+    """
+
+    __slots__ = ("messages", "updated_at", "content_bytes", "total",
+                 "summary_lines", "summary_chars", "summary_upto", "summary_max_tokens")
+
+    def __init__(self, max_messages: int = 100, summary_max_tokens: int = 400):
+        self.messages: Deque[MessageRecord] = deque(maxlen=max_messages)
+        self.updated_at = time.time()
+        self.content_bytes = 0
+        self.total = 0
+        self.summary_lines: Deque[str] = deque()
+        self.summary_chars = 0
+        self.summary_upto = 0
+        self.summary_max_tokens = summary_max_tokens
+
+    @property
+    def summary(self) -> str:
+        return "\n".join(self.summary_lines)
+
+    def append(self, role: str, content: str, timestamp: Optional[float] = None) -> MessageRecord:
+        timestamp = time.time() if timestamp is None else timestamp
+        if len(self.messages) == self.messages.maxlen:
+            dropped = self.messages[0]
+            self.content_bytes -= MESSAGE_OVERHEAD_BYTES + len(dropped.content)
+            dropped_index = self.total - len(self.messages)
+            if dropped_index >= self.summary_upto:
+                self.fold([dropped])
+                self.summary_upto = dropped_index + 1
+        record = MessageRecord(role, content, timestamp)
+        self.messages.append(record)
+        self.total += 1
+        self.content_bytes += MESSAGE_OVERHEAD_BYTES + len(content)
+        self.updated_at = timestamp
+        return record
+
+    def fold(self, records: Iterable[MessageRecord]) -> None:
+        """Merge ``records`` into the running summary"""
+        limit = self.summary_max_tokens * CHARS_PER_TOKEN
+        previous = self.summary_chars
+        for record in records:
+            line = summarize_line(record.role, record.content)
+            self.summary_lines.append(line)
+            self.summary_chars += len(line) + 1
+            while len(self.summary_lines) > 1 and self.summary_chars > limit:
+                self.summary_chars -= len(self.summary_lines.popleft()) + 1
+        self.content_bytes += self.summary_chars - previous
+
+    def add_turn(self, user_message: str, ai_response: str) -> None:
+        """Record a completed user/assistant exchange"""
+        now = time.time()
+        self.append("user", user_message, now)
+        self.append("assistant", ai_response, now)
+
+    def recent(self, count: int) -> List[MessageRecord]:
+        """Return the newest ``count`` messages, oldest first"""
+        if count <= 0:
+            return []
+        tail = list(islice(reversed(self.messages), count))
+        tail.reverse()
+        return tail
+
+    def __len__(self) -> int:
+        return len(self.messages)
+
+    def to_state(self) -> Dict:
+        """Plain-data form for persistence"""
+        return {
+            "messages": [(m.role, m.content, m.timestamp) for m in self.messages],
+            "maxMessages": self.messages.maxlen,
+            "updatedAt": self.updated_at,
+            "total": self.total,
+            "summary": list(self.summary_lines),
+            "summaryUpto": self.summary_upto,
+            "summaryMaxTokens": self.summary_max_tokens,
+        }
+
+    @classmethod
+    def from_state(cls, state: Dict) -> "ChatSession":
+        session = cls(max_messages=state["maxMessages"], summary_max_tokens=state["summaryMaxTokens"])
+        for role, content, timestamp in state["messages"]:
+            session.messages.append(MessageRecord(role, content, timestamp))
+            session.content_bytes += MESSAGE_OVERHEAD_BYTES + len(content)
+        session.summary_lines.extend(state["summary"])
+        session.summary_chars = sum(len(line) + 1 for line in session.summary_lines)
+        session.content_bytes += session.summary_chars
+        session.updated_at = state["updatedAt"]
+        session.total = state["total"]
+        session.summary_upto = state["summaryUpto"]
+        return session
+
+
+def estimate_session_bytes(session: ChatSession) -> int:
+    """Approximate the memory footprint of a session from its message contents"""
+    return SESSION_OVERHEAD_BYTES + session.content_bytes
+
+
+class SessionStore(ABC):
+    """Interface for chat session storage keyed by sessionId.
+
+    ``get`` and assignment are synchronous so the store can be used like a
+    mapping; backends that do I/O are expected to serve hot sessions from
+    memory and do their writes in the background between ``start`` and
+    ``close``. Request handlers read with ``fetch``, which such backends
+    override to do a cache miss's read off the event loop.
+    """
+
+    @abstractmethod
+    def get(self, session_id: str, default: Optional[ChatSession] = None) -> Optional[ChatSession]:
+        ...
+
+    @abstractmethod
+    def __setitem__(self, session_id: str, session: ChatSession) -> None:
+        ...
+
+    @abstractmethod
+    def __len__(self) -> int:
+        ...
+
+    @abstractmethod
+    def stats(self) -> Dict:
+        ...
+
+    def __getitem__(self, session_id: str) -> ChatSession:
+        session = self.get(session_id)
+        if session is None:
+            raise KeyError(session_id)
+        return session
+
+    def __contains__(self, session_id: object) -> bool:
+        return isinstance(session_id, str) and self.get(session_id) is not None
+
+    async def fetch(self, session_id: str, default: Optional[ChatSession] = None) -> Optional[ChatSession]:
+        """``get`` for use on the event loop"""
+        return self.get(session_id, default)
+
+    async def start(self) -> None:
+        """Start background maintenance tasks"""
+
+    async def close(self) -> None:
+        """Stop background tasks and persist anything outstanding"""
+
+
+class InMemorySessionStore(SessionStore):
+    """Chat sessions keyed by sessionId with LRU ordering, idle TTL and size caps.
+
+    Sessions are stored in access order; when either the session count or the
+    approximate byte budget is exceeded the least recently used sessions are
+    evicted. Sessions idle for longer than ``ttl_seconds`` (measured from their
+    ``updated_at``) are dropped lazily on access and by a periodic sweeper.
+    """
+
+    def __init__(
+        self,
+        max_sessions: int = 10_000,
+        ttl_seconds: float = 3600.0,
+        max_bytes: int = 128 * 1024 * 1024,
+        sweep_interval: float = 60.0,
+    ):
+        self.max_sessions = max_sessions
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.sweep_interval = sweep_interval
+        self._sessions: "OrderedDict[str, ChatSession]" = OrderedDict()
+        self._sizes: Dict[str, int] = {}
+        self._bytes = 0
+        self.evictions = {"ttl": 0, "lru": 0, "memory": 0}
+        self._sweeper: Optional[asyncio.Task] = None
+
+    def _is_expired(self, session: ChatSession, now: float) -> bool:
+        return now - session.updated_at > self.ttl_seconds
+
+    def _remove(self, session_id: str) -> None:
+        self._sessions.pop(session_id, None)
+        self._bytes -= self._sizes.pop(session_id, 0)
+
+    def _enforce_limits(self) -> None:
+        while len(self._sessions) > self.max_sessions:
+            self._remove(next(iter(self._sessions)))
+            self.evictions["lru"] += 1
+        # Always keep the most recent session, even if it alone exceeds the budget
+        while self._bytes > self.max_bytes and len(self._sessions) > 1:
+            self._remove(next(iter(self._sessions)))
+            self.evictions["memory"] += 1
+
+    def get(self, session_id: str, default: Optional[ChatSession] = None) -> Optional[ChatSession]:
+        session = self._sessions.get(session_id)
+        if session is None:
+            return default
+        if self._is_expired(session, time.time()):
+            self._remove(session_id)
+            self.evictions["ttl"] += 1
+            return default
+        self._sessions.move_to_end(session_id)
+        return session
+
+    def __setitem__(self, session_id: str, session: ChatSession) -> None:
+        self._bytes -= self._sizes.get(session_id, 0)
+        size = estimate_session_bytes(session)
+        self._sessions[session_id] = session
+        self._sessions.move_to_end(session_id)
+        self._sizes[session_id] = size
+        self._bytes += size
+        self._enforce_limits()
+
+    def __delitem__(self, session_id: str) -> None:
+        if session_id not in self._sessions:
+            raise KeyError(session_id)
+        self._remove(session_id)
+
+    def __contains__(self, session_id: object) -> bool:
+        return session_id in self._sessions
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._sessions)
+
+    def sweep(self) -> int:
+        """Drop every session whose idle time exceeds the TTL; returns the number removed"""
+        now = time.time()
+        expired = [sid for sid, session in self._sessions.items() if self._is_expired(session, now)]
+        for session_id in expired:
+            self._remove(session_id)
+        self.evictions["ttl"] += len(expired)
+        return len(expired)
+
+    async def start(self) -> None:
+        self._sweeper = asyncio.create_task(self.run_sweeper())
+
+    async def close(self) -> None:
+        if self._sweeper is not None:
+            self._sweeper.cancel()
+            self._sweeper = None
+
+    async def run_sweeper(self) -> None:
+        """Periodically sweep expired sessions until cancelled"""
+        while True:
+            await asyncio.sleep(self.sweep_interval)
+            removed = self.sweep()
+            if removed:
+                logger.info("Session sweeper expired %d sessions, %d remain", removed, len(self))
+
+    def stats(self) -> Dict:
+        return {
+            "backend": "memory",
+            "sessions": len(self._sessions),
+            "approxBytes": self._bytes,
+            "maxSessions": self.max_sessions,
+            "maxBytes": self.max_bytes,
+            "ttlSeconds": self.ttl_seconds,
+            "evictions": dict(self.evictions),
+        }
@@ -0,0 +1,267 @@
+"""SQLite (WAL) chat session store shared by all workers on a host"""
+
+import asyncio
+import json
+import logging
+import sqlite3
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from session_store import ChatSession, SessionStore
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    id TEXT PRIMARY KEY,
+    data TEXT NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS sessions_updated_at ON sessions (updated_at);
+"""
+
+# Only overwrite a row with a newer version, so a lagging worker can't clobber a fresher turn
+UPSERT = """
+INSERT INTO sessions (id, data, updated_at) VALUES (?, ?, ?)
+ON CONFLICT (id) DO UPDATE SET data = excluded.data, updated_at = excluded.updated_at
+WHERE excluded.updated_at >= sessions.updated_at
+"""
+
+
+def connect(path: str) -> sqlite3.Connection:
+    conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA busy_timeout=5000")
+    return conn
+
+
+class SQLiteSessionStore(SessionStore):
+    """Sessions persisted in a local SQLite database in WAL mode.
+
+    Every uvicorn worker opens the same database file, so a follow-up message
+    can land on any worker and sessions survive restarts. Writes are
+    write-behind: assignments mark the session dirty and a background task
+    flushes all dirty sessions in one transaction every ``flush_interval``
+    seconds. Reads go through an in-process LRU cache; a cached copy is
+    trusted for ``cache_ttl`` seconds before the row is re-read, which bounds
+    how stale a session can be when workers alternate on it. ``fetch`` does
+    a cache miss's read on the writer thread, and the row count reported in
+    stats is kept in memory: advanced by this worker's flushes and recounted
+    on the writer thread at every sweep.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        ttl_seconds: float = 3600.0,
+        max_sessions: int = 100_000,
+        flush_interval: float = 0.05,
+        cache_size: int = 1000,
+        cache_ttl: float = 1.0,
+        sweep_interval: float = 60.0,
+    ):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_sessions = max_sessions
+        self.flush_interval = flush_interval
+        self.cache_size = cache_size
+        self.cache_ttl = cache_ttl
+        self.sweep_interval = sweep_interval
+
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._reader = connect(path)
+        self._reader.executescript(SCHEMA)
+        # All writes go through one connection on one thread
+        self._writer = connect(path)
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="session-writer")
+
+        self._cache: "OrderedDict[str, Tuple[ChatSession, float]]" = OrderedDict()
+        self._dirty: Dict[str, ChatSession] = {}
+        self._tasks: List[asyncio.Task] = []
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.flushes = 0
+        self.rows_written = 0
+        self.evictions = {"ttl": 0, "lru": 0}
+        (self.stored_sessions,) = self._reader.execute("SELECT COUNT(*) FROM sessions").fetchone()
+
+    def _cache_put(self, session_id: str, session: ChatSession) -> None:
+        self._cache[session_id] = (session, time.monotonic())
+        self._cache.move_to_end(session_id)
+        # Dirty sessions evicted here stay reachable through _dirty until flushed
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    def _load(self, session_id: str, conn: Optional[sqlite3.Connection] = None) -> Optional[ChatSession]:
+        row = (conn or self._reader).execute(
+            "SELECT data FROM sessions WHERE id = ? AND updated_at >= ?",
+            (session_id, time.time() - self.ttl_seconds),
+        ).fetchone()
+        if row is None:
+            return None
+        return ChatSession.from_state(json.loads(row[0]))
+
+    def _from_memory(self, session_id: str) -> Tuple[bool, Optional[ChatSession], Optional[Tuple[ChatSession, float]]]:
+        """``(found, session, cached)``: whether memory answers the lookup, and if not the stale cache entry"""
+        dirty = self._dirty.get(session_id)
+        if dirty is not None:
+            self.cache_hits += 1
+            return True, dirty, None
+
+        cached = self._cache.get(session_id)
+        if cached is not None:
+            session, loaded_at = cached
+            if time.time() - session.updated_at > self.ttl_seconds:
+                del self._cache[session_id]
+                self.evictions["ttl"] += 1
+                return True, None, None
+            if time.monotonic() - loaded_at < self.cache_ttl:
+                self._cache.move_to_end(session_id)
+                self.cache_hits += 1
+                return True, session, None
+
+        self.cache_misses += 1
+        return False, None, cached
+
+    def _settle(
+        self, session_id: str, stored: Optional[ChatSession], cached: Optional[Tuple[ChatSession, float]]
+    ) -> Optional[ChatSession]:
+        if stored is None:
+            self._cache.pop(session_id, None)
+            return None
+        if cached is not None and cached[0].updated_at >= stored.updated_at:
+            # Nothing newer on disk; keep the cached object so in-place appends stay shared
+            stored = cached[0]
+        self._cache_put(session_id, stored)
+        return stored
+
+    def get(self, session_id: str, default: Optional[ChatSession] = None) -> Optional[ChatSession]:
+        found, session, cached = self._from_memory(session_id)
+        if not found:
+            session = self._settle(session_id, self._load(session_id), cached)
+        return default if session is None else session
+
+    async def fetch(self, session_id: str, default: Optional[ChatSession] = None) -> Optional[ChatSession]:
+        """Like ``get``, but a cache miss reads the row on the writer thread"""
+        found, session, cached = self._from_memory(session_id)
+        if not found:
+            stored = await asyncio.get_running_loop().run_in_executor(
+                self._executor, self._load, session_id, self._writer
+            )
+            # A turn assigned while the row was being read is newer than the row
+            session = self._dirty.get(session_id) or self._settle(session_id, stored, cached)
+        return default if session is None else session
+
+    def __setitem__(self, session_id: str, session: ChatSession) -> None:
+        self._dirty[session_id] = session
+        self._cache_put(session_id, session)
+
+    def __len__(self) -> int:
+        """Number of sessions in the database, as of this worker's last flush or sweep"""
+        return self.stored_sessions
+
+    def _write_batch(self, rows: List[Tuple[str, str, float]]) -> None:
+        self._writer.execute("BEGIN IMMEDIATE")
+        try:
+            existing = 0
+            for start in range(0, len(rows), 500):
+                ids = [row[0] for row in rows[start:start + 500]]
+                (count,) = self._writer.execute(
+                    f"SELECT COUNT(*) FROM sessions WHERE id IN ({','.join('?' * len(ids))})", ids
+                ).fetchone()
+                existing += count
+            self._writer.executemany(UPSERT, rows)
+            self._writer.execute("COMMIT")
+        except Exception:
+            self._writer.execute("ROLLBACK")
+            raise
+        self.stored_sessions += len(rows) - existing
+
+    async def flush(self) -> int:
+        """Write all dirty sessions in a single transaction; returns the number written"""
+        if not self._dirty:
+            return 0
+        dirty, self._dirty = self._dirty, {}
+        # Serialize on the event loop thread so in-place appends can't race the encoder
+        rows = [
+            (session_id, json.dumps(session.to_state(), separators=(",", ":")), session.updated_at)
+            for session_id, session in dirty.items()
+        ]
+        try:
+            await asyncio.get_running_loop().run_in_executor(self._executor, self._write_batch, rows)
+        except Exception as e:
+            logger.error("Session flush failed, will retry: %s", e)
+            for session_id, session in dirty.items():
+                self._dirty.setdefault(session_id, session)
+            return 0
+        self.flushes += 1
+        self.rows_written += len(rows)
+        return len(rows)
+
+    def _delete_expired(self) -> int:
+        cutoff = time.time() - self.ttl_seconds
+        expired = self._writer.execute("DELETE FROM sessions WHERE updated_at < ?", (cutoff,)).rowcount
+        overflow = self._writer.execute(
+            "DELETE FROM sessions WHERE id IN "
+            "(SELECT id FROM sessions ORDER BY updated_at DESC LIMIT -1 OFFSET ?)",
+            (self.max_sessions,),
+        ).rowcount
+        self.evictions["ttl"] += expired
+        self.evictions["lru"] += overflow
+        # Also picks up rows other workers wrote
+        (self.stored_sessions,) = self._writer.execute("SELECT COUNT(*) FROM sessions").fetchone()
+        return expired + overflow
+
+    async def sweep(self) -> int:
+        """Delete expired and over-limit rows; returns the number removed"""
+        cutoff = time.time() - self.ttl_seconds
+        for session_id in [sid for sid, (session, _) in self._cache.items() if session.updated_at < cutoff]:
+            del self._cache[session_id]
+        return await asyncio.get_running_loop().run_in_executor(self._executor, self._delete_expired)
+
+    async def _run_flusher(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            await self.flush()
+
+    async def _run_sweeper(self) -> None:
+        while True:
+            await asyncio.sleep(self.sweep_interval)
+            try:
+                removed = await self.sweep()
+            except sqlite3.Error as e:
+                logger.error("Session sweep failed, will retry: %s", e)
+                continue
+            if removed:
+                logger.info("Session sweeper removed %d sessions from %s", removed, self.path)
+
+    async def start(self) -> None:
+        self._tasks = [asyncio.create_task(self._run_flusher()), asyncio.create_task(self._run_sweeper())]
+
+    async def close(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        self._tasks = []
+        await self.flush()
+        self._executor.shutdown(wait=True)
+        self._writer.close()
+        self._reader.close()
+
+    def stats(self) -> Dict:
+        lookups = self.cache_hits + self.cache_misses
+        return {
+            "backend": "sqlite",
+            "sessions": len(self),
+            "cachedSessions": len(self._cache),
+            "dirtySessions": len(self._dirty),
+            "cacheHitRatio": round(self.cache_hits / lookups, 4) if lookups else 0.0,
+            "flushes": self.flushes,
+            "rowsWritten": self.rows_written,
+            "ttlSeconds": self.ttl_seconds,
+            "maxSessions": self.max_sessions,
+            "evictions": dict(self.evictions),
+        }
@@ -0,0 +1,218 @@
+"""Portfolio content served from a JSON file, pre-serialized and pre-compressed in memory"""
+
+import asyncio
+import gzip
+import hashlib
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Mapping, Optional, Tuple
+
+import orjson
+from starlette.responses import Response
+
+try:
+    import brotli
+except ImportError:  # optional: without it only gzip is offered
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+# Preferred first when the client accepts several equally
+ENCODING_PREFERENCE = ("br", "gzip", "identity")
+
+
+class Representation:
+    """One encoding of a section: the exact bytes to send and their strong ETag"""
+
+    __slots__ = ("body", "etag", "encoding")
+
+    def __init__(self, body: bytes, etag: str, encoding: str):
+        self.body = body
+        self.etag = etag
+        self.encoding = encoding
+
+
+def encode_section(value) -> Dict[str, Representation]:
+    body = orjson.dumps(value)
+    digest = hashlib.sha256(body).hexdigest()[:32]
+    representations = {"identity": Representation(body, f'"{digest}"', "identity")}
+    compressed = {"gzip": gzip.compress(body, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        compressed["br"] = brotli.compress(body, quality=11)
+    for encoding, data in compressed.items():
+        # Tiny bodies can grow when compressed; then identity is all we offer
+        if len(data) < len(body):
+            # Strong ETags must differ per content-coding (RFC 9110 8.8.3)
+            representations[encoding] = Representation(data, f'"{digest}-{encoding}"', encoding)
+    return representations
+
+
+def accepted_encodings(header: Optional[str]) -> List[str]:
+    """Encodings the client accepts, best first, from an Accept-Encoding header"""
+    if not header:
+        return ["identity"]
+    weights: Dict[str, float] = {}
+    for part in header.split(","):
+        name, _, params = part.strip().partition(";")
+        name = name.strip().lower()
+        if not name:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        weights[name] = q
+    star = weights.pop("*", None)
+    accepted = []
+    for encoding in ENCODING_PREFERENCE:
+        q = weights.get(encoding, star)
+        if q is None and encoding == "identity":
+            q = 1.0  # identity is acceptable unless explicitly refused
+        if q:
+            accepted.append((q, -ENCODING_PREFERENCE.index(encoding), encoding))
+    return [encoding for _, _, encoding in sorted(accepted, reverse=True)] or ["identity"]
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """If-None-Match uses weak comparison: ``W/`` prefixes are ignored"""
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*":
+            return True
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
+
+
+class StaticContent:
+    """Top-level sections of a JSON file, each answered from precomputed bytes.
+
+    The file is read once and every section is serialized, gzipped and (when
+    the ``brotli`` package is installed) brotli-compressed up front, so a
+    request only picks a representation and writes it out. At most every
+    ``reload_interval`` seconds a request stats the file; if it changed it is
+    reloaded on a worker thread while requests keep getting the current
+    content, and a file that fails to parse keeps the previous content.
+    ``on_load`` is called with the parsed file after every successful load.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        max_age: int = 86400,
+        stale_while_revalidate: int = 604800,
+        reload_interval: float = 2.0,
+        on_load: Optional[Callable[[Dict], None]] = None,
+    ):
+        self.path = Path(path)
+        self.cache_control = f"public, max-age={max_age}, stale-while-revalidate={stale_while_revalidate}"
+        self.reload_interval = reload_interval
+        self.on_load = on_load
+        self.sections: Dict[str, Dict[str, Representation]] = {}
+        self.reloads = 0
+        self._signature: Optional[Tuple[int, int]] = None
+        self._checked = 0.0
+        self._reloading = False
+        self._lock = threading.Lock()
+        self.load()
+
+    def _stat(self) -> Optional[Tuple[int, int]]:
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def load(self) -> bool:
+        """(Re)build every section from the file; returns whether it succeeded"""
+        with self._lock:
+            signature = self._stat()
+            self._checked = time.monotonic()
+            if signature is None:
+                # Keep serving what was loaded; a reappearing file is picked up again
+                logger.error("Content file %s is missing", self.path)
+                self._signature = None
+                return False
+            try:
+                data = orjson.loads(self.path.read_bytes())
+                if not isinstance(data, dict):
+                    raise ValueError("top level must be an object")
+                sections = {key: encode_section(value) for key, value in data.items()}
+                if self.on_load is not None:
+                    self.on_load(data)
+            except (OSError, ValueError, KeyError, TypeError) as e:
+                logger.error("Failed to load content file %s: %s", self.path, e)
+                # Don't retry the same broken file on every check
+                self._signature = signature
+                return False
+            if self._signature is not None:
+                self.reloads += 1
+                logger.info("Reloaded content file %s", self.path)
+            self.sections = sections
+            self._signature = signature
+            return True
+
+    def _reload(self) -> None:
+        try:
+            self.load()
+        finally:
+            self._reloading = False
+
+    def maybe_reload(self) -> None:
+        """Reload if the file changed: in the background on a running loop, else right away"""
+        if self._reloading or time.monotonic() - self._checked < self.reload_interval:
+            return
+        self._checked = time.monotonic()
+        if self._stat() == self._signature:
+            return
+        self._reloading = True
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self._reload()
+            return
+        # Parsing and compressing every section is too slow for the event loop
+        loop.run_in_executor(None, self._reload)
+
+    def response(self, section: str, headers: Mapping[str, str]) -> Optional[Response]:
+        """The response for ``section`` negotiated against the request headers; None if it doesn't exist"""
+        self.maybe_reload()
+        representations = self.sections.get(section)
+        if representations is None:
+            return None
+        for encoding in accepted_encodings(headers.get("accept-encoding")):
+            representation = representations.get(encoding)
+            if representation is not None:
+                break
+        else:
+            representation = representations["identity"]
+
+        response_headers = {
+            "ETag": representation.etag,
+            "Cache-Control": self.cache_control,
+            "Vary": "Accept-Encoding",
+        }
+        if_none_match = headers.get("if-none-match")
+        if if_none_match and etag_matches(if_none_match, representation.etag):
+            return Response(status_code=304, headers=response_headers)
+        if representation.encoding != "identity":
+            response_headers["Content-Encoding"] = representation.encoding
+        return Response(representation.body, media_type="application/json", headers=response_headers)
+
+    def stats(self) -> Dict:
+        return {
+            "sections": len(self.sections),
+            "bytes": {
+                section: {encoding: len(r.body) for encoding, r in representations.items()}
+                for section, representations in self.sections.items()
+            },
+            "reloads": self.reloads,
+        }
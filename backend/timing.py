@@ -0,0 +1,238 @@
+"""Per-request phase timing (Server-Timing header) and a slow-request sampling profiler"""
+
+import asyncio
+import functools
+import logging
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+_current_timer: ContextVar[Optional["PhaseTimer"]] = ContextVar("phase_timer", default=None)
+
+
+class PhaseTimer:
+    """Durations of named phases within one request; repeated phases accumulate"""
+
+    __slots__ = ("started", "phases", "handler_finished")
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.phases: Dict[str, float] = {}
+        self.handler_finished: Optional[float] = None
+
+    def record(self, name: str, seconds: float) -> None:
+        self.phases[name] = self.phases.get(name, 0.0) + seconds
+
+    def header_value(self, total: float) -> str:
+        entries = [f"{name};dur={seconds * 1000:.1f}" for name, seconds in self.phases.items()]
+        entries.append(f"total;dur={total * 1000:.1f}")
+        return ", ".join(entries)
+
+
+def current_timer() -> Optional[PhaseTimer]:
+    return _current_timer.get()
+
+
+@contextmanager
+def phase(name: str) -> Iterator[None]:
+    """Time the enclosed block as ``name`` on the current request, if it is being timed"""
+    timer = _current_timer.get()
+    if timer is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timer.record(name, time.perf_counter() - started)
+
+
+def timed_endpoint(endpoint):
+    """Record request parsing/validation before the handler runs and mark when it returns.
+
+    Everything between the middleware seeing the request and the handler
+    being called (body read, JSON decoding, pydantic validation) is booked as
+    ``parse``; the time from the handler returning until the response starts
+    is booked as ``serialize`` by the middleware.
+    """
+
+    @functools.wraps(endpoint)
+    async def wrapper(*args, **kwargs):
+        timer = _current_timer.get()
+        if timer is None:
+            return await endpoint(*args, **kwargs)
+        timer.record("parse", time.perf_counter() - timer.started)
+        try:
+            return await endpoint(*args, **kwargs)
+        finally:
+            timer.handler_finished = time.perf_counter()
+
+    return wrapper
+
+
+def httpx_trace(prefix: str) -> Dict:
+    """httpx request extensions that split an upstream call into connect and time-to-first-byte"""
+    timer = _current_timer.get()
+    if timer is None:
+        return {}
+    started: Dict[str, float] = {}
+
+    async def trace(event: str, info: Dict) -> None:
+        now = time.perf_counter()
+        step, _, state = event.rpartition(".")
+        if state == "started":
+            started[step] = now
+        elif state == "complete":
+            if step in ("connection.connect_tcp", "connection.start_tls"):
+                timer.record(f"{prefix}_connect", now - started.pop(step, now))
+            elif step.endswith("send_request_headers"):
+                started["request_sent"] = started.get(step, now)
+            elif step.endswith("receive_response_headers") and "request_sent" in started:
+                timer.record(f"{prefix}_ttfb", now - started.pop("request_sent"))
+
+    return {"trace": trace}
+
+
+def frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+def task_stack(task: asyncio.Task, thread_frame) -> Tuple[str, ...]:
+    """Folded stack of a task: its await chain, plus the live frames if it is running"""
+    frames = []
+    awaitable = task.get_coro()
+    while awaitable is not None:
+        frame = getattr(awaitable, "cr_frame", None) or getattr(awaitable, "ag_frame", None) or getattr(awaitable, "gi_frame", None)
+        if frame is None:
+            break
+        frames.append(frame)
+        awaitable = getattr(awaitable, "cr_await", None) or getattr(awaitable, "gi_yieldfrom", None)
+    labels = [frame_label(frame) for frame in frames]
+    if awaitable is not None:
+        labels.append(f"<awaiting {type(awaitable).__name__}>")
+    elif frames and thread_frame is not None:
+        # The task is executing: add the synchronous frames below its innermost coroutine
+        live = []
+        frame = thread_frame
+        while frame is not None and frame is not frames[-1]:
+            live.append(frame)
+            frame = frame.f_back
+        if frame is not None:
+            labels.extend(frame_label(f) for f in reversed(live))
+    return tuple(labels)
+
+
+class SlowRequestProfiler:
+    """Samples in-flight requests and dumps a profile for those slower than ``threshold``.
+
+    While any request is in flight a daemon thread wakes every ``interval``
+    seconds and records where each request's task is: its await chain, or
+    the live call stack when it is the one running on the event loop. When
+    a request finishes over the threshold its samples are written in folded
+    stack format (one ``frame;frame;frame count`` line per stack, readable by
+    speedscope or flamegraph.pl) to ``output_dir``.
+    """
+
+    def __init__(self, threshold: float, output_dir: str, interval: float = 0.005, max_samples: int = 20_000):
+        self.threshold = threshold
+        self.output_dir = Path(output_dir)
+        self.interval = interval
+        self.max_samples = max_samples
+        self._active: Dict[int, Tuple[asyncio.Task, int, Counter]] = {}
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.profiles_written = 0
+
+    def begin(self) -> Optional[int]:
+        task = asyncio.current_task()
+        if task is None:
+            return None
+        samples: Counter = Counter()
+        with self._lock:
+            self._active[id(samples)] = (task, threading.get_ident(), samples)
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="slow-request-profiler", daemon=True)
+            self._thread.start()
+        self._wake.set()
+        return id(samples)
+
+    def end(self, token: Optional[int], seconds: float, label: str) -> None:
+        if token is None:
+            return
+        with self._lock:
+            _, _, samples = self._active.pop(token)
+        if seconds < self.threshold or not samples:
+            return
+        asyncio.get_running_loop().run_in_executor(None, self._write, samples, seconds, label)
+
+    def _run(self) -> None:
+        while True:
+            with self._lock:
+                active = list(self._active.values())
+            if not active:
+                self._wake.wait()
+                self._wake.clear()
+                continue
+            thread_frames = sys._current_frames()
+            for task, thread_id, samples in active:
+                if sum(samples.values()) >= self.max_samples:
+                    continue
+                try:
+                    samples[task_stack(task, thread_frames.get(thread_id))] += 1
+                except Exception:
+                    # Frames can finish under us; losing a sample is fine
+                    continue
+            time.sleep(self.interval)
+
+    def _write(self, samples: Counter, seconds: float, label: str) -> None:
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        slug = "".join(c if c.isalnum() else "_" for c in label).strip("_")
+        path = self.output_dir / f"{time.strftime('%Y%m%d-%H%M%S')}-{slug}-{int(seconds * 1000)}ms.folded"
+        lines: List[str] = [f"{';'.join(stack)} {count}" for stack, count in samples.most_common() if stack]
+        path.write_text("\n".join(lines) + "\n")
+        self.profiles_written += 1
+        logger.info("Slow request %s took %.2fs; profile written to %s", label, seconds, path)
+
+
+class ServerTimingMiddleware:
+    """ASGI middleware that times each request and reports phases in a ``Server-Timing`` header"""
+
+    def __init__(self, app, profiler: Optional[SlowRequestProfiler] = None):
+        self.app = app
+        self.profiler = profiler
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timer = PhaseTimer()
+        reset = _current_timer.set(timer)
+        token = self.profiler.begin() if self.profiler else None
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start":
+                now = time.perf_counter()
+                if timer.handler_finished is not None:
+                    timer.record("serialize", now - timer.handler_finished)
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", timer.header_value(now - timer.started).encode("latin-1")))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current_timer.reset(reset)
+            if self.profiler:
+                self.profiler.end(token, time.perf_counter() - timer.started, f"{scope['method']} {scope['path']}")
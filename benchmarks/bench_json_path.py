@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Benchmark: per-request CPU time of the chat JSON path, stdlib vs orjson fast path.
+
+Covers the serialization work /api/chat does around one upstream call on a
+session with some history: encoding the Venice request body, decoding the
+Venice response, and producing the HTTP response. The baseline rebuilds the
+whole body dict and uses stdlib json plus pydantic ChatResponse validation
+and JSONResponse; the fast path uses pre-encoded orjson fragments and
+ORJSONResponse without response-model validation.
+
+Usage: python benchmarks/bench_json_path.py [--iterations 20000] [--turns 10]
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+os.environ.setdefault("VENICE_API_KEY", "bench")
+os.environ.setdefault("RATE_LIMIT_STORAGE", "memory")
+
+import orjson  # noqa: E402
+from fastapi.encoders import jsonable_encoder  # noqa: E402
+from fastapi.responses import JSONResponse  # noqa: E402
+
+import server  # noqa: E402
+from session_store import ChatSession  # noqa: E402
+
+REPLY = "I specialize in full-stack development with React, Next.js, Python, and Rust. " * 6
+
+
+def baseline_request(messages):
+    body = {
+        "model": "qwen3-235b",
+        "messages": messages,
+        "temperature": 0.7,
+        "max_completion_tokens": 512,
+        "venice_parameters": {"include_venice_system_prompt": False, "enable_web_search": "on"},
+    }
+    # What httpx does with json=
+    request_bytes = json.dumps(body).encode()
+    return request_bytes
+
+
+def baseline_response(upstream_bytes, session_id):
+    content = json.loads(upstream_bytes)["choices"][0]["message"]["content"]
+    model = server.ChatResponse(response=content, sessionId=session_id)
+    # FastAPI re-validates a returned model against response_model before encoding it
+    validated = server.ChatResponse.model_validate(model.model_dump())
+    return JSONResponse(jsonable_encoder(validated)).body
+
+
+def fast_request(messages):
+    return server.venice_request_content(messages, server.model_router.routes["fresh"])
+
+
+def fast_response(upstream_bytes, session_id):
+    content = orjson.loads(upstream_bytes)["choices"][0]["message"]["content"]
+    return server.chat_response(content, session_id).body
+
+
+def cpu_us(request_fn, response_fn, messages, upstream_bytes, iterations):
+    t0 = time.process_time()
+    for _ in range(iterations):
+        request_fn(messages)
+        response_fn(upstream_bytes, "3f1c2a9e-5b7d-4e1a-9c3b-2d8f6a1e7b4c")
+    return (time.process_time() - t0) / iterations * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--iterations", type=int, default=20000)
+    parser.add_argument("--turns", type=int, default=10, help="prior exchanges in the session")
+    args = parser.parse_args()
+
+    session = ChatSession()
+    for i in range(args.turns):
+        session.add_turn(f"Question {i} about your projects and experience?", REPLY)
+    messages = server.build_chat_messages(session, "What are you working on right now?")
+    upstream_bytes = json.dumps({
+        "choices": [{"message": {"role": "assistant", "content": REPLY}}],
+        "usage": {"prompt_tokens": 900, "completion_tokens": 120},
+    }).encode()
+
+    assert json.loads(fast_request(messages)) == json.loads(baseline_request(messages))
+
+    baseline = cpu_us(baseline_request, baseline_response, messages, upstream_bytes, args.iterations)
+    fast = cpu_us(fast_request, fast_response, messages, upstream_bytes, args.iterations)
+    print(f"{len(messages)} messages, {len(baseline_request(messages)):,} byte request body")
+    print(f"stdlib json + pydantic: {baseline:8.1f} us CPU per request")
+    print(f"orjson fast path:       {fast:8.1f} us CPU per request  ({baseline / fast:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
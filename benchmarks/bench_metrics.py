@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Benchmark: cost of metrics instrumentation on the request hot path.
+
+Measures the raw cost of a counter increment and a histogram observation,
+then drives a trivial ASGI app directly (no sockets) with and without
+MetricsMiddleware to show the per-request overhead it adds. Ends with the
+time to render a scrape.
+
+Usage: python benchmarks/bench_metrics.py [--ops 1000000] [--requests 50000]
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+from metrics import MetricsMiddleware, Registry  # noqa: E402
+
+
+def per_op_ns(fn, ops: int) -> float:
+    t0 = time.perf_counter()
+    for _ in range(ops):
+        fn()
+    return (time.perf_counter() - t0) / ops * 1e9
+
+
+async def endpoint(scope, receive, send):
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b"ok"})
+
+
+class FakeApp:
+    routes = []
+
+
+async def drive(app, requests: int) -> float:
+    scope = {"type": "http", "method": "GET", "path": "/api/", "app": FakeApp(), "endpoint": endpoint}
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        pass
+
+    t0 = time.perf_counter()
+    for _ in range(requests):
+        await app(dict(scope), receive, send)
+    return (time.perf_counter() - t0) / requests * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--ops", type=int, default=1_000_000)
+    parser.add_argument("--requests", type=int, default=50_000)
+    args = parser.parse_args()
+
+    registry = Registry()
+    counter = registry.counter("bench_total", "Bench counter", ("route",))
+    histogram = registry.histogram("bench_seconds", "Bench latency", ("method", "route", "status"))
+    child_counter = counter.labels("/api/chat")
+    child_histogram = histogram.labels("POST", "/api/chat", "200")
+
+    print(f"counter.inc (bound child):       {per_op_ns(child_counter.inc, args.ops):8.1f} ns")
+    print(f"counter.labels(...).inc:         {per_op_ns(lambda: counter.labels('/api/chat').inc(), args.ops):8.1f} ns")
+    print(f"histogram.observe (bound child): {per_op_ns(lambda: child_histogram.observe(0.042), args.ops):8.1f} ns")
+    print(f"histogram.labels(...).observe:   "
+          f"{per_op_ns(lambda: histogram.labels('POST', '/api/chat', '200').observe(0.042), args.ops):8.1f} ns")
+
+    bare = asyncio.run(drive(endpoint, args.requests))
+    timed = asyncio.run(drive(MetricsMiddleware(endpoint, histogram), args.requests))
+    print(f"ASGI request, bare:              {bare:8.2f} us")
+    print(f"ASGI request, with middleware:   {timed:8.2f} us  (+{timed - bare:.2f} us)")
+
+    for i in range(50):
+        histogram.labels("GET", f"/api/route-{i}", "200").observe(0.01)
+    t0 = time.perf_counter()
+    body = registry.render()
+    print(f"render 51 histogram series:      {(time.perf_counter() - t0) * 1e3:8.2f} ms ({len(body):,} bytes)")
+
+
+if __name__ == "__main__":
+    main()
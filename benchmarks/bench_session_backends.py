@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Benchmark: chat-turn latency against the in-memory and SQLite session stores.
+
+Each simulated turn does what chat_with_ai does around the upstream call:
+look the session up, append a user/assistant exchange and store it back.
+Turns are spread over many sessions and run on an event loop with the
+store's background tasks (SQLite write-behind flusher) active.
+
+Usage: python benchmarks/bench_session_backends.py [--turns 20000] [--sessions 500]
+"""
+
+import argparse
+import asyncio
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+from session_store import ChatSession, InMemorySessionStore, SessionStore  # noqa: E402
+from sqlite_session_store import SQLiteSessionStore  # noqa: E402
+
+USER_MESSAGE = "What technologies do you work with?"
+AI_RESPONSE = "I specialize in full-stack development with React, Next.js, Python, and Rust. " * 3
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+async def run_turns(store: SessionStore, turns: int, sessions: int) -> dict:
+    await store.start()
+    samples = []
+    started = time.perf_counter()
+    for i in range(turns):
+        session_id = f"session-{i % sessions}"
+        t0 = time.perf_counter()
+        session = store.get(session_id) or ChatSession()
+        session.add_turn(USER_MESSAGE, AI_RESPONSE)
+        store[session_id] = session
+        samples.append(time.perf_counter() - t0)
+        if i % 100 == 0:
+            # Yield like a real request would while awaiting the upstream
+            await asyncio.sleep(0)
+    elapsed = time.perf_counter() - started
+    await store.close()
+    return {
+        "turns_per_sec": turns / elapsed,
+        "mean_us": statistics.mean(samples) * 1e6,
+        "p50_us": percentile(samples, 50) * 1e6,
+        "p99_us": percentile(samples, 99) * 1e6,
+    }
+
+
+async def cold_reads(path: str, sessions: int) -> float:
+    """Mean latency of a cache-miss read (e.g. a follow-up landing on another worker)"""
+    store = SQLiteSessionStore(path, cache_size=1)
+    t0 = time.perf_counter()
+    for i in range(sessions):
+        store.get(f"session-{i}")
+    elapsed = time.perf_counter() - t0
+    await store.close()
+    return elapsed / sessions * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--turns", type=int, default=20000)
+    parser.add_argument("--sessions", type=int, default=500)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = str(Path(tmp) / "sessions.db")
+        results = {
+            "memory": asyncio.run(run_turns(InMemorySessionStore(), args.turns, args.sessions)),
+            "sqlite": asyncio.run(run_turns(SQLiteSessionStore(db_path), args.turns, args.sessions)),
+        }
+        cold_us = asyncio.run(cold_reads(db_path, args.sessions))
+
+    print(f"{args.turns} turns over {args.sessions} sessions")
+    print(f"{'':8}{'turns/s':>12}{'mean us':>10}{'p50 us':>10}{'p99 us':>10}")
+    for name, r in results.items():
+        print(f"{name:8}{r['turns_per_sec']:>12,.0f}{r['mean_us']:>10.1f}{r['p50_us']:>10.1f}{r['p99_us']:>10.1f}")
+    print(f"sqlite cold read (cache miss): {cold_us:.1f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark: per-turn cost and memory of chat session storage.
+
+Compares the original representation (copy the history list every turn,
+per-message dicts with ISO timestamp strings) against ChatSession
+(__slots__ records, epoch-float timestamps, in-place bounded deque).
+
+Usage: python benchmarks/bench_session_storage.py [--turns 500]
+"""
+
+import argparse
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+from session_store import ChatSession  # noqa: E402
+
+USER_MESSAGE = "What technologies do you work with?"
+AI_RESPONSE = "I specialize in full-stack development with React, Next.js, Python, and Rust. " * 3
+
+
+def legacy_turn(sessions: dict, session_id: str) -> None:
+    session_data = sessions.get(session_id, {})
+    conversation_history = session_data.get("messages", [])
+    new_messages = conversation_history + [
+        {"role": "user", "content": USER_MESSAGE, "timestamp": datetime.utcnow().isoformat()},
+        {"role": "assistant", "content": AI_RESPONSE, "timestamp": datetime.utcnow().isoformat()},
+    ]
+    sessions[session_id] = {"messages": new_messages, "updatedAt": datetime.utcnow().isoformat()}
+
+
+def compact_turn(sessions: dict, session_id: str, max_messages: int) -> None:
+    session = sessions.get(session_id)
+    if session is None:
+        session = sessions[session_id] = ChatSession(max_messages=max_messages)
+    session.add_turn(USER_MESSAGE, AI_RESPONSE)
+
+
+def time_turns(turn, turns: int) -> dict:
+    """Time every turn of one growing session; report early vs late per-turn cost"""
+    samples = []
+    for _ in range(turns):
+        start = time.perf_counter()
+        turn()
+        samples.append(time.perf_counter() - start)
+    window = max(1, turns // 10)
+    return {
+        "first_turns_us": sum(samples[:window]) / window * 1e6,
+        "last_turns_us": sum(samples[-window:]) / window * 1e6,
+        "total_ms": sum(samples) * 1e3,
+    }
+
+
+def memory_per_1k_messages(turn) -> float:
+    """Bytes allocated to hold 1,000 messages (500 turns) in one session"""
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    for _ in range(500):
+        turn()
+    current = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return current - baseline
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--turns", type=int, default=2000, help="turns to run in a single session")
+    parser.add_argument("--window", type=int, default=100, help="retained messages for ChatSession")
+    args = parser.parse_args()
+
+    legacy_sessions: dict = {}
+    compact_sessions: dict = {}
+    results = {
+        "legacy": time_turns(lambda: legacy_turn(legacy_sessions, "s"), args.turns),
+        "compact": time_turns(lambda: compact_turn(compact_sessions, "s", args.window), args.turns),
+    }
+
+    # Memory is measured with a window large enough to keep all 1k messages,
+    # so both sides hold the same data.
+    legacy_mem_sessions: dict = {}
+    compact_mem_sessions: dict = {}
+    results["legacy"]["bytes_per_1k_messages"] = memory_per_1k_messages(
+        lambda: legacy_turn(legacy_mem_sessions, "s"))
+    results["compact"]["bytes_per_1k_messages"] = memory_per_1k_messages(
+        lambda: compact_turn(compact_mem_sessions, "s", 1000))
+
+    print(f"{args.turns} turns in one session, ChatSession window={args.window}")
+    print(f"{'':10}{'first 10% us/turn':>20}{'last 10% us/turn':>20}{'total ms':>12}{'bytes/1k msgs':>16}")
+    for name, r in results.items():
+        print(f"{name:10}{r['first_turns_us']:>20.2f}{r['last_turns_us']:>20.2f}"
+              f"{r['total_ms']:>12.1f}{r['bytes_per_1k_messages']:>16,}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Fake Venice AI chat completions server for offline load tests.
+
+Answers POST /chat/completions like Venice does, after a configurable
+time-to-first-token and at a configurable generation speed, so the
+backend can be loaded without network access or API spend. Streaming
+requests get the reply token by token as server-sent events; plain
+requests wait for the whole generation time and return usage counts.
+
+Usage: python benchmarks/fake_venice.py [--port 8010] [--latency-ms 300] [--token-rate 50]
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import threading
+import time
+from dataclasses import dataclass
+
+import uvicorn
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, StreamingResponse
+from starlette.routing import Route
+
+WORDS = ("I", "build", "AI", "systems", "with", "Python", "React", "and", "Rust", "for", "real", "users")
+
+
+@dataclass
+class VeniceProfile:
+    """Upstream behaviour: time to first token, jitter around it, and tokens/second afterwards"""
+
+    latency_ms: float = 300.0
+    jitter_ms: float = 100.0
+    token_rate: float = 50.0
+    completion_tokens: int = 60
+    error_rate: float = 0.0
+
+    def first_token_delay(self) -> float:
+        return max(0.0, self.latency_ms + random.uniform(-self.jitter_ms, self.jitter_ms)) / 1000
+
+    def generation_time(self) -> float:
+        return self.completion_tokens / self.token_rate if self.token_rate > 0 else 0.0
+
+
+def create_app(profile: VeniceProfile) -> Starlette:
+    stats = {"requests": 0, "streams": 0, "errors": 0}
+
+    async def completions(request: Request):
+        body = await request.json()
+        stats["requests"] += 1
+        prompt_tokens = sum(len(str(m.get("content", ""))) for m in body.get("messages", [])) // 4
+        tokens = [WORDS[i % len(WORDS)] for i in range(profile.completion_tokens)]
+
+        await asyncio.sleep(profile.first_token_delay())
+        if profile.error_rate and random.random() < profile.error_rate:
+            stats["errors"] += 1
+            return JSONResponse({"error": "fake upstream error"}, status_code=503)
+
+        if body.get("stream"):
+            stats["streams"] += 1
+
+            async def stream():
+                interval = 1 / profile.token_rate if profile.token_rate > 0 else 0
+                for token in tokens:
+                    chunk = {"choices": [{"delta": {"content": token + " "}}]}
+                    yield f"data: {json.dumps(chunk)}\n\n"
+                    await asyncio.sleep(interval)
+                yield "data: [DONE]\n\n"
+
+            return StreamingResponse(stream(), media_type="text/event-stream")
+
+        await asyncio.sleep(profile.generation_time())
+        return JSONResponse({
+            "choices": [{"message": {"role": "assistant", "content": " ".join(tokens)}}],
+            "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": len(tokens)},
+        })
+
+    async def fake_stats(request: Request):
+        return JSONResponse(stats)
+
+    return Starlette(routes=[
+        Route("/chat/completions", completions, methods=["POST"]),
+        Route("/stats", fake_stats),
+    ])
+
+
+class FakeVeniceServer:
+    """Runs the fake upstream under uvicorn on a background thread"""
+
+    def __init__(self, profile: VeniceProfile, port: int = 0):
+        self.config = uvicorn.Config(create_app(profile), host="127.0.0.1", port=port, log_level="warning")
+        self.server = uvicorn.Server(self.config)
+        self.thread = threading.Thread(target=self.server.run, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server.servers[0].sockets[0].getsockname()[:2]
+        return f"http://{host}:{port}"
+
+    def __enter__(self):
+        self.thread.start()
+        while not self.server.started:
+            time.sleep(0.01)
+        return self
+
+    def __exit__(self, *exc):
+        self.server.should_exit = True
+        self.thread.join()
+
+
+def add_profile_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--latency-ms", type=float, default=300.0, help="upstream time to first token")
+    parser.add_argument("--jitter-ms", type=float, default=100.0, help="uniform jitter around the latency")
+    parser.add_argument("--token-rate", type=float, default=50.0, help="generated tokens per second")
+    parser.add_argument("--completion-tokens", type=int, default=60)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of calls answered with 503")
+
+
+def profile_from_args(args: argparse.Namespace) -> VeniceProfile:
+    return VeniceProfile(args.latency_ms, args.jitter_ms, args.token_rate, args.completion_tokens, args.error_rate)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--port", type=int, default=8010)
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+    uvicorn.run(create_app(profile_from_args(args)), host="127.0.0.1", port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
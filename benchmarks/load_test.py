@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+"""
+Load test: concurrent /api/chat and /api/contact traffic against a local fake Venice.
+
+The backend runs either in-process (requests go straight to the ASGI app
+through httpx, no sockets) or as a real uvicorn subprocess, with
+VENICE_BASE_URL pointed at benchmarks/fake_venice.py. Rate limits are
+lifted and all state files go to a temporary directory. Reports
+throughput, p50/p95/p99 latency per endpoint, error counts and resident
+memory growth, and writes them as JSON so runs on different commits can
+be compared with --compare.
+
+Usage:
+    python benchmarks/load_test.py [--mode inprocess|uvicorn] [--requests 2000] [--concurrency 50]
+                                   [--contact-ratio 0.1] [--latency-ms 300] [--token-rate 50]
+                                   [--output benchmarks/results/run.json] [--compare baseline.json]
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import httpx
+
+BENCH_DIR = Path(__file__).resolve().parent
+REPO_DIR = BENCH_DIR.parent
+BACKEND_DIR = REPO_DIR / "backend"
+sys.path.insert(0, str(BACKEND_DIR))
+sys.path.insert(0, str(BENCH_DIR))
+
+from fake_venice import FakeVeniceServer, add_profile_arguments, profile_from_args  # noqa: E402
+
+CONTACT = {
+    "name": "Load Test",
+    "email": "load@example.com",
+    "company": "Bench",
+    "subject": "Benchmark",
+    "message": "Checking how the contact form holds up under load.",
+}
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def rss_bytes(pid: str = "self") -> int:
+    """Resident set size from /proc (Linux); 0 where unavailable"""
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return 0
+
+
+def backend_env(venice_url: str, data_dir: str) -> Dict[str, str]:
+    return {
+        "VENICE_API_KEY": "load-test",
+        "VENICE_BASE_URL": venice_url,
+        "RATE_LIMIT_STORAGE": "memory",
+        "CHAT_RATE_LIMIT_PER_IP": "1000000/second",
+        "CHAT_RATE_LIMIT_PER_SESSION": "1000000/second",
+        "CONTACT_OUTBOX_PATH": str(Path(data_dir) / "outbox.db"),
+        "SESSION_DB_PATH": str(Path(data_dir) / "sessions.db"),
+        "CHAT_FAQ_FILE": "",
+    }
+
+
+@asynccontextmanager
+async def inprocess_backend(env: Dict[str, str]):
+    os.environ.update(env)
+    import server
+
+    # Per-request INFO logs would dominate the run
+    logging.getLogger().setLevel(logging.WARNING)
+
+    async with server.app.router.lifespan_context(server.app):
+        transport = httpx.ASGITransport(app=server.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://backend", timeout=120) as client:
+            yield client, "self"
+
+
+@asynccontextmanager
+async def uvicorn_backend(env: Dict[str, str], port: int):
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "server:app", "--port", str(port), "--log-level", "warning"],
+        cwd=BACKEND_DIR,
+        env={**os.environ, **env},
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        async with httpx.AsyncClient(
+            base_url=base_url, timeout=120, limits=httpx.Limits(max_connections=1000)
+        ) as client:
+            for _ in range(200):
+                try:
+                    await client.get("/api/")
+                    break
+                except httpx.TransportError:
+                    await asyncio.sleep(0.05)
+            else:
+                raise RuntimeError(f"uvicorn did not come up on {base_url}")
+            yield client, str(proc.pid)
+    finally:
+        proc.terminate()
+        proc.wait(timeout=10)
+
+
+async def one_request(client: httpx.AsyncClient, i: int, contact_ratio: float, repeat_ratio: float):
+    if random.random() < contact_ratio:
+        return "contact", await client.post("/api/contact", json=CONTACT)
+    # Repeated prompts exercise the response cache, unique ones go upstream
+    message = "What do you work on?" if random.random() < repeat_ratio else f"Question number {i}: what do you build?"
+    return "chat", await client.post("/api/chat", json={"message": message})
+
+
+async def drive(client: httpx.AsyncClient, args: argparse.Namespace) -> Dict:
+    latencies: Dict[str, List[float]] = defaultdict(list)
+    statuses: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+    queue: "asyncio.Queue[int]" = asyncio.Queue()
+    for i in range(args.requests):
+        queue.put_nowait(i)
+
+    async def worker():
+        while not queue.empty():
+            i = queue.get_nowait()
+            started = time.perf_counter()
+            try:
+                endpoint, response = await one_request(client, i, args.contact_ratio, args.repeat_ratio)
+                status = str(response.status_code)
+            except httpx.HTTPError as e:
+                endpoint, status = "chat", type(e).__name__
+            latencies[endpoint].append(time.perf_counter() - started)
+            statuses[endpoint][status] += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+    elapsed = time.perf_counter() - started
+
+    endpoints = {}
+    for endpoint, samples in latencies.items():
+        endpoints[endpoint] = {
+            "requests": len(samples),
+            "throughputRps": round(len(samples) / elapsed, 2),
+            "p50Ms": round(percentile(samples, 50) * 1000, 2),
+            "p95Ms": round(percentile(samples, 95) * 1000, 2),
+            "p99Ms": round(percentile(samples, 99) * 1000, 2),
+            "maxMs": round(max(samples) * 1000, 2),
+            "statuses": dict(statuses[endpoint]),
+        }
+    return {"elapsedSeconds": round(elapsed, 3), "throughputRps": round(args.requests / elapsed, 2), "endpoints": endpoints}
+
+
+def git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=REPO_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def run(args: argparse.Namespace) -> Dict:
+    profile = profile_from_args(args)
+    with tempfile.TemporaryDirectory() as data_dir, FakeVeniceServer(profile) as venice:
+        env = backend_env(venice.base_url, data_dir)
+        backend = inprocess_backend(env) if args.mode == "inprocess" else uvicorn_backend(env, args.port)
+        async with backend as (client, pid):
+            # Warm up connections and lazily created state before measuring
+            args_warmup = argparse.Namespace(**{**vars(args), "requests": min(args.warmup, args.requests)})
+            await drive(client, args_warmup)
+            rss_before = rss_bytes(pid)
+            results = await drive(client, args)
+            rss_after = rss_bytes(pid)
+
+    return {
+        "revision": git_revision(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "mode": args.mode,
+        "config": {
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "contactRatio": args.contact_ratio,
+            "repeatRatio": args.repeat_ratio,
+            "venice": vars(profile),
+        },
+        **results,
+        "memory": {
+            "rssBeforeMb": round(rss_before / 2**20, 1),
+            "rssAfterMb": round(rss_after / 2**20, 1),
+            "rssGrowthMb": round((rss_after - rss_before) / 2**20, 1),
+        },
+    }
+
+
+def print_report(report: Dict, baseline: Optional[Dict] = None) -> None:
+    print(f"{report['mode']} @ {report['revision']}: {report['throughputRps']:.1f} req/s overall, "
+          f"RSS {report['memory']['rssBeforeMb']} -> {report['memory']['rssAfterMb']} MB")
+    print(f"{'endpoint':10}{'req':>7}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}  statuses")
+    for name, r in report["endpoints"].items():
+        print(f"{name:10}{r['requests']:>7}{r['throughputRps']:>10.1f}{r['p50Ms']:>10.1f}"
+              f"{r['p95Ms']:>10.1f}{r['p99Ms']:>10.1f}  {r['statuses']}")
+        old = (baseline or {}).get("endpoints", {}).get(name)
+        if old:
+            deltas = "  ".join(
+                f"{key} {100 * (r[key] - old[key]) / old[key]:+.1f}%"
+                for key in ("throughputRps", "p50Ms", "p95Ms", "p99Ms") if old[key]
+            )
+            print(f"{'':10}vs {baseline.get('revision')}: {deltas}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--mode", choices=("inprocess", "uvicorn"), default="inprocess")
+    parser.add_argument("--port", type=int, default=8765, help="backend port in uvicorn mode")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--warmup", type=int, default=100)
+    parser.add_argument("--contact-ratio", type=float, default=0.1, help="fraction of requests to /api/contact")
+    parser.add_argument("--repeat-ratio", type=float, default=0.0, help="fraction of chat prompts that repeat")
+    parser.add_argument("--output", type=Path, help="write the JSON report here")
+    parser.add_argument("--compare", type=Path, help="JSON report of a previous run to compare against")
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+
+    report = asyncio.run(run(args))
+    baseline = json.loads(args.compare.read_text()) if args.compare else None
+    print_report(report, baseline)
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(json.dumps(report, indent=2) + "\n")
+        print(f"wrote {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,17 +1,24 @@
-import React, { useState } from 'react';
+import React, { useState, useEffect } from 'react';
 import { ExternalLink, Github, Star, Code, Zap } from 'lucide-react';
-import { mockProjects } from '../data/mock';
+import { contentAPI } from '../services/api';
 import { Project } from '../types';
 
 const Projects: React.FC = () => {
   const [filter, setFilter] = useState<string>('all');
   const [hoveredProject, setHoveredProject] = useState<number | null>(null);
+  const [projects, setProjects] = useState<Project[]>([]);
+
+  useEffect(() => {
+    contentAPI.getProjects()
+      .then(setProjects)
+      .catch(() => setProjects([]));
+  }, []);
 
   const filteredProjects: Project[] = filter === 'all'
-    ? mockProjects
+    ? projects
     : filter === 'featured'
-    ? mockProjects.filter(p => p.featured)
-    : mockProjects;
+    ? projects.filter(p => p.featured)
+    : projects;
 
   return (
     <section id="projects" className="py-24 bg-gray-50">
@@ -1,10 +1,11 @@
 import React, { useState, useEffect, useRef } from 'react';
 import { Brain, Code, Cog, Cloud, Beaker, Database, LucideIcon } from 'lucide-react';
-import { mockSkillsData } from '../data/mock';
-import { SkillCategory } from '../types';
+import { contentAPI } from '../services/api';
+import { SkillCategory, SkillsData } from '../types';
 
 const Skills: React.FC = () => {
   const [isVisible, setIsVisible] = useState<boolean>(false);
+  const [skillsData, setSkillsData] = useState<SkillsData | null>(null);
   const sectionRef = useRef<HTMLElement>(null);
 
   useEffect(() => {
@@ -24,51 +25,61 @@ const Skills: React.FC = () => {
     return () => observer.disconnect();
   }, []);
 
+  useEffect(() => {
+    contentAPI.getSkills()
+      .then(setSkillsData)
+      .catch(() => setSkillsData(null));
+  }, []);
+
   const skillCategories = [
     {
       title: 'AI Generalist',
       icon: Brain,
       color: 'from-purple-500 to-pink-500',
-      data: mockSkillsData.aiGeneralist,
+      key: 'aiGeneralist' as keyof SkillsData,
       bgColor: 'bg-purple-50'
     },
     {
       title: 'Full-Stack Development',
       icon: Code,
       color: 'from-blue-500 to-cyan-500',
-      data: mockSkillsData.fullStack,
+      key: 'fullStack' as keyof SkillsData,
       bgColor: 'bg-blue-50'
     },
     {
       title: 'Process Optimization',
       icon: Cog,
       color: 'from-green-500 to-emerald-500',
-      data: mockSkillsData.processOptimization,
+      key: 'processOptimization' as keyof SkillsData,
       bgColor: 'bg-green-50'
     },
     {
       title: 'DevOps & Cloud',
       icon: Cloud,
       color: 'from-orange-500 to-red-500',
-      data: mockSkillsData.devOps,
+      key: 'devOps' as keyof SkillsData,
       bgColor: 'bg-orange-50'
     },
     {
       title: 'BioPharma Ops',
       icon: Beaker,
       color: 'from-indigo-500 to-purple-500',
-      data: mockSkillsData.bioPharma,
+      key: 'bioPharma' as keyof SkillsData,
       bgColor: 'bg-indigo-50'
     },
     {
       title: 'Data Engineering',
       icon: Database,
       color: 'from-teal-500 to-blue-500',
-      data: mockSkillsData.dataEngineering,
+      key: 'dataEngineering' as keyof SkillsData,
       bgColor: 'bg-teal-50'
     }
   ];
 
+  const loadedCategories = skillsData
+    ? skillCategories.map((category) => ({ ...category, data: skillsData[category.key] }))
+    : [];
+
   return (
     <section id="skills" ref={sectionRef} className="py-24 bg-white">
       <div className="container mx-auto px-6 max-w-6xl">
@@ -85,7 +96,7 @@ const Skills: React.FC = () => {
 
         {/* Skills Grid */}
         <div className="grid md:grid-cols-2 lg:grid-cols-3 gap-8">
-          {skillCategories.map((category, index) => {
+          {loadedCategories.map((category, index) => {
             const IconComponent: LucideIcon = category.icon;
 
             return (
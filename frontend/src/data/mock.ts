@@ -1,5 +1,5 @@
 // Mock data for Tolu Shekoni's AI Portfolio
-import { ChatMessage, Project, SkillCategory } from '../types';
+import { ChatMessage } from '../types';
 
 interface ChatConversation {
   id: number;
@@ -7,15 +7,6 @@ interface ChatConversation {
   answer: string;
 }
 
-interface SkillsData {
-  aiGeneralist: SkillCategory;
-  fullStack: SkillCategory;
-  processOptimization: SkillCategory;
-  devOps: SkillCategory;
-  bioPharma: SkillCategory;
-  dataEngineering: SkillCategory;
-}
-
 interface Testimonial {
   id: number;
   name: string;
@@ -52,86 +43,6 @@ export const mockChatConversations: ChatConversation[] = [
   }
 ];
 
-export const mockSkillsData: SkillsData = {
-  aiGeneralist: {
-    level: 95,
-    skills: ['LLM Integration', 'Prompt Engineering', 'AI Automations', 'Machine Learning']
-  },
-  fullStack: {
-    level: 90,
-    skills: ['React/Next.js', 'JavaScript/TypeScript', 'Python', 'Rust/WASM', 'Node.js']
-  },
-  processOptimization: {
-    level: 98,
-    skills: ['Lean Six Sigma', 'Data Analytics', 'Workflow Automation', 'Change Management']
-  },
-  devOps: {
-    level: 85,
-    skills: ['Docker', 'GitHub Actions', 'Cloud Deployment', 'CI/CD']
-  },
-  bioPharma: {
-    level: 95,
-    skills: ['cGMP', 'Technical Troubleshooting', 'Regulatory Compliance', 'Quality Systems']
-  },
-  dataEngineering: {
-    level: 88,
-    skills: ['ETL', 'Analytics', 'Data Visualization', 'Decision Support']
-  }
-};
-
-export const mockProjects: Project[] = [
-  {
-    id: 1,
-    title: "Web3 Portfolio",
-    description: "Designed and deployed a cutting-edge blockchain portfolio platform, blending smart contract integrations and decentralized identity for a seamless user experience.",
-    technologies: ["React", "Web3.js", "Solidity", "IPFS"],
-    image: "https://images.unsplash.com/photo-1639762681485-074b7f938ba0?w=600&h=400&fit=crop",
-    github: "#",
-    demo: "#",
-    featured: true
-  },
-  {
-    id: 2,
-    title: "Rust + WASM Editor",
-    description: "Created an in-browser code editor leveraging Rust and WASM, maximizing performance and interactivity for next-gen web applications.",
-    technologies: ["Rust", "WASM", "JavaScript", "Monaco Editor"],
-    image: "https://images.unsplash.com/photo-1555066931-4365d14bab8c?w=600&h=400&fit=crop",
-    github: "#",
-    demo: "#",
-    featured: true
-  },
-  {
-    id: 3,
-    title: "Spotify Pixel-Perfect Clone",
-    description: "Delivered a responsive, visually identical Spotify UI clone with advanced interactivity—showcasing an eye for design and UX.",
-    technologies: ["React", "CSS3", "JavaScript", "Responsive Design"],
-    image: "https://images.unsplash.com/photo-1493225457124-a3eb161ffa5f?w=600&h=400&fit=crop",
-    github: "#",
-    demo: "#",
-    featured: false
-  },
-  {
-    id: 4,
-    title: "Intent Journal",
-    description: "Built a minimal, sticky habit-tracking and reflection app—combining cognitive principles and modern web tech to empower positive change.",
-    technologies: ["React Native", "SQLite", "Node.js", "Express"],
-    image: "https://images.unsplash.com/photo-1484480974693-6ca0a78fb36b?w=600&h=400&fit=crop",
-    github: "#",
-    demo: "#",
-    featured: false
-  },
-  {
-    id: 5,
-    title: "QuickChops",
-    description: "Engineered an e-commerce and brand site for a family food business, raising conversions through engaging storytelling and zero-friction checkout flows.",
-    technologies: ["Next.js", "Stripe", "MongoDB", "Tailwind CSS"],
-    image: "https://images.unsplash.com/photo-1556909114-f6e7ad7d3136?w=600&h=400&fit=crop",
-    github: "#",
-    demo: "#",
-    featured: true
-  }
-];
-
 export const mockTestimonials: Testimonial[] = [
   {
     id: 1,
@@ -1,6 +1,6 @@
 // API service layer for Tolu Shekoni Portfolio
 import axios, { AxiosResponse } from 'axios';
-import { ChatRequest, ChatResponse, ContactForm, ContactResponse } from '../types';
+import { ChatRequest, ChatResponse, ContactForm, ContactResponse, Project, SkillsData } from '../types';
 
 const api = axios.create({
   baseURL: '/api',
@@ -32,6 +32,17 @@ export const contactAPI = {
   },
 };
 
+export const contentAPI = {
+  getSkills: async (): Promise<SkillsData> => {
+    const response: AxiosResponse<SkillsData> = await api.get('/skills');
+    return response.data;
+  },
+  getProjects: async (): Promise<Project[]> => {
+    const response: AxiosResponse<Project[]> = await api.get('/projects');
+    return response.data;
+  },
+};
+
 export const healthAPI = {
   checkStatus: async (): Promise<any> => {
     const response: AxiosResponse<any> = await api.get('/');
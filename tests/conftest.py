@@ -0,0 +1,32 @@
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent / "backend"
+sys.path.insert(0, str(BACKEND_DIR))
+
+os.environ.setdefault("VENICE_API_KEY", "test-key")
+
+# backend_test.py is a live smoke-test script run against a deployed URL,
+# not a pytest module.
+collect_ignore = ["backend_test.py"]
+
+
+@pytest.fixture(autouse=True)
+def reset_server_state(monkeypatch):
+    import server
+    from rate_limit import MemoryBucketStorage, TokenBucketLimiter
+    from resilience import CircuitBreaker, ResilientUpstream
+    from response_cache import ResponseCache
+
+    limiter = server.chat_rate_limiter
+    monkeypatch.setattr(server, "chat_rate_limiter", TokenBucketLimiter(
+        MemoryBucketStorage(), limiter.ip_rule, limiter.session_rule
+    ))
+    monkeypatch.setattr(server, "response_cache", ResponseCache())
+    breaker = CircuitBreaker()
+    monkeypatch.setattr(server, "venice_breaker", breaker)
+    monkeypatch.setattr(server, "venice_upstream", ResilientUpstream(breaker, base_delay=0.001))
+    yield
@@ -0,0 +1,78 @@
+"""Minimal local SMTP server for exercising the email worker"""
+
+import socketserver
+import threading
+
+
+class SMTPStub:
+    """Threaded plain-text SMTP server that records delivered messages.
+
+    ``drop_after`` closes each connection after that many messages, to
+    simulate a server dropping an idle or long-lived session;
+    ``reject_recipients`` answers every RCPT with a permanent 550.
+    """
+
+    def __init__(self, drop_after: int = 0, reject_recipients: bool = False):
+        self.drop_after = drop_after
+        self.reject_recipients = reject_recipients
+        self.messages = []
+        self.connections = 0
+        self.noops = 0
+        stub = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def reply(self, line: str):
+                self.wfile.write(f"{line}\r\n".encode())
+
+            def handle(self):
+                stub.connections += 1
+                delivered = 0
+                self.reply("220 stub ESMTP")
+                while True:
+                    line = self.rfile.readline()
+                    if not line:
+                        return
+                    command = line.decode().strip().upper()
+                    if command.startswith(("EHLO", "HELO")):
+                        self.reply("250 stub")
+                    elif command.startswith("RCPT") and stub.reject_recipients:
+                        self.reply("550 No such user")
+                    elif command.startswith(("MAIL", "RCPT", "RSET")):
+                        self.reply("250 OK")
+                    elif command.startswith("NOOP"):
+                        stub.noops += 1
+                        self.reply("250 OK")
+                    elif command.startswith("DATA"):
+                        self.reply("354 End data with <CR><LF>.<CR><LF>")
+                        data = []
+                        while True:
+                            chunk = self.rfile.readline()
+                            if chunk in (b".\r\n", b""):
+                                break
+                            data.append(chunk)
+                        stub.messages.append(b"".join(data).decode())
+                        self.reply("250 OK queued")
+                        delivered += 1
+                        if stub.drop_after and delivered >= stub.drop_after:
+                            return
+                    elif command.startswith("QUIT"):
+                        self.reply("221 Bye")
+                        return
+                    else:
+                        self.reply("502 Command not implemented")
+
+        self.server = socketserver.ThreadingTCPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def port(self) -> int:
+        return self.server.server_address[1]
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
@@ -0,0 +1,63 @@
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+
+import server
+from admission import AdmissionController, AdmissionRejected
+
+
+def test_queue_overflow_and_timeout_fail_fast():
+    async def scenario():
+        controller = AdmissionController(max_concurrent=1, max_queue=1, max_wait=0.05)
+        held = await controller.acquire("a")
+        waiting = asyncio.ensure_future(controller.acquire("b"))
+        await asyncio.sleep(0)
+        assert controller.stats()["queueDepth"] == 1
+
+        with pytest.raises(AdmissionRejected):
+            await controller.acquire("c")
+        with pytest.raises(AdmissionRejected) as timed_out:
+            await waiting
+        assert timed_out.value.retry_after == 1
+
+        held.release()
+        held.release()  # idempotent
+        return controller.stats()
+
+    stats = asyncio.run(scenario())
+    assert stats["active"] == 0
+    assert stats["queueDepth"] == 0
+    assert stats["rejectedQueueFull"] == 1
+    assert stats["rejectedTimeout"] == 1
+
+
+def test_slots_are_handed_out_round_robin_across_clients():
+    async def scenario():
+        controller = AdmissionController(max_concurrent=1, max_queue=10, max_wait=5)
+        order = []
+
+        async def call(client_key, label):
+            async with controller.slot(client_key):
+                order.append(label)
+                await asyncio.sleep(0)
+
+        first = await controller.acquire("heavy")
+        tasks = [asyncio.ensure_future(call("heavy", f"heavy{i}")) for i in range(3)]
+        tasks.append(asyncio.ensure_future(call("light", "light0")))
+        await asyncio.sleep(0)
+        first.release()
+        await asyncio.gather(*tasks)
+        return order
+
+    assert asyncio.run(scenario()) == ["heavy0", "light0", "heavy1", "heavy2"]
+
+
+def test_overloaded_chat_returns_503_with_retry_after(monkeypatch):
+    monkeypatch.setattr(server, "upstream_admission", AdmissionController(max_concurrent=0, max_queue=0, max_wait=3))
+
+    with TestClient(server.app) as client:
+        response = client.post("/api/chat", json={"message": "an uncached question"})
+
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == "3"
@@ -0,0 +1,60 @@
+import asyncio
+import time
+
+import httpx
+from fastapi.testclient import TestClient
+
+import server
+from cassette import Cassette, CassetteTransport
+from tests.venice_stub import VeniceStub
+
+
+def test_recorded_chat_replays_offline(tmp_path, monkeypatch):
+    cassette_path = str(tmp_path / "venice.jsonl")
+    monkeypatch.setattr(server, "VENICE_CASSETTE_PATH", cassette_path)
+    chat = {"message": "Tell me about your projects", "noCache": True}
+
+    with VeniceStub(reply="recorded answer") as stub:
+        monkeypatch.setattr(server, "VENICE_BASE_URL", stub.base_url)
+        monkeypatch.setattr(server, "VENICE_MODE", "record")
+        with TestClient(server.app) as client:
+            assert client.post("/api/chat", json=chat).json()["response"] == "recorded answer"
+            streamed = client.post("/api/chat/stream", json=chat).text
+            assert "recorded" in streamed
+
+    assert len(Cassette(cassette_path)) == 2
+
+    # The stub is gone; replay must not touch the network, even on another host
+    monkeypatch.setattr(server, "VENICE_BASE_URL", "http://127.0.0.1:9")
+    monkeypatch.setattr(server, "VENICE_MODE", "replay")
+    with TestClient(server.app) as client:
+        assert client.post("/api/chat", json=chat).json()["response"] == "recorded answer"
+        assert client.post("/api/chat/stream", json=chat).text.count("event: delta") == streamed.count("event: delta")
+
+        missing = client.post("/api/chat", json={"message": "never recorded", "noCache": True})
+        assert missing.status_code == 500
+
+
+def test_replay_can_reproduce_original_timing(tmp_path):
+    cassette_path = str(tmp_path / "venice.jsonl")
+
+    async def scenario():
+        with VeniceStub(reply="slow", delay=0.2) as stub:
+            recorder = CassetteTransport("record", Cassette(cassette_path), inner=httpx.AsyncHTTPTransport())
+            async with httpx.AsyncClient(transport=recorder, base_url=stub.base_url) as client:
+                response = await client.post("/chat/completions", json={"messages": []})
+                assert response.status_code == 200
+
+        timings = {}
+        for timed in (False, True):
+            replayer = CassetteTransport("replay", Cassette(cassette_path), replay_timing=timed)
+            async with httpx.AsyncClient(transport=replayer, base_url="http://offline") as client:
+                started = time.perf_counter()
+                response = await client.post("/chat/completions", json={"messages": []})
+                timings[timed] = time.perf_counter() - started
+                assert response.json()["choices"][0]["message"]["content"] == "slow"
+        return timings
+
+    timings = asyncio.run(scenario())
+    assert timings[False] < 0.1
+    assert timings[True] >= 0.2
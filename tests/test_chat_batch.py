@@ -0,0 +1,77 @@
+import asyncio
+import uuid
+
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+
+import server
+from rate_limit import BucketRule, MemoryBucketStorage, TokenBucketLimiter
+
+
+def test_batch_returns_results_in_order_with_per_item_errors(monkeypatch):
+    monkeypatch.setattr(server, "CHAT_BATCH_CONCURRENCY", 2)
+    running = {"now": 0, "peak": 0}
+    seen = {}
+
+    async def fake_completion(client, messages, client_key, route):
+        prompt = messages[-1]["content"]
+        seen[prompt] = [m["content"] for m in messages[1:-1]]
+        running["now"] += 1
+        running["peak"] = max(running["peak"], running["now"])
+        try:
+            await asyncio.sleep(0.02)
+            if prompt == "fail":
+                raise HTTPException(status_code=500, detail="Venice AI API error: 503")
+            return f"answer to {prompt}"
+        finally:
+            running["now"] -= 1
+
+    monkeypatch.setattr(server, "fetch_completion", fake_completion)
+    session = str(uuid.uuid4())
+    items = [
+        {"message": "first", "sessionId": session, "noCache": True},
+        {"message": "fail", "noCache": True},
+        {"message": "other", "noCache": True},
+        {"message": "second", "sessionId": session, "noCache": True},
+        {"message": "more", "noCache": True},
+    ]
+    with TestClient(server.app) as client:
+        response = client.post("/api/chat/batch", json={"items": items})
+
+    assert response.status_code == 200
+    body = response.json()
+    assert [r["response"] for r in body["results"]] == [
+        "answer to first", None, "answer to other", "answer to second", "answer to more"
+    ]
+    assert body["results"][1]["error"] == "Venice AI API error: 503"
+    assert (body["succeeded"], body["failed"]) == (4, 1)
+    assert running["peak"] == 2
+
+    # Items of one session run in order, each seeing the previous turn
+    assert body["results"][3]["sessionId"] == session
+    assert seen["second"] == ["first", "answer to first"]
+    assert len({r["sessionId"] for r in body["results"]}) == 4
+
+
+def test_batch_size_is_validated():
+    with TestClient(server.app) as client:
+        assert client.post("/api/chat/batch", json={"items": []}).status_code == 422
+        too_many = [{"message": "hi"}] * (server.CHAT_BATCH_MAX_ITEMS + 1)
+        assert client.post("/api/chat/batch", json={"items": too_many}).status_code == 422
+
+
+def test_each_upstream_item_costs_a_rate_limit_token(monkeypatch):
+    monkeypatch.setattr(server, "chat_rate_limiter", TokenBucketLimiter(
+        MemoryBucketStorage(), BucketRule.parse("ip", "2/minute"), BucketRule.parse("session", "10/minute")
+    ))
+
+    async def fake_completion(client, messages, client_key, route):
+        return "ok"
+
+    monkeypatch.setattr(server, "fetch_completion", fake_completion)
+    items = [{"message": f"question {n}", "noCache": True} for n in range(4)]
+    with TestClient(server.app) as client:
+        body = client.post("/api/chat/batch", json={"items": items}).json()
+
+    assert (body["succeeded"], body["failed"]) == (2, 2)
+    assert all(r["error"].startswith("Rate limit exceeded for ip") for r in body["results"] if r["error"])
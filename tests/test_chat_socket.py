@@ -0,0 +1,131 @@
+import asyncio
+import time
+import uuid
+
+import pytest
+from fastapi.testclient import TestClient
+from starlette.websockets import WebSocketDisconnect
+
+import server
+from chat_socket import OutboundBuffer, SlowConsumer, SocketHub
+from tests.venice_stub import VeniceStub
+
+
+def receive_reply(ws):
+    frames = []
+    while True:
+        frame = ws.receive_json()
+        if frame["type"] == "ping":
+            continue
+        frames.append(frame)
+        if frame["type"] in ("done", "error"):
+            return frames
+
+
+def test_socket_streams_replies_and_flushes_session_on_close(monkeypatch):
+    session_id = str(uuid.uuid4())
+    with VeniceStub(reply="hello over the socket") as stub:
+        monkeypatch.setattr(server, "VENICE_BASE_URL", stub.base_url)
+        with TestClient(server.app) as client:
+            with client.websocket_connect(f"/api/chat/ws?sessionId={session_id}") as ws:
+                assert ws.receive_json() == {"type": "ready", "sessionId": session_id}
+
+                ws.send_json({"type": "message", "message": "hi", "noCache": True})
+                frames = receive_reply(ws)
+                assert "".join(f["content"] for f in frames if f["type"] == "delta") == "hello over the socket "
+                assert frames[-1]["type"] == "done"
+
+                ws.send_json({"type": "message", "message": "and then?", "noCache": True})
+                assert receive_reply(ws)[-1]["type"] == "done"
+                # History comes from the socket's session, not a store round-trip
+                assert [m["role"] for m in stub.requests[1]["messages"]] == ["system", "user", "assistant", "user"]
+                assert session_id not in server.chat_sessions
+
+            # The test client closes the socket without waiting for the handler to finish
+            for _ in range(100):
+                if session_id in server.chat_sessions:
+                    break
+                time.sleep(0.01)
+            history = server.chat_sessions[session_id].messages
+            assert [m.content for m in history if m.role == "user"] == ["hi", "and then?"]
+
+
+def test_socket_answers_pings_and_rejects_bad_frames():
+    with TestClient(server.app) as client:
+        with client.websocket_connect("/api/chat/ws") as ws:
+            assert ws.receive_json()["type"] == "ready"
+            ws.send_json({"type": "ping"})
+            assert ws.receive_json() == {"type": "pong"}
+            ws.send_text("not json")
+            assert ws.receive_json()["type"] == "error"
+            ws.send_json({"type": "subscribe"})
+            assert "Unsupported" in ws.receive_json()["detail"]
+
+
+def test_unexpected_turn_failure_sends_an_error_frame(monkeypatch):
+    def broken(session, message):
+        raise KeyError("content")
+
+    monkeypatch.setattr(server, "build_chat_messages", broken)
+    with TestClient(server.app) as client:
+        with client.websocket_connect("/api/chat/ws") as ws:
+            assert ws.receive_json()["type"] == "ready"
+            ws.send_json({"type": "message", "message": "hi"})
+            frame = receive_reply(ws)[-1]
+            assert frame["type"] == "error"
+            assert frame["detail"].startswith("Chat service error")
+
+
+def test_socket_closed_when_client_floods_frames(monkeypatch):
+    monkeypatch.setattr(server, "CHAT_WS_FRAME_RATE", "3/minute")
+    with TestClient(server.app) as client:
+        with client.websocket_connect("/api/chat/ws") as ws:
+            ws.receive_json()
+            for _ in range(3):
+                ws.send_json({"type": "ping"})
+                assert ws.receive_json() == {"type": "pong"}
+            ws.send_json({"type": "ping"})
+            with pytest.raises(WebSocketDisconnect) as closed:
+                ws.receive_json()
+            assert closed.value.code == 1008
+
+
+def test_silent_socket_is_closed_by_heartbeat(monkeypatch):
+    monkeypatch.setattr(server, "chat_socket_hub", SocketHub(heartbeat_interval=0.05, idle_timeout=0.2))
+    with TestClient(server.app) as client:
+        with client.websocket_connect("/api/chat/ws") as ws:
+            ws.receive_json()
+            assert ws.receive_json() == {"type": "ping"}
+            with pytest.raises(WebSocketDisconnect) as closed:
+                while True:
+                    ws.receive_json()
+            assert closed.value.code == 1001
+    assert server.chat_socket_hub.timed_out == 1
+
+
+def test_outbound_buffer_merges_deltas_and_bounds_backlog():
+    async def scenario():
+        buffer = OutboundBuffer(max_bytes=200)
+        buffer.put({"type": "delta", "content": "a"})
+        buffer.put({"type": "delta", "content": "b"})
+        buffer.put({"type": "done"})
+        assert len(buffer) == 2
+        assert await buffer.get() == b'{"type":"delta","content":"ab"}'
+
+        with pytest.raises(SlowConsumer):
+            buffer.put({"type": "delta", "content": "x" * 300})
+
+    asyncio.run(scenario())
+
+
+def test_outbound_buffer_accounting_does_not_leak_on_merges():
+    async def scenario():
+        buffer = OutboundBuffer(max_bytes=1000)
+        for _ in range(100):
+            buffer.put({"type": "delta", "content": "a"})
+            buffer.put({"type": "delta", "content": "b"})
+            await buffer.get()
+        assert buffer.pending_bytes == 0
+        assert buffer.merged == 100
+
+    asyncio.run(scenario())
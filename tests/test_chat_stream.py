@@ -0,0 +1,103 @@
+import asyncio
+import json
+import uuid
+
+from fastapi.testclient import TestClient
+
+import server
+from tests.venice_stub import VeniceStub
+
+
+def parse_events(body: str):
+    events = []
+    for frame in body.strip().split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in frame.split("\n"))
+        events.append((fields["event"], json.loads(fields["data"])))
+    return events
+
+
+def test_stream_relays_deltas_and_persists_turn(monkeypatch):
+    with VeniceStub(reply="hello from venice") as stub:
+        monkeypatch.setattr(server, "VENICE_BASE_URL", stub.base_url)
+        session_id = str(uuid.uuid4())
+
+        with TestClient(server.app) as client:
+            response = client.post("/api/chat/stream", json={"message": "hi", "sessionId": session_id})
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/event-stream")
+        assert stub.requests[0]["stream"] is True
+
+        events = parse_events(response.text)
+        deltas = [data["content"] for name, data in events if name == "delta"]
+        assert "".join(deltas) == "hello from venice "
+
+        name, data = events[-1]
+        assert name == "done"
+        assert data["sessionId"] == session_id
+        assert "timestamp" in data
+
+        history = server.chat_sessions[session_id].messages
+        assert [m.role for m in history] == ["user", "assistant"]
+        assert history[1].content == "hello from venice "
+
+
+def test_upstream_failure_mid_stream_sends_error_and_saves_nothing(monkeypatch):
+    with VeniceStub(reply="one two three four", fail_after=2) as stub:
+        monkeypatch.setattr(server, "VENICE_BASE_URL", stub.base_url)
+        session_id = str(uuid.uuid4())
+
+        with TestClient(server.app) as client:
+            response = client.post("/api/chat/stream", json={"message": "hi", "sessionId": session_id})
+
+    events = parse_events(response.text)
+    assert [data["content"] for name, data in events if name == "delta"] == ["one ", "two "]
+    name, data = events[-1]
+    assert name == "error"
+    assert data["detail"].startswith("Chat service error")
+    assert session_id not in server.chat_sessions
+    assert server.upstream_admission.active == 0
+
+
+def test_client_disconnect_releases_permit_and_caches_nothing(monkeypatch):
+    closed = asyncio.Event()
+
+    async def stalled_completion(client, messages, route):
+        try:
+            yield "partial "
+            await asyncio.Event().wait()
+        finally:
+            closed.set()
+
+    monkeypatch.setattr(server, "stream_completion", stalled_completion)
+    monkeypatch.setattr(server.app.state, "venice_client", None, raising=False)
+    session_id = str(uuid.uuid4())
+    body = json.dumps({"message": "tell me a long story", "sessionId": session_id}).encode()
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "POST",
+        "scheme": "http", "path": "/api/chat/stream", "raw_path": b"/api/chat/stream", "query_string": b"",
+        "root_path": "", "headers": [(b"content-type", b"application/json"), (b"host", b"test")],
+        "client": ("127.0.0.1", 50000), "server": ("test", 80),
+    }
+
+    async def scenario():
+        requests = [{"type": "http.request", "body": body, "more_body": False}]
+        first_delta = asyncio.Event()
+
+        async def receive():
+            if requests:
+                return requests.pop()
+            await first_delta.wait()
+            return {"type": "http.disconnect"}
+
+        async def send(message):
+            if message["type"] == "http.response.body" and b"event: delta" in message.get("body", b""):
+                first_delta.set()
+
+        await asyncio.wait_for(server.app(scope, receive, send), timeout=5)
+        assert closed.is_set()
+
+    asyncio.run(scenario())
+    assert server.upstream_admission.active == 0
+    assert len(server.response_cache) == 0
+    assert session_id not in server.chat_sessions
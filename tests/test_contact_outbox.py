@@ -0,0 +1,139 @@
+import asyncio
+import smtplib
+
+from fastapi.testclient import TestClient
+
+import server
+from contact_outbox import ContactOutbox
+from email_worker import is_permanent_error
+
+CONTACT = {
+    "name": "Ada",
+    "email": "ada@example.com",
+    "subject": "Hello",
+    "message": "Let's talk",
+}
+
+
+def test_concurrent_submissions_share_a_commit_and_survive_restart(tmp_path):
+    db_path = str(tmp_path / "outbox.db")
+
+    async def nothing(payload):
+        pass
+
+    async def scenario():
+        outbox = ContactOutbox(db_path, nothing, commit_interval=0.01)
+        outbox.start(dispatch=False)
+        await asyncio.gather(*(outbox.submit(f"m{n}", dict(CONTACT)) for n in range(10)))
+        stats = await outbox.stats()
+        await outbox.close()
+        return stats
+
+    stats = asyncio.run(scenario())
+    assert stats["pending"] == 10
+    assert stats["commits"] == 1
+
+    reopened = ContactOutbox(db_path, nothing)
+    assert asyncio.run(reopened.status("m3"))["status"] == "pending"
+
+
+def test_failed_delivery_is_retried_then_marked_failed(tmp_path):
+    attempts = []
+
+    async def flaky(payload):
+        attempts.append(payload["email"])
+        if len(attempts) < 2:
+            raise ConnectionError("mail server down")
+
+    async def always_down(payload):
+        raise ConnectionError("mail server down")
+
+    async def scenario():
+        outbox = ContactOutbox(str(tmp_path / "a.db"), flaky, base_delay=0)
+        outbox.start(dispatch=False)
+        await outbox.submit("m1", dict(CONTACT))
+        await outbox.dispatch()
+        assert (await outbox.status("m1"))["status"] == "pending"
+        assert (await outbox.status("m1"))["error"] == "mail server down"
+        await outbox.dispatch()
+        assert (await outbox.status("m1"))["status"] == "sent"
+        assert (await outbox.status("m1"))["attempts"] == 2
+        await outbox.close()
+
+        outbox = ContactOutbox(str(tmp_path / "b.db"), always_down, max_attempts=3, base_delay=0)
+        outbox.start(dispatch=False)
+        await outbox.submit("m2", dict(CONTACT))
+        for _ in range(4):
+            await outbox.dispatch()
+        assert (await outbox.status("m2"))["status"] == "failed"
+        assert (await outbox.status("m2"))["attempts"] == 3
+        await outbox.close()
+
+    asyncio.run(scenario())
+
+
+def test_claimed_batch_is_delivered_concurrently_and_sent_rows_are_pruned(tmp_path):
+    in_flight = {"now": 0, "peak": 0}
+
+    async def deliver(payload):
+        in_flight["now"] += 1
+        in_flight["peak"] = max(in_flight["peak"], in_flight["now"])
+        await asyncio.sleep(0.01)
+        in_flight["now"] -= 1
+
+    async def scenario():
+        outbox = ContactOutbox(str(tmp_path / "outbox.db"), deliver, retention_seconds=0)
+        outbox.start(dispatch=False)
+        await asyncio.gather(*(outbox.submit(f"m{n}", dict(CONTACT)) for n in range(5)))
+        assert outbox.pending == 5
+        assert await outbox.dispatch() == 5
+        assert outbox.pending == 0
+        assert in_flight["peak"] == 5
+        assert (await outbox.stats())["sent"] == 5
+
+        assert await outbox.prune() == 5
+        assert await outbox.status("m0") is None
+        await outbox.close()
+
+    asyncio.run(scenario())
+
+
+def test_permanent_rejection_fails_at_once_and_failed_rows_are_pruned(tmp_path):
+    async def refused(payload):
+        raise smtplib.SMTPRecipientsRefused({payload["email"]: (550, b"No such user")})
+
+    async def scenario():
+        outbox = ContactOutbox(
+            str(tmp_path / "outbox.db"), refused, is_permanent=is_permanent_error, failed_retention_seconds=0
+        )
+        outbox.start(dispatch=False)
+        await outbox.submit("m1", dict(CONTACT))
+        await outbox.dispatch()
+        status = await outbox.status("m1")
+        assert (status["status"], status["attempts"]) == ("failed", 1)
+        assert outbox.retries == 0
+
+        assert await outbox.prune() == 1
+        assert await outbox.status("m1") is None
+        await outbox.close()
+
+    asyncio.run(scenario())
+
+
+def test_contact_endpoint_accepts_and_reports_status(tmp_path, monkeypatch):
+    delivered = []
+
+    async def deliver(payload):
+        delivered.append(payload)
+
+    monkeypatch.setattr(server, "contact_outbox", ContactOutbox(str(tmp_path / "outbox.db"), deliver))
+    with TestClient(server.app) as client:
+        response = client.post("/api/contact", json=CONTACT)
+        assert response.status_code == 202
+        message_id = response.json()["messageId"]
+
+        status = client.get(f"/api/contact/{message_id}")
+        assert status.status_code == 200
+        assert status.json()["status"] in ("pending", "sent")
+
+        assert client.get("/api/contact/unknown").status_code == 404
@@ -0,0 +1,42 @@
+from context import build_context, estimate_tokens, message_tokens
+from session_store import ChatSession
+
+SYSTEM = "You are a helpful assistant."
+
+
+def prompt_tokens(messages) -> int:
+    return sum(message_tokens(m["content"]) for m in messages)
+
+
+def test_short_chat_keeps_whole_history():
+    session = ChatSession()
+    for i in range(8):
+        session.add_turn(f"question {i}", f"answer {i}")
+
+    messages = build_context(session, SYSTEM, "next", token_budget=3000)
+
+    # More than the old fixed 10-message window fits in the budget
+    assert len(messages) == 1 + 16 + 1
+    assert messages[1]["content"] == "question 0"
+    assert session.summary == ""
+
+
+def test_long_history_is_bounded_and_folded_into_summary():
+    session = ChatSession(summary_max_tokens=200)
+    for i in range(30):
+        session.add_turn(f"question {i} " + "x" * 400, f"answer {i} " + "y" * 400)
+
+    messages = build_context(session, SYSTEM, "next", token_budget=1500)
+
+    assert prompt_tokens(messages) <= 1500
+    assert messages[1]["role"] == "system"
+    assert messages[1]["content"].startswith("Summary of earlier conversation:")
+    assert messages[-2]["content"].startswith("answer 29")
+    assert messages[-1] == {"role": "user", "content": "next"}
+    assert estimate_tokens(session.summary) <= 200
+
+    # Summarized messages are not resent verbatim on the next turn
+    first_kept = session.summary_upto
+    session.add_turn("short", "reply")
+    build_context(session, SYSTEM, "again", token_budget=1500)
+    assert session.summary_upto >= first_kept
@@ -0,0 +1,56 @@
+import asyncio
+import json
+import time
+import uuid
+
+import server
+from tests.venice_stub import VeniceStub
+
+
+async def post_then_disconnect(path: str, payload: dict, disconnect_after: float):
+    """Drive the ASGI app directly, dropping the connection after ``disconnect_after`` seconds"""
+    body = json.dumps(payload).encode()
+    sent = []
+    body_delivered = False
+
+    async def receive():
+        nonlocal body_delivered
+        if not body_delivered:
+            body_delivered = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        await asyncio.sleep(disconnect_after)
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+        "method": "POST", "scheme": "http", "path": path, "raw_path": path.encode(),
+        "query_string": b"", "root_path": "",
+        "headers": [(b"content-type", b"application/json"), (b"host", b"testserver")],
+        "client": ("127.0.0.1", 50000), "server": ("testserver", 80),
+    }
+    server.app.state.venice_client = server.create_venice_client()
+    try:
+        await server.app(scope, receive, send)
+    finally:
+        await server.app.state.venice_client.aclose()
+    return sent
+
+
+def test_disconnect_cancels_upstream_and_skips_persisting(monkeypatch):
+    with VeniceStub(delay=2.0) as stub:
+        monkeypatch.setattr(server, "VENICE_BASE_URL", stub.base_url)
+        session_id = str(uuid.uuid4())
+
+        started = time.monotonic()
+        sent = asyncio.run(post_then_disconnect(
+            "/api/chat", {"message": "a slow question", "sessionId": session_id}, disconnect_after=0.2
+        ))
+
+        assert time.monotonic() - started < 1.5
+        assert sent[0]["status"] == 499
+        assert session_id not in server.chat_sessions
+        assert server.disconnect_guard.stats()["cancelled"]["chat"] >= 1
+        assert server.upstream_calls.stats()["inFlight"] == 0
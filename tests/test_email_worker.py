@@ -0,0 +1,76 @@
+import asyncio
+import smtplib
+from email.mime.text import MIMEText
+
+import pytest
+
+from email_worker import EmailWorker
+from tests.smtp_stub import SMTPStub
+
+
+def make_message(n: int) -> MIMEText:
+    msg = MIMEText(f"body {n}")
+    msg["From"] = "portfolio@example.com"
+    msg["To"] = "owner@example.com"
+    msg["Subject"] = f"Portfolio Contact: {n}"
+    return msg
+
+
+async def send_all(worker: EmailWorker, count: int) -> None:
+    worker.start()
+    try:
+        await asyncio.gather(*(worker.send(make_message(n)) for n in range(count)))
+    finally:
+        await worker.close()
+
+
+def test_sends_reuse_one_connection():
+    with SMTPStub() as smtp:
+        worker = EmailWorker("127.0.0.1", smtp.port, use_tls=False, batch_size=5)
+        asyncio.run(send_all(worker, 12))
+
+    assert len(smtp.messages) == 12
+    assert smtp.connections == 1
+    stats = worker.stats()
+    assert stats["sent"] == 12
+    assert stats["failed"] == 0
+    assert stats["batches"] >= 3
+    assert stats["connectionsOpened"] == 1
+
+
+def test_reconnects_after_server_drops_connection():
+    with SMTPStub(drop_after=2) as smtp:
+        worker = EmailWorker("127.0.0.1", smtp.port, use_tls=False, batch_size=10)
+        asyncio.run(send_all(worker, 6))
+
+    assert len(smtp.messages) == 6
+    stats = worker.stats()
+    assert stats["sent"] == 6
+    assert stats["reconnects"] == 2
+    assert smtp.connections == 3
+
+
+def test_unreachable_server_fails_the_send():
+    async def scenario():
+        worker = EmailWorker("127.0.0.1", 1, use_tls=False, timeout=1)
+        worker.start()
+        try:
+            await worker.send(make_message(0))
+        finally:
+            await worker.close()
+
+    with pytest.raises(OSError):
+        asyncio.run(scenario())
+
+
+def test_permanent_rejection_fails_without_reconnecting():
+    with SMTPStub(reject_recipients=True) as smtp:
+        worker = EmailWorker("127.0.0.1", smtp.port, use_tls=False)
+        with pytest.raises(smtplib.SMTPRecipientsRefused):
+            asyncio.run(send_all(worker, 1))
+
+    assert smtp.messages == []
+    assert smtp.connections == 1
+    stats = worker.stats()
+    assert stats["failed"] == 1
+    assert stats["reconnects"] == 0
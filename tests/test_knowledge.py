@@ -0,0 +1,82 @@
+import json
+
+from fastapi.testclient import TestClient
+
+import server
+from knowledge import KnowledgeIndex, content_documents, faq_documents
+from routing import ModelRouter
+from static_content import StaticContent
+from tests.venice_stub import VeniceStub
+
+
+def shipped_index() -> KnowledgeIndex:
+    content = json.loads((server.ROOT_DIR / "content.json").read_text())
+    faq = json.loads((server.ROOT_DIR / "faq.json").read_text())
+    return KnowledgeIndex(content_documents(content) + faq_documents(faq))
+
+
+def test_lookup_answers_faq_paraphrases_and_grounds_portfolio_questions():
+    index = shipped_index()
+    assert index.lookup("what is your AI background?").answer.startswith("I'm passionate about blending")
+
+    grounded = index.lookup("Tell me about the Web3 portfolio project")
+    assert grounded.answer is None
+    assert any("Web3" in snippet for snippet in grounded.snippets)
+
+    assert index.lookup("How do I bake sourdough bread?") == (None, [])
+    assert index.stats()["lookups"] == 3
+
+
+def test_general_tech_questions_are_not_grounded():
+    index = shipped_index()
+    for question in (
+        "How does Python garbage collection work?",
+        "What's new in React 19?",
+        "How do I deploy a Next.js app to Vercel?",
+        "Explain Rust ownership and borrowing",
+    ):
+        assert index.lookup(question) == (None, []), question
+
+
+def test_grounding_keeps_the_classified_route_unless_asked_about_the_owner():
+    router = ModelRouter.from_file(server.ROOT_DIR / "routing.json")
+    assert router.select("Best Python libraries for data engineering?", grounded=True).name == "general"
+    assert router.select("What's the latest on Web3 regulation today?", grounded=True).name == "fresh"
+    assert router.select("Which Web3 tools did you use?", grounded=True).name == "portfolio"
+
+
+def test_faq_paraphrase_is_answered_without_upstream(monkeypatch):
+    with VeniceStub() as stub:
+        monkeypatch.setattr(server, "VENICE_BASE_URL", stub.base_url)
+        with TestClient(server.app) as client:
+            response = client.post("/api/chat", json={"message": "what is your AI background"})
+    assert response.status_code == 200
+    assert response.json()["response"].startswith("I'm passionate about blending")
+    assert stub.requests == []
+
+
+def test_grounded_prompt_gets_snippets_and_the_grounded_route(monkeypatch):
+    with VeniceStub(reply="grounded") as stub:
+        monkeypatch.setattr(server, "VENICE_BASE_URL", stub.base_url)
+        with TestClient(server.app) as client:
+            response = client.post("/api/chat", json={"message": "Tell me about the Web3 portfolio project", "noCache": True})
+    assert response.json()["response"] == "grounded"
+
+    body, = stub.requests
+    note = body["messages"][-2]
+    assert note["role"] == "system" and "Web3" in note["content"]
+    assert body["messages"][-1]["content"] == "Tell me about the Web3 portfolio project"
+    assert body["venice_parameters"]["enable_web_search"] == "off"
+
+
+def test_index_is_rebuilt_when_content_reloads(tmp_path, monkeypatch):
+    monkeypatch.setattr(server, "knowledge_index", server.knowledge_index)
+    path = tmp_path / "content.json"
+    path.write_text(json.dumps({"about": ["Tolu once built a sourdough starter tracker."]}))
+    content = StaticContent(str(path), on_load=server.rebuild_knowledge_index)
+    assert server.consult_knowledge("sourdough starter tracker").snippets
+
+    path.write_text(json.dumps({"about": ["Tolu enjoys trail running on weekends."]}))
+    content.load()
+    assert not server.consult_knowledge("sourdough starter tracker").snippets
+    assert server.consult_knowledge("trail running weekends").snippets
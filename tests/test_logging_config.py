@@ -0,0 +1,51 @@
+import json
+import logging
+import queue
+import time
+
+from logging_config import DroppingQueueHandler, JsonFormatter, RateLimitFilter, SamplingFilter
+
+
+def make_record(msg, *args, level=logging.INFO, **extra):
+    record = logging.LogRecord("server", level, __file__, 1, msg, args, None)
+    record.__dict__.update(extra)
+    return record
+
+
+def test_json_formatter_includes_extra_fields_and_formats_lazily():
+    line = JsonFormatter().format(make_record("Chat for %s took %.1fs", "abc", 1.25, sessionId="abc"))
+    entry = json.loads(line)
+    assert entry["message"] == "Chat for abc took 1.2s"
+    assert entry["level"] == "INFO"
+    assert entry["logger"] == "server"
+    assert entry["sessionId"] == "abc"
+
+
+def test_full_queue_drops_instead_of_blocking():
+    handler = DroppingQueueHandler(queue.Queue(maxsize=2))
+    for n in range(5):
+        handler.handle(make_record("line %d", n))
+    assert handler.queue.qsize() == 2
+    assert handler.dropped == 3
+    # Formatting is deferred to the listener thread
+    assert handler.queue.get_nowait().args == (0,)
+
+
+def test_sampling_applies_per_template_and_spares_warnings():
+    sampler = SamplingFilter({"Making Venice AI request to: %s": 0.0})
+    assert not sampler.filter(make_record("Making Venice AI request to: %s", "https://api"))
+    assert sampler.filter(make_record("Received contact form submission %s", "id"))
+    assert sampler.filter(make_record("Making Venice AI request to: %s", "https://api", level=logging.WARNING))
+
+
+def test_rate_limit_reports_suppressed_lines():
+    limiter = RateLimitFilter(per_interval=2, interval=0.05)
+    passed = [limiter.filter(make_record("noisy %d", n)) for n in range(5)]
+    assert passed == [True, True, False, False, False]
+    assert limiter.filter(make_record("other line"))
+    assert limiter.filter(make_record("noisy %d", 5, level=logging.ERROR))
+
+    time.sleep(0.06)
+    record = make_record("noisy %d", 6)
+    assert limiter.filter(record)
+    assert record.suppressed == 3
@@ -0,0 +1,51 @@
+from fastapi.testclient import TestClient
+
+import server
+from metrics import Registry
+from tests.venice_stub import VeniceStub
+
+
+def test_histogram_renders_cumulative_buckets():
+    registry = Registry()
+    latency = registry.histogram("op_seconds", "Op latency", ("op",), buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 0.5, 3.0):
+        latency.labels("read").observe(value)
+    registry.counter("ops_total", "Ops").inc(2)
+
+    text = registry.render()
+    assert '# TYPE op_seconds histogram' in text
+    assert 'op_seconds_bucket{op="read",le="0.1"} 1' in text
+    assert 'op_seconds_bucket{op="read",le="1"} 3' in text
+    assert 'op_seconds_bucket{op="read",le="+Inf"} 4' in text
+    assert 'op_seconds_count{op="read"} 4' in text
+    assert 'op_seconds_sum{op="read"} 4.05' in text
+    assert 'ops_total 2' in text
+
+
+def test_metrics_endpoint_reports_requests_and_upstream(monkeypatch):
+    with VeniceStub(reply="metered") as stub:
+        monkeypatch.setattr(server, "VENICE_BASE_URL", stub.base_url)
+        with TestClient(server.app) as client:
+            assert client.post("/api/chat", json={"message": "count me", "noCache": True}).status_code == 200
+            client.get("/api/does-not-exist")
+            response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    text = response.text
+    assert 'http_request_duration_seconds_count{method="POST",route="/api/chat",status="200"}' in text
+    assert 'route="unmatched",status="404"' in text
+    assert 'venice_responses_total{endpoint="chat",status="200"}' in text
+    assert 'venice_request_duration_seconds_count{endpoint="chat"}' in text
+    assert 'rate_limit_rejections_total{scope="ip"} 0' in text
+    assert "email_queue_depth 0" in text
+
+
+def test_callback_metric_renders_collected_values_without_children():
+    registry = Registry()
+    metric = registry.callback("queue_depth", "Queued items", lambda: {("a",): 2, ("b",): 0}, labelnames=("queue",))
+    assert not hasattr(metric, "labels")
+    text = registry.render()
+    assert '# TYPE queue_depth gauge' in text
+    assert 'queue_depth{queue="a"} 2' in text
+    assert 'queue_depth{queue="b"} 0' in text
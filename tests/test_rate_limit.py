@@ -0,0 +1,109 @@
+import asyncio
+import sqlite3
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+from fastapi.testclient import TestClient
+
+import server
+from rate_limit import BucketRule, MemoryBucketStorage, RateLimited, SQLiteBucketStorage, TokenBucketLimiter
+
+
+def make_limiter(storage, ip="3/minute", session="2/minute"):
+    return TokenBucketLimiter(storage, BucketRule.parse("ip", ip), BucketRule.parse("session", session))
+
+
+def test_bucket_allows_burst_then_refills(monkeypatch):
+    limiter = make_limiter(MemoryBucketStorage())
+    for _ in range(3):
+        limiter.hit("1.2.3.4")
+    with pytest.raises(RateLimited) as exc:
+        limiter.hit("1.2.3.4")
+    assert exc.value.retry_after == 20
+
+    later = time.time() + 20
+    monkeypatch.setattr(time, "time", lambda: later)
+    limiter.hit("1.2.3.4")
+
+
+def test_session_bucket_is_separate_and_refunds_ip():
+    limiter = make_limiter(MemoryBucketStorage())
+    limiter.hit("1.2.3.4", "s1")
+    limiter.hit("1.2.3.4", "s1")
+    with pytest.raises(RateLimited) as exc:
+        limiter.hit("1.2.3.4", "s1")
+    assert exc.value.scope == "session"
+    # The refused request did not use up the IP's last token
+    limiter.hit("1.2.3.4", "s2")
+    assert asyncio.run(limiter.stats())["rejections"] == {"ip": 0, "session": 1}
+
+
+def take_tokens(path: str) -> int:
+    limiter = make_limiter(SQLiteBucketStorage(path, busy_timeout_ms=2000), ip="10/minute")
+    allowed = 0
+    for _ in range(10):
+        try:
+            limiter.hit("5.6.7.8")
+            allowed += 1
+        except RateLimited:
+            pass
+    return allowed
+
+
+def test_sqlite_limit_holds_across_processes(tmp_path):
+    path = str(tmp_path / "ratelimit.db")
+    with ProcessPoolExecutor(max_workers=3) as pool:
+        allowed = sum(pool.map(take_tokens, [path] * 3))
+    assert allowed == 10
+
+
+def test_idle_buckets_are_swept(tmp_path):
+    storage = SQLiteBucketStorage(str(tmp_path / "ratelimit.db"))
+    limiter = make_limiter(storage)
+    limiter.hit("1.2.3.4", "s1")
+    assert len(storage) == 2
+    assert asyncio.run(limiter.stats())["buckets"] == 2
+    assert storage.sweep(time.time() + 1) == 2
+
+
+def test_check_runs_off_the_loop_and_fails_open_when_locked(tmp_path):
+    path = str(tmp_path / "ratelimit.db")
+    limiter = make_limiter(SQLiteBucketStorage(path, busy_timeout_ms=300))
+    limiter.hit("1.2.3.4")  # create the file and table
+    other_worker = sqlite3.connect(path, isolation_level=None)
+    other_worker.execute("BEGIN IMMEDIATE")
+
+    async def scenario():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        task = asyncio.create_task(ticker())
+        await limiter.check("1.2.3.4")
+        task.cancel()
+        return ticks
+
+    try:
+        ticks = asyncio.run(scenario())
+    finally:
+        other_worker.execute("ROLLBACK")
+        other_worker.close()
+    # The loop kept running while the take waited out the busy timeout
+    assert ticks >= 10
+    assert asyncio.run(limiter.stats())["errors"] == 1
+
+
+def test_chat_returns_429_with_retry_after(monkeypatch):
+    monkeypatch.setattr(server, "chat_rate_limiter", make_limiter(MemoryBucketStorage(), ip="1/minute"))
+    with TestClient(server.app) as client:
+        first = client.post("/api/chat", json={"message": "what's your background in AI"})
+        second = client.post("/api/chat", json={"message": "what's your background in AI"})
+
+    assert first.status_code == 200
+    assert second.status_code == 429
+    assert second.headers["retry-after"] == "60"
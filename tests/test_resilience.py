@@ -0,0 +1,106 @@
+import asyncio
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+
+import server
+from resilience import CircuitBreaker, ResilientUpstream, UpstreamUnavailable
+
+
+def responder(*statuses, headers=None, delays=None):
+    """Build a send() returning the given status codes in order"""
+    calls = []
+
+    async def send():
+        index = len(calls)
+        calls.append(index)
+        if delays:
+            await asyncio.sleep(delays[min(index, len(delays) - 1)])
+        status = statuses[min(index, len(statuses) - 1)]
+        if isinstance(status, Exception):
+            raise status
+        return httpx.Response(status, headers=headers or {})
+
+    return send, calls
+
+
+def test_retries_transient_failures_then_succeeds():
+    upstream = ResilientUpstream(CircuitBreaker(), max_retries=2, base_delay=0.001)
+    send, calls = responder(503, httpx.ConnectError("refused"), 200)
+
+    response = asyncio.run(upstream.call(send))
+
+    assert response.status_code == 200
+    assert len(calls) == 3
+    assert upstream.retries == 2
+    assert upstream.breaker.state == CircuitBreaker.CLOSED
+
+
+def test_long_retry_after_is_not_waited_out():
+    upstream = ResilientUpstream(CircuitBreaker(), max_retries=3, max_retry_after=5)
+    send, calls = responder(429, headers={"Retry-After": "60"})
+
+    assert asyncio.run(upstream.call(send)).status_code == 429
+    assert len(calls) == 1
+
+
+def test_breaker_opens_and_recovers_after_trial():
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=0.05)
+    upstream = ResilientUpstream(breaker, max_retries=0)
+    failing, _ = responder(500)
+
+    asyncio.run(upstream.call(failing))
+    asyncio.run(upstream.call(failing))
+    assert breaker.state == CircuitBreaker.OPEN
+    with pytest.raises(UpstreamUnavailable):
+        asyncio.run(upstream.call(failing))
+
+    asyncio.run(asyncio.sleep(0.06))
+    healthy, _ = responder(200)
+    assert asyncio.run(upstream.call(healthy)).status_code == 200
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_breaker_counts_one_failure_per_call_and_open_time_is_fixed():
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout=30)
+    upstream = ResilientUpstream(breaker, max_retries=2, base_delay=0.001)
+    send, calls = responder(503)
+
+    asyncio.run(upstream.call(send))
+    assert len(calls) == 3
+    assert breaker.failures == 1
+    assert breaker.state == CircuitBreaker.CLOSED
+
+    asyncio.run(upstream.call(send))
+    asyncio.run(upstream.call(send))
+    assert breaker.state == CircuitBreaker.OPEN
+    opened_at = breaker.opened_at
+    # A call admitted before the circuit opened fails late without extending it
+    breaker.record_failure()
+    assert breaker.opened_at == opened_at
+    assert breaker.opened == 1
+
+
+def test_hedged_request_wins_over_slow_primary():
+    upstream = ResilientUpstream(CircuitBreaker(), hedge_enabled=True, hedge_min_samples=1)
+    upstream.latency.record(0.01)
+    send, calls = responder(200, delays=[1.0, 0.0])
+
+    response = asyncio.run(asyncio.wait_for(upstream.call(send), timeout=0.5))
+
+    assert response.status_code == 200
+    assert len(calls) == 2
+    assert upstream.hedge_wins == 1
+
+
+def test_open_circuit_returns_503(monkeypatch):
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30)
+    breaker.record_failure()
+    monkeypatch.setattr(server, "venice_breaker", breaker)
+
+    with TestClient(server.app) as client:
+        response = client.post("/api/chat", json={"message": "anything new"})
+
+    assert response.status_code == 503
+    assert int(response.headers["retry-after"]) >= 29
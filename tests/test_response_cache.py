@@ -0,0 +1,70 @@
+import time
+import uuid
+
+from fastapi.testclient import TestClient
+
+import server
+from response_cache import ResponseCache, make_cache_key, normalize_message
+from tests.venice_stub import VeniceStub
+
+CONTEXT = [{"role": "system", "content": "prompt"}]
+
+
+def test_normalization_shares_keys():
+    assert normalize_message("  What's your   background in AI?? ") == "what's your background in ai"
+    assert make_cache_key("Hello!", CONTEXT) == make_cache_key("hello", CONTEXT)
+    assert make_cache_key("hello", CONTEXT) != make_cache_key("hello", CONTEXT + CONTEXT)
+
+
+def test_ttl_and_lru_eviction(monkeypatch):
+    cache = ResponseCache(max_entries=2, ttl_seconds=10)
+    cache.set("a", "A")
+    cache.set("b", "B", ttl=None)
+    assert cache.get("a") == "A"
+    cache.set("c", "C")  # b is least recently used
+    assert cache.get("b") is None
+    assert cache.evictions == 1
+
+    later = time.monotonic() + 11
+    monkeypatch.setattr(time, "monotonic", lambda: later)
+    assert cache.get("a") is None
+    assert cache.stats()["expirations"] == 1
+
+
+def test_faq_hits_skip_upstream_and_bypass_refreshes(monkeypatch):
+    with VeniceStub(reply="fresh answer") as stub:
+        monkeypatch.setattr(server, "VENICE_BASE_URL", stub.base_url)
+
+        with TestClient(server.app) as client:
+            # Pre-warmed from backend/faq.json at startup
+            response = client.post("/api/chat", json={"message": "what's your background in AI"})
+            assert response.status_code == 200
+            assert response.json()["response"].startswith("I'm passionate about blending")
+            assert stub.requests == []
+
+            # Bypass goes upstream, then repeated prompts are served from the cache
+            payload = {"message": "What's your background in AI?", "noCache": True}
+            assert client.post("/api/chat", json=payload).json()["response"] == "fresh answer"
+            assert len(stub.requests) == 1
+            session_id = str(uuid.uuid4())
+            response = client.post("/api/chat", json={"message": "Hello", "sessionId": session_id})
+            response = client.post("/api/chat", json={"message": "hello"})
+            assert len(stub.requests) == 2
+
+            stats = client.get("/api/stats").json()["responseCache"]
+            assert stats["hits"] == 2
+            assert stats["bypasses"] == 1
+
+
+def test_replies_needing_fresh_information_are_not_kept(monkeypatch):
+    monkeypatch.setattr(server, "CHAT_FRESH_CACHE_TTL_SECONDS", 0)
+    with VeniceStub(reply="answer") as stub:
+        monkeypatch.setattr(server, "VENICE_BASE_URL", stub.base_url)
+        with TestClient(server.app) as client:
+            topic = uuid.uuid4().hex[:8]
+            for _ in range(2):
+                client.post("/api/chat", json={"message": f"What's the latest news about {topic} today?"})
+            assert len(stub.requests) == 2
+            for _ in range(2):
+                client.post("/api/chat", json={"message": f"Explain how {topic} attention works"})
+            assert len(stub.requests) == 3
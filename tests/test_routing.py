@@ -0,0 +1,68 @@
+import time
+
+from fastapi.testclient import TestClient
+
+import server
+from routing import ModelRouter, Route
+from tests.venice_stub import VeniceStub
+
+
+def shipped_router(**kwargs) -> ModelRouter:
+    return ModelRouter.from_file(server.ROOT_DIR / "routing.json", **kwargs)
+
+
+def test_prompts_are_classified_by_length_and_keywords():
+    router = shipped_router()
+    assert router.classify("hi!") == "smalltalk"
+    assert router.classify("Thanks so much") == "smalltalk"
+    assert router.classify("What's your background in AI?") == "portfolio"
+    assert router.classify("What is the latest news about open-source LLMs?") == "fresh"
+    assert router.classify("Explain how transformers use attention") == "general"
+    assert router.classify("Tell me about your projects. " * 20) == "general"
+
+
+def test_general_questions_addressed_to_you_use_the_default_route():
+    router = shipped_router()
+    assert router.classify("Can you help me write a SQL query?") == "general"
+    assert router.classify("What do you think about the French Revolution?") == "general"
+    assert router.classify("Could you summarize this paragraph for me?") == "general"
+    assert router.classify("What projects has Tolu built?") == "portfolio"
+    assert router.classify("Can I see your resume?") == "portfolio"
+
+
+def test_route_fails_over_while_p95_breaches_slo(monkeypatch):
+    routes = {
+        "large": Route("large", "qwen3-235b", web_search="on", slo_ms=100, fallback="small"),
+        "small": Route("small", "qwen3-4b", web_search="off"),
+    }
+    router = ModelRouter(routes, "large", window=10, min_samples=5, cooldown=30)
+    for _ in range(4):
+        router.observe(routes["large"], 0.5)
+    assert router.select("anything").name == "large"
+
+    router.observe(routes["large"], 0.5)
+    assert router.select("anything").name == "small"
+    assert router.stats()["routes"]["large"]["failovers"] == 1
+
+    # After the cooldown the route is tried again with a clean window
+    now = time.monotonic()
+    monkeypatch.setattr("routing.time.monotonic", lambda: now + 31)
+    assert router.select("anything").name == "large"
+    assert len(router.latency["large"].samples) == 0
+
+
+def test_chat_request_uses_the_selected_route(monkeypatch):
+    monkeypatch.setattr(server, "model_router", shipped_router())
+    with VeniceStub(reply="hello!") as stub:
+        monkeypatch.setattr(server, "VENICE_BASE_URL", stub.base_url)
+        with TestClient(server.app) as client:
+            assert client.post("/api/chat", json={"message": "hey there", "noCache": True}).status_code == 200
+            client.post("/api/chat", json={"message": "What's happening in AI news today?", "noCache": True})
+
+    quick, fresh = stub.requests
+    assert quick["model"] == "qwen3-4b"
+    assert quick["max_completion_tokens"] == 128
+    assert quick["venice_parameters"]["enable_web_search"] == "off"
+    assert fresh["model"] == "qwen3-235b"
+    assert fresh["venice_parameters"]["enable_web_search"] == "on"
+    assert server.model_router.stats()["routes"]["smalltalk"]["classified"] == 1
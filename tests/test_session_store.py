@@ -0,0 +1,61 @@
+import time
+
+from session_store import ChatSession, InMemorySessionStore
+
+
+def make_session(content: str = "hello", age_seconds: float = 0) -> ChatSession:
+    session = ChatSession()
+    session.append("user", content, time.time() - age_seconds)
+    return session
+
+
+def test_lru_eviction_by_count():
+    store = InMemorySessionStore(max_sessions=2)
+    store["a"] = make_session()
+    store["b"] = make_session()
+    store.get("a")  # touch a so b becomes least recently used
+    store["c"] = make_session()
+
+    assert "a" in store and "c" in store
+    assert "b" not in store
+    assert store.evictions["lru"] == 1
+
+
+def test_memory_budget_evicts_oldest():
+    store = InMemorySessionStore(max_bytes=6000)
+    store["a"] = make_session("x" * 2000)
+    store["b"] = make_session("x" * 2000)
+    store["c"] = make_session("x" * 2000)
+
+    assert "a" not in store
+    assert len(store) == 2
+    assert store.stats()["approxBytes"] <= 6000
+    assert store.evictions["memory"] == 1
+
+
+def test_idle_sessions_expire_on_access_and_sweep():
+    store = InMemorySessionStore(ttl_seconds=60)
+    store["stale"] = make_session(age_seconds=120)
+    store["stale2"] = make_session(age_seconds=120)
+    store["fresh"] = make_session()
+
+    assert store.get("stale") is None
+    assert store.sweep() == 1
+    assert list(store) == ["fresh"]
+    assert store.evictions["ttl"] == 2
+    assert store.stats()["approxBytes"] == store._sizes["fresh"]
+
+
+def test_session_keeps_bounded_window_and_tracks_bytes():
+    session = ChatSession(max_messages=4)
+    for i in range(3):
+        session.add_turn(f"question {i}", f"answer {i}")
+
+    assert len(session) == 4
+    assert [m.content for m in session.recent(2)] == ["question 2", "answer 2"]
+    assert session.messages[0].content == "question 1"
+    # Records that fell off the window were folded into the summary
+    assert session.summary == "- user: question 0\n- assistant: answer 0"
+    assert session.summary_upto == 2
+    expected = sum(len(m.content) for m in session.messages) + 4 * 120 + session.summary_chars
+    assert session.content_bytes == expected
@@ -0,0 +1,72 @@
+import asyncio
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from fastapi.testclient import TestClient
+
+import server
+from singleflight import SingleFlight
+from tests.venice_stub import VeniceStub
+
+
+def test_concurrent_identical_prompts_share_one_upstream_call(monkeypatch):
+    with VeniceStub(reply="shared answer", delay=0.5) as stub:
+        monkeypatch.setattr(server, "VENICE_BASE_URL", stub.base_url)
+        session_ids = [str(uuid.uuid4()) for _ in range(5)]
+
+        with TestClient(server.app) as client:
+            def ask(session_id):
+                return client.post("/api/chat", json={"message": "Tell me a joke", "sessionId": session_id})
+
+            with ThreadPoolExecutor(max_workers=5) as pool:
+                responses = list(pool.map(ask, session_ids))
+
+        assert [r.json()["response"] for r in responses] == ["shared answer"] * 5
+        assert len(stub.requests) == 1
+        for session_id in session_ids:
+            assert [m.content for m in server.chat_sessions[session_id].messages] == [
+                "Tell me a joke", "shared answer"
+            ]
+
+
+def test_cancelled_caller_does_not_cancel_shared_call():
+    flight = SingleFlight()
+    calls = []
+
+    async def upstream():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return "done"
+
+    async def scenario():
+        first = asyncio.ensure_future(flight.do("k", upstream))
+        second = asyncio.ensure_future(flight.do("k", upstream))
+        await asyncio.sleep(0)
+        first.cancel()
+        return await second
+
+    assert asyncio.run(scenario()) == "done"
+    assert calls == [1]
+    assert flight.stats() == {"inFlight": 0, "leaders": 1, "coalesced": 1, "abandoned": 0}
+
+
+def test_shared_call_is_cancelled_once_every_caller_leaves():
+    flight = SingleFlight()
+    finished = []
+
+    async def upstream():
+        await asyncio.sleep(1)
+        finished.append(1)
+
+    async def scenario():
+        callers = [asyncio.ensure_future(flight.do("k", upstream)) for _ in range(2)]
+        await asyncio.sleep(0)
+        for caller in callers:
+            caller.cancel()
+        await asyncio.gather(*callers, return_exceptions=True)
+        await asyncio.sleep(0)
+        return len(flight)
+
+    assert asyncio.run(scenario()) == 0
+    assert finished == []
+    assert flight.abandoned == 1
@@ -0,0 +1,118 @@
+import asyncio
+import sqlite3
+
+from session_store import ChatSession
+from sqlite_session_store import SQLiteSessionStore
+
+
+def test_sessions_are_shared_across_workers_and_restarts(tmp_path):
+    db_path = str(tmp_path / "sessions.db")
+
+    async def scenario():
+        worker_a = SQLiteSessionStore(db_path, cache_ttl=0)
+        worker_b = SQLiteSessionStore(db_path, cache_ttl=0)
+
+        session = ChatSession()
+        session.add_turn("hi", "hello")
+        worker_a["s1"] = session
+        assert worker_b.get("s1") is None  # not flushed yet
+        assert await worker_a.flush() == 1
+
+        seen_by_b = worker_b.get("s1")
+        assert [m.content for m in seen_by_b.messages] == ["hi", "hello"]
+        seen_by_b.add_turn("and?", "more")
+        worker_b["s1"] = seen_by_b
+        await worker_b.close()
+
+        assert len(worker_a.get("s1")) == 4
+        await worker_a.close()
+
+        restarted = SQLiteSessionStore(db_path)
+        assert len(restarted.get("s1")) == 4
+        await restarted.close()
+
+    asyncio.run(scenario())
+
+
+def test_write_behind_batches_turns_into_one_transaction(tmp_path):
+    async def scenario():
+        store = SQLiteSessionStore(str(tmp_path / "sessions.db"), flush_interval=0.02)
+        await store.start()
+        for i in range(50):
+            session = store.get(f"s{i % 5}") or ChatSession()
+            session.add_turn(f"q{i}", f"a{i}")
+            store[f"s{i % 5}"] = session
+        await asyncio.sleep(0.1)
+        stats = store.stats()
+        await store.close()
+        return stats
+
+    stats = asyncio.run(scenario())
+    assert stats["sessions"] == 5
+    assert stats["rowsWritten"] == 5
+    assert stats["flushes"] == 1
+    assert stats["cacheHitRatio"] == 0.9  # only the first read of each session misses
+
+
+def test_sweep_removes_expired_rows(tmp_path):
+    async def scenario():
+        store = SQLiteSessionStore(str(tmp_path / "sessions.db"), ttl_seconds=60)
+        stale = ChatSession()
+        stale.append("user", "old", timestamp=0)
+        store["stale"] = stale
+        store["fresh"] = ChatSession()
+        await store.flush()
+        removed = await store.sweep()
+        remaining = len(store)
+        await store.close()
+        return removed, remaining
+
+    assert asyncio.run(scenario()) == (1, 1)
+
+
+def test_fetch_reads_off_the_loop_and_row_count_is_tracked(tmp_path):
+    db_path = str(tmp_path / "sessions.db")
+
+    async def scenario():
+        worker_a = SQLiteSessionStore(db_path, cache_ttl=0)
+        worker_b = SQLiteSessionStore(db_path, cache_ttl=0)
+        for session_id in ("s1", "s2"):
+            session = ChatSession()
+            session.add_turn("hi", "hello")
+            worker_a[session_id] = session
+        await worker_a.flush()
+        worker_a["s1"] = worker_a.get("s1")
+        await worker_a.flush()
+        assert len(worker_a) == 2
+
+        fetched = await worker_b.fetch("s1")
+        assert [m.content for m in fetched.messages] == ["hi", "hello"]
+        assert await worker_b.fetch("missing") is None
+        # Rows written by another worker are counted from the next sweep
+        assert worker_b.stats()["sessions"] == 0
+        await worker_b.sweep()
+        assert worker_b.stats()["sessions"] == 2
+        await worker_a.close()
+        await worker_b.close()
+
+    asyncio.run(scenario())
+
+
+def test_sweeper_survives_database_errors(tmp_path, monkeypatch):
+    async def scenario():
+        store = SQLiteSessionStore(str(tmp_path / "sessions.db"), sweep_interval=0.01)
+        calls = []
+
+        def flaky_delete():
+            calls.append(1)
+            if len(calls) == 1:
+                raise sqlite3.OperationalError("database is locked")
+            return 0
+
+        monkeypatch.setattr(store, "_delete_expired", flaky_delete)
+        await store.start()
+        await asyncio.sleep(0.1)
+        await store.close()
+        return len(calls)
+
+    assert asyncio.run(scenario()) > 1
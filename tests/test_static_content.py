@@ -0,0 +1,93 @@
+import asyncio
+import gzip
+import json
+import os
+import threading
+
+from fastapi.testclient import TestClient
+
+import server
+from static_content import StaticContent, accepted_encodings
+
+
+def test_skills_and_projects_served_with_etag_and_cache_headers():
+    client = TestClient(server.app)
+    skills = client.get("/api/skills", headers={"Accept-Encoding": "identity"})
+    assert skills.status_code == 200
+    assert "aiGeneralist" in skills.json()
+    assert skills.headers["etag"].startswith('"')
+    assert "max-age=" in skills.headers["cache-control"]
+    assert skills.headers["vary"] == "Accept-Encoding"
+
+    projects = client.get("/api/projects")
+    assert [p["id"] for p in projects.json()] == [1, 2, 3, 4, 5]
+
+    cached = client.get("/api/skills", headers={"Accept-Encoding": "identity", "If-None-Match": skills.headers["etag"]})
+    assert cached.status_code == 304
+    assert cached.content == b""
+    assert cached.headers["etag"] == skills.headers["etag"]
+
+
+def test_gzip_representation_has_its_own_etag(tmp_path):
+    path = tmp_path / "content.json"
+    path.write_text(json.dumps({"projects": [{"title": "Project %d" % i, "description": "x" * 50} for i in range(20)]}))
+    content = StaticContent(str(path))
+
+    plain = content.response("projects", {"accept-encoding": "identity"})
+    zipped = content.response("projects", {"accept-encoding": "gzip, deflate"})
+    assert zipped.headers["content-encoding"] == "gzip"
+    assert gzip.decompress(zipped.body) == plain.body
+    assert zipped.headers["etag"] != plain.headers["etag"]
+
+    assert content.response("projects", {"accept-encoding": "gzip", "if-none-match": 'W/' + zipped.headers["etag"]}).status_code == 304
+    assert content.response("projects", {"accept-encoding": "gzip", "if-none-match": plain.headers["etag"]}).status_code == 200
+    assert content.response("missing", {}) is None
+
+
+def test_encoding_negotiation_respects_q_values():
+    assert accepted_encodings(None) == ["identity"]
+    assert accepted_encodings("gzip;q=0.5, identity") == ["identity", "gzip"]
+    assert "gzip" not in accepted_encodings("gzip;q=0, *")
+    assert accepted_encodings("br, gzip")[:2] == ["br", "gzip"]
+
+
+def test_changed_file_is_reloaded(tmp_path):
+    path = tmp_path / "content.json"
+    path.write_text(json.dumps({"skills": {"a": 1}}))
+    content = StaticContent(str(path), reload_interval=0)
+    first = content.response("skills", {})
+
+    path.write_text(json.dumps({"skills": {"a": 2}}))
+    os.utime(path, ns=(0, 10**18))
+    second = content.response("skills", {})
+    assert json.loads(second.body) == {"a": 2}
+    assert second.headers["etag"] != first.headers["etag"]
+
+    # A broken edit keeps the last good content
+    path.write_text("{not json")
+    os.utime(path, ns=(0, 2 * 10**18))
+    assert json.loads(content.response("skills", {}).body) == {"a": 2}
+    assert content.reloads == 1
+
+
+def test_reload_on_a_running_loop_does_not_block_requests(tmp_path):
+    path = tmp_path / "content.json"
+    path.write_text(json.dumps({"skills": {"a": 1}}))
+    release = threading.Event()
+    release.set()  # let the initial load through
+    content = StaticContent(str(path), reload_interval=0, on_load=lambda data: release.wait(5))
+    release.clear()
+
+    async def scenario():
+        path.write_text(json.dumps({"skills": {"a": 2}}))
+        os.utime(path, ns=(0, 10**18))
+        # The reload is stuck in on_load; the request is answered from the old content
+        assert json.loads(content.response("skills", {}).body) == {"a": 1}
+        release.set()
+        for _ in range(100):
+            if content.reloads:
+                break
+            await asyncio.sleep(0.01)
+        assert json.loads(content.response("skills", {}).body) == {"a": 2}
+
+    asyncio.run(scenario())
@@ -0,0 +1,56 @@
+import asyncio
+import time
+
+from fastapi.testclient import TestClient
+
+import server
+from tests.venice_stub import VeniceStub
+from timing import ServerTimingMiddleware, SlowRequestProfiler
+
+
+def timing_phases(header: str) -> dict:
+    phases = {}
+    for entry in header.split(","):
+        name, _, duration = entry.strip().partition(";dur=")
+        phases[name] = float(duration)
+    return phases
+
+
+def test_chat_response_carries_server_timing(monkeypatch):
+    with VeniceStub(reply="timed", delay=0.05) as stub:
+        monkeypatch.setattr(server, "VENICE_BASE_URL", stub.base_url)
+        with TestClient(server.app) as client:
+            response = client.post("/api/chat", json={"message": "how long?", "noCache": True})
+
+    assert response.status_code == 200
+    phases = timing_phases(response.headers["server-timing"])
+    for name in ("parse", "rate_limit", "context", "upstream", "venice_connect", "venice_ttfb", "session_save", "serialize", "total"):
+        assert name in phases
+    assert phases["venice_ttfb"] >= 50
+    assert phases["upstream"] >= phases["venice_ttfb"]
+    assert phases["total"] >= phases["upstream"]
+
+
+def test_slow_requests_are_profiled(tmp_path):
+    async def slow_app(scope, receive, send):
+        await asyncio.sleep(0.1)
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b"done"})
+
+    async def fast_app(scope, receive, send):
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b"done"})
+
+    profiler = SlowRequestProfiler(threshold=0.05, output_dir=str(tmp_path), interval=0.002)
+    assert "server-timing" in TestClient(ServerTimingMiddleware(fast_app, profiler)).get("/fast").headers
+    TestClient(ServerTimingMiddleware(slow_app, profiler)).get("/slow")
+
+    # Profiles are written off the event loop
+    for _ in range(100):
+        profiles = list(tmp_path.glob("*.folded"))
+        if profiles:
+            break
+        time.sleep(0.01)
+    assert len(profiles) == 1
+    assert "slow" in profiles[0].name
+    assert "slow_app" in profiles[0].read_text()
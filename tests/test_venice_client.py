@@ -0,0 +1,29 @@
+import uuid
+
+from fastapi.testclient import TestClient
+
+import server
+from tests.venice_stub import VeniceStub
+
+
+def test_chat_reuses_pooled_upstream_connection(monkeypatch):
+    with VeniceStub() as stub:
+        monkeypatch.setattr(server, "VENICE_BASE_URL", stub.base_url)
+
+        with TestClient(server.app) as client:
+            session_id = str(uuid.uuid4())
+            for _ in range(3):
+                response = client.post("/api/chat", json={"message": "hi", "sessionId": session_id})
+                assert response.status_code == 200
+                assert response.json()["response"] == "stub reply"
+
+        assert len(stub.requests) == 3
+        # All three turns went over one keep-alive connection
+        assert len(stub.connections) == 1
+
+
+def test_client_is_closed_on_shutdown():
+    with TestClient(server.app):
+        venice_client = server.app.state.venice_client
+        assert not venice_client.is_closed
+    assert venice_client.is_closed
@@ -0,0 +1,89 @@
+"""Minimal local stand-in for the Venice chat completions API"""
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class VeniceStub:
+    """Threaded HTTP/1.1 server answering POST /chat/completions with a canned reply.
+
+    ``fail_after`` cuts a streamed reply off mid-body after that many tokens,
+    as a dropped upstream connection would.
+    """
+
+    def __init__(self, reply: str = "stub reply", delay: float = 0.0, fail_after: int = 0):
+        self.reply = reply
+        self.delay = delay
+        self.fail_after = fail_after
+        self.requests = []
+        self.connections = set()
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                body = json.loads(self.rfile.read(length) or b"{}")
+                stub.requests.append(body)
+                stub.connections.add(self.client_address)
+                if stub.delay:
+                    time.sleep(stub.delay)
+                if body.get("stream"):
+                    self._stream_reply()
+                    return
+                payload = json.dumps({
+                    "choices": [{"message": {"role": "assistant", "content": stub.reply}}]
+                }).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def _stream_reply(self):
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Connection", "close")
+                if stub.fail_after:
+                    self._stream_cut_off()
+                    return
+                self.end_headers()
+                for token in stub.reply.split(" "):
+                    chunk = {"choices": [{"delta": {"content": token + " "}}]}
+                    self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode())
+                    self.wfile.flush()
+                self.wfile.write(b"data: [DONE]\n\n")
+                self.close_connection = True
+
+            def _stream_cut_off(self):
+                # Chunked, so closing before the final chunk is a protocol error for the client
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+                for token in stub.reply.split(" ")[:stub.fail_after]:
+                    event = f"data: {json.dumps({'choices': [{'delta': {'content': token + ' '}}]})}\n\n".encode()
+                    self.wfile.write(b"%x\r\n%s\r\n" % (len(event), event))
+                    self.wfile.flush()
+                self.wfile.write(b"100\r\npartial")
+                self.close_connection = True
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server.server_address
+        return f"http://{host}:{port}"
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()